@@ -0,0 +1,53 @@
+"""Add aya_texts search table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_table(
+        "aya_texts",
+        sa.Column("language", sa.String, primary_key=True),
+        sa.Column("text_type", sa.String, primary_key=True),
+        sa.Column("aya_id", sa.String, primary_key=True),
+        sa.Column("surah", sa.Integer, nullable=False),
+        sa.Column("aya_number", sa.Integer, nullable=False),
+        sa.Column("text", sa.Text, nullable=False),
+        sa.Column("text_folded", sa.Text, nullable=False),
+        sa.Column(
+            "text_tsv",
+            TSVECTOR,
+            sa.Computed("to_tsvector('simple', text_folded)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "idx_aya_texts_text_folded_trgm",
+        "aya_texts",
+        ["text_folded"],
+        postgresql_using="gin",
+        postgresql_ops={"text_folded": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "idx_aya_texts_text_tsv", "aya_texts", ["text_tsv"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_aya_texts_text_tsv", table_name="aya_texts")
+    op.drop_index("idx_aya_texts_text_folded_trgm", table_name="aya_texts")
+    op.drop_table("aya_texts")
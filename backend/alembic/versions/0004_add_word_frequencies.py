@@ -0,0 +1,40 @@
+"""Add word_frequencies table.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "word_frequencies",
+        sa.Column("word", sa.String(collation="C"), primary_key=True),
+        sa.Column("initial", sa.String, nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+    )
+    op.create_index(
+        "idx_word_frequencies_initial",
+        "word_frequencies",
+        ["initial", "word"],
+        postgresql_include=["count"],
+    )
+    op.create_index(
+        "idx_word_frequencies_count", "word_frequencies", [sa.text("count DESC"), "word"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_word_frequencies_count", table_name="word_frequencies")
+    op.drop_index("idx_word_frequencies_initial", table_name="word_frequencies")
+    op.drop_table("word_frequencies")
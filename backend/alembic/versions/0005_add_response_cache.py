@@ -0,0 +1,33 @@
+"""Add response_cache table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import BYTEA, JSONB
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "response_cache",
+        sa.Column("key", sa.String, primary_key=True),
+        sa.Column("version", sa.String, nullable=False),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+        sa.Column("body", BYTEA, nullable=False),
+        sa.Column("headers", JSONB, nullable=False),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("response_cache")
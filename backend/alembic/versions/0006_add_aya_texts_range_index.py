@@ -0,0 +1,28 @@
+"""Add covering range index on aya_texts.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_aya_texts_range",
+        "aya_texts",
+        ["language", "text_type", "surah", "aya_number"],
+        postgresql_include=["aya_id", "text"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_aya_texts_range", table_name="aya_texts")
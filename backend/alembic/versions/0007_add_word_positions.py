@@ -0,0 +1,30 @@
+"""Add word_positions table.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import BYTEA
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "word_positions",
+        sa.Column("word", sa.String(collation="C"), primary_key=True),
+        sa.Column("ordinals", BYTEA, nullable=False),
+        sa.Column("positions", BYTEA, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("word_positions")
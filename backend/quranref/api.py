@@ -1,17 +1,55 @@
 import json
 import logging
+from bisect import bisect_right
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, Literal
 
 from age_orm import Graph
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from .db import graph, raw_connection
-from .models import Surah, Word
-from .schemas import AyaResultSchema
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from .arabic import fold_text
+from .cache import CachedResponse, get_response_cache
+from .concordance import get_concordance_index, intersect_postings, merge_postings
+from .db import graph, pool_stats
+from .meta import current_corpus_version, get_meta_info
+from .models import Surah
+from .schemas import (
+    AyaResultSchema,
+    ConcordanceLineSchema,
+    TextRangeResultSchema,
+    TextRangesRequest,
+)
+from .search_index import get_search_index
+from .settings import get_settings
+from .snapshot import get_corpus_snapshot
+from .text_search import (
+    fetch_aya_texts,
+    fetch_ranges_texts,
+    fetch_surah_texts,
+    search_aya_texts,
+)
+from .utils import aya_sort_key
+from .word_index import current_word_generation
+from .word_stats import top_words, word_count_histogram, words_by_count, words_by_initial
 
 log = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Upper bound on aya ids per translation query issued by the search endpoints
+SEARCH_TRANSLATION_BATCH_SIZE = 1000
+# Smaller batches for the streaming search so the first results go out early
+SEARCH_STREAM_BATCH_SIZE = 100
+# Upper bound on aya ranges per multi-range text request
+MAX_TEXT_RANGES = 200
+# Upper bound on words per ayas-by-word request
+MAX_WORDS_PER_QUERY = 20
+# Words shown on each side of a concordance keyword, by default and at most
+DEFAULT_CONCORDANCE_WINDOW = 5
+MAX_CONCORDANCE_WINDOW = 50
+
 
 @router.get("/letters")
 async def get_letters() -> list[str]:
@@ -55,7 +93,7 @@ async def get_letters() -> list[str]:
 
 
 @router.get("/surahs")
-async def get_surahs(g: Graph = Depends(graph)) -> list[Surah]:
+def get_surahs(g: Graph = Depends(graph)) -> list[Surah]:
     """
     Get all Surahs
     """
@@ -64,42 +102,27 @@ async def get_surahs(g: Graph = Depends(graph)) -> list[Surah]:
 
 
 @router.get("/text-types")
-async def get_text_types() -> dict[str, list[str]]:
+def get_text_types() -> dict[str, list[str]]:
     """
     Get all text types
     """
-    with raw_connection() as conn:
-        result = conn.execute(
-            "SELECT value FROM meta_info WHERE key = %s", ("text-types",)
-        ).fetchone()
-
-    if not result:
+    text_types = get_meta_info("text-types")
+    if not text_types:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Text types not found"
         )
 
-    value = result[0]
-    if isinstance(value, str):
-        value = json.loads(value)
-    return value
+    return text_types
 
 
 @router.get("/words-by-letter/{arabic_letter}")
-async def get_words_by_letter(
-    arabic_letter: str, g: Graph = Depends(graph)
-) -> list[tuple[str, int]]:
+def get_words_by_letter(arabic_letter: str) -> list[tuple[str, int]]:
     """
-    Get all words starting with the given Arabic letter
-    """
-    results = g.cypher(
-        "MATCH (w:Word) WHERE left(w.word, 1) = $letter "
-        'RETURN w.word, w["count"]',
-        columns=["word", "count"],
-        letter=arabic_letter,
-    )
+    Get all words starting with the given Arabic letter.
 
-    results.sort(key=lambda r: r["word"])
-    return [(r["word"], r["count"]) for r in results]
+    Letter variants are folded, so "أ", "إ", "آ" and "ا" all return the same words.
+    """
+    return words_by_initial(fold_text(arabic_letter)[:1])
 
 
 def _build_language_filter(languages_spec: str, edge_alias: str = "e") -> tuple[str, dict]:
@@ -122,6 +145,32 @@ def _build_language_filter(languages_spec: str, edge_alias: str = "e") -> tuple[
     return " OR ".join(parts), params
 
 
+def _fetch_aya_texts(
+    g: Graph, aya_keys: list[str], language_specs: list[tuple[str, str]]
+) -> list[dict]:
+    """Fetch texts of the given language/text_type pairs for a set of ayas in one query.
+
+    Each result row has: aya_id, language, text_type, text
+    """
+    if get_settings().text_backend == "postgres":
+        return fetch_aya_texts(aya_keys, language_specs)
+
+    parts = []
+    params: dict = {"aya_ids": aya_keys}
+    for idx, (language, text_type) in enumerate(language_specs):
+        parts.append(f"(e.language = $lang_{idx} AND e.text_type = $tt_{idx})")
+        params[f"lang_{idx}"] = language
+        params[f"tt_{idx}"] = text_type
+
+    return g.cypher(
+        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+        f"WHERE a.id IN $aya_ids AND ({' OR '.join(parts)}) "
+        "RETURN a.id, e.language, e.text_type, t.text",
+        columns=["aya_id", "language", "text_type", "text"],
+        **params,
+    )
+
+
 def _process_aya_results(results: list[dict]) -> list[AyaResultSchema]:
     """Process raw Cypher results into AyaResultSchema list.
 
@@ -146,95 +195,365 @@ def _process_aya_results(results: list[dict]) -> list[AyaResultSchema]:
     return list(ayas_dict.values())
 
 
-@router.get("/ayas-by-word/{word}/{languages}")
-async def get_ayas_by_word(
-    word: str, languages: str, g: Graph = Depends(graph)
-) -> list[AyaResultSchema]:
+@router.get("/ayas-by-word/{words}/{languages}", response_model=list[AyaResultSchema])
+def get_ayas_by_word(
+    words: str,
+    languages: str,
+    match: Literal["all", "any"] = "all",
+    g: Graph = Depends(graph),
+) -> Response:
     """
     Get all ayas containing the given word and return text in the given languages.
+
+    Several comma separated words return the ayas containing all of them (match=all) or any
+    of them (match=any). Ayas are in mushaf order.
     """
-    word_doc = g.query(Word).filter_by(word=word).first()
-    if word_doc is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Word not found")
+    word_list = _parse_words(words)
+    return _cached_json(
+        f"ayas-by-word|{','.join(word_list)}|{match}|{_normalised_languages_spec(languages)}",
+        lambda: (_ayas_by_word(g, word_list, match, languages), {}),
+    )
 
-    lang_filter, lang_params = _build_language_filter(languages)
 
-    results = g.cypher(
-        "MATCH (a:Aya)-[:HAS_WORD]->(w:Word), (a)-[e:AYA_TEXT]->(t:Text) "
-        f"WHERE id(w) = $word_gid AND ({lang_filter}) "
-        "RETURN a.id, e.language, e.text_type, t.text",
-        columns=["aya_id", "language", "text_type", "text"],
-        word_gid=word_doc.graph_id,
-        **lang_params,
+def _parse_words(words: str) -> list[str]:
+    "Distinct words of a comma separated list, in order"
+
+    word_list = list(dict.fromkeys(w.strip() for w in words.split(",") if w.strip()))
+    if not word_list:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No words given")
+    if len(word_list) > MAX_WORDS_PER_QUERY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_WORDS_PER_QUERY} words per request",
+        )
+    return word_list
+
+
+def _graph_word_postings(g: Graph, words: list[str]) -> dict[str, list[tuple[int, int]]]:
+    "Word -> sort keys of the ayas linked to it by HAS_WORD edges, in mushaf order"
+
+    rows = g.cypher(
+        "MATCH (a:Aya)-[h:HAS_WORD]->(w:Word) "
+        "WHERE w.word IN $words AND coalesce(h.generation, 0) = $generation "
+        "RETURN w.word, a.id",
+        columns=["word", "aya_id"],
+        words=words,
+        generation=current_word_generation(),
     )
+    postings: dict[str, list[tuple[int, int]]] = {}
+    for r in rows:
+        postings.setdefault(r["word"], []).append(aya_sort_key(r["aya_id"]))
+    return {word: sorted(set(aya_keys)) for word, aya_keys in postings.items()}
+
+
+def _sort_key_aya_key(sort_key: tuple[int, int]) -> str:
+    return f"{sort_key[0]}:{sort_key[1]}"
+
+
+def _ayas_by_word(
+    g: Graph, words: list[str], match: str, languages: str
+) -> list[AyaResultSchema]:
+    """Texts of the ayas containing all/any of the words.
+
+    The ayas come from the words' posting lists in the in-memory concordance, so their texts
+    are fetched with a single query. Words missing from the concordance (make-words has not
+    stored their positions yet) are looked up through the HAS_WORD edges instead.
+    """
+    index = get_concordance_index()
+    if all(word in index.postings for word in words):
+        postings: dict[str, Sequence] = {word: index.postings[word] for word in words}
+        to_aya_key: Callable[[Any], str] = index.aya_keys.__getitem__
+    else:
+        postings = _graph_word_postings(g, words)
+        to_aya_key = _sort_key_aya_key
+
+    for word in words:
+        if word not in postings:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Word not found: {word}"
+            )
+
+    word_postings = [postings[word] for word in words]
+    if match == "all":
+        matched = intersect_postings(word_postings)
+    else:
+        matched = merge_postings(word_postings)
+    aya_keys = [to_aya_key(aya) for aya in matched]
+    language_specs = _parse_languages_spec(languages)
+
+    if get_settings().corpus_snapshot:
+        snapshot = get_corpus_snapshot(g)
+        return snapshot.get_texts(
+            [snapshot.ordinals[k] for k in aya_keys if k in snapshot.ordinals], language_specs
+        )
+
+    if not aya_keys:
+        return []
 
-    results.sort(key=lambda r: r["aya_id"])
+    results = _fetch_aya_texts(g, aya_keys, language_specs)
+    order = {aya_key: i for i, aya_key in enumerate(aya_keys)}
+    results.sort(key=lambda r: order[r["aya_id"]])
     return _process_aya_results(results)
 
 
+@router.get("/concordance/{phrase}", response_model=list[ConcordanceLineSchema])
+def get_concordance(
+    phrase: str,
+    response: Response,
+    window: int = Query(DEFAULT_CONCORDANCE_WINDOW, ge=0, le=MAX_CONCORDANCE_WINDOW),
+    near: str | None = None,
+    distance: int = Query(DEFAULT_CONCORDANCE_WINDOW, ge=1, le=MAX_CONCORDANCE_WINDOW),
+    limit: int | None = Query(None, ge=1),
+) -> list[dict]:
+    """
+    Keyword in context lines of every occurrence of a word, in mushaf order.
+
+    A phrase of several words matches them in a row. With near only the occurrences having
+    that word at most distance words before or after them are returned.
+
+    Served from the in-memory concordance built by make-words. When limit is given only that
+    many lines are returned; X-Total-Count holds the total number of occurrences.
+    """
+    words = phrase.split()
+    index = get_concordance_index()
+    if near:
+        matches = index.near(words, near, distance)
+    else:
+        matches = index.phrase(words)
+
+    response.headers["X-Total-Count"] = str(len(matches))
+    return [
+        index.kwic(ordinal, start, len(words), window)
+        for ordinal, start in matches[:limit]
+    ]
+
+
 @router.get("/words-by-count/{count}")
-async def get_words_by_count(count: int, g: Graph = Depends(graph)) -> list[tuple[str, int]]:
+def get_words_by_count(count: int) -> list[tuple[str, int]]:
     """
     Get all words with the given count
     """
-    results = g.cypher(
-        'MATCH (w:Word) WHERE w["count"] = $cnt RETURN w.word, w["count"]',
-        columns=["word", "count"],
-        cnt=count,
-    )
-    results.sort(key=lambda r: r["word"])
-    return [(r["word"], r["count"]) for r in results]
+    return words_by_count(count)
 
 
 @router.get("/available-word-counts")
-async def get_available_word_counts(g: Graph = Depends(graph)) -> list[dict]:
+def get_available_word_counts() -> list[dict]:
     """
     Get all available word counts with the number of words for each count.
     Returns a list of {count, word_count} objects sorted by count descending.
     """
-    results = g.cypher(
-        'MATCH (w:Word) RETURN w["count"], count(w)',
-        columns=["count", "word_count"],
-    )
-    results.sort(key=lambda r: r["count"], reverse=True)
-    return [{"count": r["count"], "word_count": r["word_count"]} for r in results]
+    return word_count_histogram()
 
 
 @router.get("/top-most-frequent-words/{limit}")
-async def get_top_most_frequent_words(
-    limit: int, g: Graph = Depends(graph)
-) -> list[tuple[str, int]]:
+def get_top_most_frequent_words(limit: int = Path(..., ge=1)) -> list[tuple[str, int]]:
     """
     Get top most frequent words
     """
-    results = g.cypher(
-        'MATCH (w:Word) RETURN w.word, w["count"]',
-        columns=["word", "count"],
+    return top_words(limit)
+
+
+def _parse_ayas_spec(ayas_spec: str) -> tuple[str, int | None, int | None]:
+    """Parse an ayas spec like "2", "2:255" or "2:1-5".
+
+    Returns (surah_number, start_aya, end_aya), the aya bounds being None for a whole surah.
+    """
+    if "-" not in ayas_spec and ":" not in ayas_spec:
+        return ayas_spec, None, None
+
+    surah_number, aya_num_or_range = ayas_spec.split(":", 1)
+    if not surah_number:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid surah number"
+        )
+
+    if "-" in aya_num_or_range:
+        start_aya, end_aya = aya_num_or_range.split("-", 1)
+        return surah_number, int(start_aya), int(end_aya)
+
+    return surah_number, int(aya_num_or_range), int(aya_num_or_range)
+
+
+def _parse_ayas_specs(ayas_specs: list[str]) -> list[tuple[str, int | None, int | None]]:
+    "Parse several ayas specs (see _parse_ayas_spec), rejecting invalid specs with a 400"
+
+    if len(ayas_specs) > MAX_TEXT_RANGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_TEXT_RANGES} aya ranges per request",
+        )
+    try:
+        return [_parse_ayas_spec(spec.strip()) for spec in ayas_specs]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ayas spec"
+        ) from None
+
+
+def _parse_languages_spec(languages_spec: str) -> list[tuple[str, str]]:
+    "Split a spec like 'arabic:simple-clean_english:maududi' into (language, text_type) pairs"
+
+    return [tuple(lang.split(":", 1)) for lang in languages_spec.split("_") if lang]
+
+
+def _cached_json(key: str, build: Callable[[], tuple[Any, dict[str, str]]]) -> Response:
+    """Serve a JSON response from the response cache, building and caching it on a miss.
+
+    build returns the response content and any extra headers. Errors raised by it are not
+    cached.
+    """
+    cache = get_response_cache()
+    version = current_corpus_version()
+
+    cached = cache.get(key, version)
+    if cached is None:
+        content, headers = build()
+        body = json.dumps(jsonable_encoder(content), ensure_ascii=False).encode()
+        cached = CachedResponse(body, headers)
+        cache.set(key, version, cached)
+
+    return Response(cached.body, media_type="application/json", headers=cached.headers)
+
+
+def _normalised_languages_spec(languages_spec: str) -> str:
+    return "_".join(
+        f"{language}:{text_type}"
+        for language, text_type in sorted(set(_parse_languages_spec(languages_spec)))
     )
-    results.sort(key=lambda r: (-r["count"], r["word"]))
-    return [(r["word"], r["count"]) for r in results[:limit]]
 
 
-@router.get("/text/{ayas_spec}/{languages_spec}")
-async def get_text(
-    ayas_spec: str, languages_spec: str, g: Graph = Depends(graph)
-) -> list[AyaResultSchema]:
+@router.get("/text/{ayas_spec}/{languages_spec}", response_model=list[AyaResultSchema])
+def get_text(ayas_spec: str, languages_spec: str, g: Graph = Depends(graph)) -> Response:
     """
     Get text for the given ayas and languages.
+
+    ayas_spec may list several comma separated specs (e.g. "2:255,3:18-20,112"), which are
+    read with one query and returned in the requested order.
     """
 
-    surah_number = None
-    aya_num_or_range = None
+    if "," in ayas_spec:
+        ranges = _parse_ayas_specs([spec for spec in ayas_spec.split(",") if spec.strip()])
+        return _cached_json(
+            f"text-ranges|{_ranges_key(ranges)}|{_normalised_languages_spec(languages_spec)}",
+            lambda: (
+                [
+                    aya
+                    for ayas in _get_text_ranges(g, ranges, languages_spec)
+                    for aya in ayas
+                ],
+                {},
+            ),
+        )
 
-    if "-" not in ayas_spec and ":" not in ayas_spec:
-        surah_number = ayas_spec
-    else:
-        surah_number, aya_num_or_range = ayas_spec.split(":", 1)
+    [(surah_number, start_aya, end_aya)] = _parse_ayas_specs([ayas_spec])
+    return _cached_json(
+        f"text|{surah_number}|{start_aya}|{end_aya}|{_normalised_languages_spec(languages_spec)}",
+        lambda: (_get_text(g, surah_number, start_aya, end_aya, languages_spec), {}),
+    )
 
-    if surah_number is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid surah number"
+
+@router.post("/texts", response_model=list[TextRangeResultSchema])
+def get_texts(request: TextRangesRequest, g: Graph = Depends(graph)) -> Response:
+    """
+    Get texts for many aya specs at once, grouped per spec in the requested order.
+
+    All specs are read with one query.
+    """
+    ranges = _parse_ayas_specs(request.ayas_specs)
+
+    def build():
+        groups = _get_text_ranges(g, ranges, request.languages_spec)
+        return [
+            TextRangeResultSchema(ayas_spec=spec, ayas=ayas)
+            for spec, ayas in zip(request.ayas_specs, groups)
+        ], {}
+
+    return _cached_json(
+        f"text-groups|{','.join(request.ayas_specs)}|"
+        f"{_normalised_languages_spec(request.languages_spec)}",
+        build,
+    )
+
+
+def _ranges_key(ranges: list[tuple[str, int | None, int | None]]) -> str:
+    return ",".join(f"{surah}:{start}-{end}" for surah, start, end in ranges)
+
+
+def _get_text_ranges(
+    g: Graph, ranges: list[tuple[str, int | None, int | None]], languages_spec: str
+) -> list[list[AyaResultSchema]]:
+    "Texts of several (surah, start aya, end aya) ranges, one list per range"
+
+    language_specs = _parse_languages_spec(languages_spec)
+
+    if get_settings().corpus_snapshot:
+        snapshot = get_corpus_snapshot(g)
+        return [
+            snapshot.get_texts(snapshot.ordinal_range(surah, start, end), language_specs)
+            for surah, start, end in ranges
+        ]
+
+    if get_settings().text_backend == "postgres":
+        valid = [idx for idx, (surah, _, _) in enumerate(ranges) if surah.isdigit()]
+        rows = fetch_ranges_texts(
+            [(int(ranges[idx][0]), ranges[idx][1], ranges[idx][2]) for idx in valid],
+            language_specs,
         )
+        grouped: list[list[dict]] = [[] for _ in ranges]
+        for idx, range_rows in zip(valid, rows):
+            grouped[idx] = range_rows
+        return [_process_aya_results(range_rows) for range_rows in grouped]
+
+    lang_filter, params = _build_language_filter(languages_spec)
+    range_filters = []
+    for idx, (surah, start, end) in enumerate(ranges):
+        condition = f"a.surah_key = $surah_{idx}"
+        params[f"surah_{idx}"] = surah
+        if start is not None:
+            condition += f" AND a.aya_number >= $start_{idx} AND a.aya_number <= $end_{idx}"
+            params[f"start_{idx}"] = start
+            params[f"end_{idx}"] = end
+        range_filters.append(f"({condition})")
+
+    results = g.cypher(
+        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+        f"WHERE ({' OR '.join(range_filters)}) AND ({lang_filter}) "
+        "RETURN a.surah_key, a.aya_number, a.id, e.language, e.text_type, t.text",
+        columns=["surah_key", "aya_number", "aya_id", "language", "text_type", "text"],
+        **params,
+    )
+    results.sort(key=lambda r: r["aya_number"])
+
+    return [
+        _process_aya_results([
+            r
+            for r in results
+            if r["surah_key"] == surah
+            and (start is None or start <= r["aya_number"] <= end)
+        ])
+        for surah, start, end in ranges
+    ]
+
+
+def _get_text(
+    g: Graph,
+    surah_number: str,
+    start_aya: int | None,
+    end_aya: int | None,
+    languages_spec: str,
+) -> list[AyaResultSchema]:
+    if get_settings().corpus_snapshot:
+        snapshot = get_corpus_snapshot(g)
+        ordinals = snapshot.ordinal_range(surah_number, start_aya, end_aya)
+        return snapshot.get_texts(ordinals, _parse_languages_spec(languages_spec))
+
+    if get_settings().text_backend == "postgres":
+        if not surah_number.isdigit():
+            return []
+        results = fetch_surah_texts(
+            int(surah_number), start_aya, end_aya, _parse_languages_spec(languages_spec)
+        )
+        return _process_aya_results(results)
 
     lang_filter, lang_params = _build_language_filter(languages_spec)
 
@@ -246,15 +565,13 @@ async def get_text(
     params = {"surah_num": surah_number, **lang_params}
 
     # Add aya filter
-    if aya_num_or_range is not None:
-        if "-" in aya_num_or_range:
-            start_aya, end_aya = aya_num_or_range.split("-", 1)
-            cypher += " AND a.aya_number >= $start_aya AND a.aya_number <= $end_aya"
-            params["start_aya"] = int(start_aya)
-            params["end_aya"] = int(end_aya)
-        else:
-            cypher += " AND a.aya_number = $aya_num"
-            params["aya_num"] = int(aya_num_or_range)
+    if start_aya is not None and start_aya == end_aya:
+        cypher += " AND a.aya_number = $aya_num"
+        params["aya_num"] = start_aya
+    elif start_aya is not None:
+        cypher += " AND a.aya_number >= $start_aya AND a.aya_number <= $end_aya"
+        params["start_aya"] = start_aya
+        params["end_aya"] = end_aya
 
     cypher += " RETURN a.id, e.language, e.text_type, t.text"
 
@@ -270,81 +587,185 @@ async def get_text(
     return _process_aya_results(results)
 
 
+def _find_search_matches(
+    g: Graph, search_term: str, language: str, text_type: str, whole_words: bool
+) -> list[dict]:
+    """Find ayas whose language/text_type text contains the search term, in mushaf order.
+
+    Each result row has: aya_id, text
+    """
+    log.info(
+        f"Searching for term: '{search_term}' in language: {language}, text_type: {text_type}"
+    )
+
+    if get_settings().search_backend == "postgres":
+        matched = search_aya_texts(language, text_type, search_term, whole_words)
+    else:
+        # Find ayas matching the search term via the in-process text index
+        index = get_search_index(g, language, text_type)
+        matched = [
+            {"aya_id": index.aya_keys[ordinal], "text": index.texts[ordinal]}
+            for ordinal in index.search(search_term, whole_words)
+        ]
+
+    log.info(f"Found {len(matched)} aya matches")
+    return matched
+
+
+def _paginate_matches(
+    matched: list[dict], cursor: str | None, limit: int | None
+) -> tuple[list[dict], str | None]:
+    """Return the page of matches following the cursor and the cursor of the next page.
+
+    The cursor is the aya key of the last aya of the previous page.
+    """
+    start = 0
+    if cursor:
+        try:
+            cursor_key = aya_sort_key(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from None
+        start = bisect_right([aya_sort_key(m["aya_id"]) for m in matched], cursor_key)
+
+    end = len(matched) if limit is None else start + limit
+    page = matched[start:end]
+    next_cursor = page[-1]["aya_id"] if page and end < len(matched) else None
+    return page, next_cursor
+
+
+def _search_headers(total: int, next_cursor: str | None) -> dict[str, str]:
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
+
+
+def _iter_search_results(
+    g: Graph,
+    matched: list[dict],
+    language: str,
+    text_type: str,
+    language_translations: list[tuple[str, str]],
+    batch_size: int,
+) -> Iterator[dict]:
+    """Yield search results in the order of matched, resolving translations batch by batch.
+
+    Translations are fetched with one query per batch of aya ids, so the number of queries
+    does not grow with the match count.
+    """
+    for start in range(0, len(matched), batch_size):
+        batch = matched[start:start + batch_size]
+
+        translations: dict[str, dict[str, dict[str, str]]] = {}
+        if language_translations:
+            aya_keys = [m["aya_id"] for m in batch]
+            for tr in _fetch_aya_texts(g, aya_keys, language_translations):
+                aya_texts = translations.setdefault(tr["aya_id"], {})
+                aya_texts.setdefault(tr["language"], {})[tr["text_type"]] = tr["text"]
+
+        for m in batch:
+            aya_key = m["aya_id"]
+            search_result = {
+                "aya_key": aya_key,
+                "texts": {language: {text_type: m["text"]}},
+            }
+
+            for tr_lang, tr_texts in translations.get(aya_key, {}).items():
+                search_result["texts"].setdefault(tr_lang, {}).update(tr_texts)
+
+            yield search_result
+
+
 @router.get("/search/{search_term}/{search_language_spec}/{translation_languages_spec}")
-async def search(
+def search(
     search_term: str,
     search_language_spec: str,
     translation_languages_spec: str = "",
+    whole_words: bool = False,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
     g: Graph = Depends(graph),
 ):
     """
     Search for the given term in the Quran and return the ayas containing the term.
-    """
 
-    search_results = []
+    With whole_words=true the term only matches complete words instead of any part of a word.
 
+    Results are in mushaf order. When limit is given only that many results are returned and
+    the X-Next-Cursor header holds the cursor to pass for the next page. X-Total-Count holds
+    the total number of matching ayas.
+    """
     language, text_type = search_language_spec.split(":", 1)
-    language_translations = []
-
-    for lang in translation_languages_spec.split("_"):
-        language_translations.append(lang.split(":", 1))
+    language_translations = _parse_languages_spec(translation_languages_spec)
 
     if not search_term:
-        return search_results
+        return []
+
+    def build():
+        matched = _find_search_matches(g, search_term, language, text_type, whole_words)
+        page, next_cursor = _paginate_matches(matched, cursor, limit)
+        results = list(
+            _iter_search_results(
+                g, page, language, text_type, language_translations, SEARCH_TRANSLATION_BATCH_SIZE
+            )
+        )
+        return results, _search_headers(len(matched), next_cursor)
 
-    log.info(
-        f"Searching for term: '{search_term}' in language: {language}, text_type: {text_type}"
+    return _cached_json(
+        f"search|{language}:{text_type}|{fold_text(search_term.strip())}|"
+        f"{_normalised_languages_spec(translation_languages_spec)}|{whole_words}|{limit}|{cursor}",
+        build,
     )
 
-    # Find ayas matching the search term via their text
-    matched = g.cypher(
-        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
-        "WHERE e.language = $lang AND e.text_type = $tt AND t.text CONTAINS $term "
-        "RETURN a.id, t.text",
-        columns=["aya_id", "text"],
-        lang=language,
-        tt=text_type,
-        term=search_term,
-    )
 
-    log.info(f"Found {len(matched)} aya matches")
+@router.get("/search-stream/{search_term}/{search_language_spec}/{translation_languages_spec}")
+def search_stream(
+    search_term: str,
+    search_language_spec: str,
+    translation_languages_spec: str = "",
+    whole_words: bool = False,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    g: Graph = Depends(graph),
+) -> StreamingResponse:
+    """
+    Streaming variant of search returning one JSON result per line (NDJSON).
 
-    if not matched:
-        return search_results
-
-    # Build translation filter
-    tr_parts = []
-    tr_params = {}
-    for idx, (tr_lang, tr_text_type) in enumerate(language_translations):
-        tr_parts.append(f"(e.language = $tr_lang_{idx} AND e.text_type = $tr_tt_{idx})")
-        tr_params[f"tr_lang_{idx}"] = tr_lang
-        tr_params[f"tr_tt_{idx}"] = tr_text_type
-
-    for m in matched:
-        aya_key = m["aya_id"]
-        search_result = {
-            "aya_key": aya_key,
-            "texts": {language: {text_type: m["text"]}},
-        }
-
-        # Get translations if requested
-        if language_translations and tr_parts:
-            tr_filter = " OR ".join(tr_parts)
-
-            tr_results = g.cypher(
-                "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
-                f"WHERE a.id = $aya_id AND ({tr_filter}) "
-                "RETURN e.language, e.text_type, t.text",
-                columns=["language", "text_type", "text"],
-                aya_id=aya_key,
-                **tr_params,
-            )
+    Results are emitted in mushaf order as soon as the translations of their batch are
+    resolved. Takes the same parameters and sets the same headers as search.
+    """
+    language, text_type = search_language_spec.split(":", 1)
+    language_translations = _parse_languages_spec(translation_languages_spec)
 
-            for tr in tr_results:
-                if tr["language"] not in search_result["texts"]:
-                    search_result["texts"][tr["language"]] = {}
-                search_result["texts"][tr["language"]][tr["text_type"]] = tr["text"]
+    matched = _find_search_matches(g, search_term, language, text_type, whole_words)
+    page, next_cursor = _paginate_matches(matched, cursor, limit)
+
+    lines = (
+        json.dumps(result, ensure_ascii=False) + "\n"
+        for result in _iter_search_results(
+            g, page, language, text_type, language_translations, SEARCH_STREAM_BATCH_SIZE
+        )
+    )
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers=_search_headers(len(matched), next_cursor),
+    )
+
+
+@router.get("/pool-stats")
+def get_pool_stats() -> dict:
+    """
+    Connection pool usage of this worker, for sizing workers and pools
+    """
+    return pool_stats()
 
-        search_results.append(search_result)
 
-    return search_results
+@router.get("/cache-stats")
+def get_cache_stats() -> dict:
+    """
+    Response cache usage of this worker
+    """
+    return get_response_cache().stats()
@@ -0,0 +1,36 @@
+"""
+Arabic text normalisation.
+
+Folding strips diacritics, Quranic annotation marks and tatweel and unifies letter variants
+(alef forms, hamza carriers, alef maksura, ta marbuta), so that differently written forms of
+a word compare equal. Non-Arabic text is only case folded.
+"""
+
+import re
+
+# harakat, tanween, shadda, sukun, superscript alef, Quranic annotation marks and tatweel
+_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+
+_LETTER_MAP = str.maketrans(
+    {
+        "\u0622": "\u0627",  # alef with madda -> alef
+        "\u0623": "\u0627",  # alef with hamza above -> alef
+        "\u0625": "\u0627",  # alef with hamza below -> alef
+        "\u0671": "\u0627",  # alef wasla -> alef
+        "\u0672": "\u0627",  # alef with wavy hamza above -> alef
+        "\u0673": "\u0627",  # alef with wavy hamza below -> alef
+        "\u0624": "\u0648",  # waw with hamza -> waw
+        "\u0626": "\u064a",  # ya with hamza -> ya
+        "\u0649": "\u064a",  # alef maksura -> ya
+        "\u06cc": "\u064a",  # farsi ya -> ya
+        "\u0629": "\u0647",  # ta marbuta -> ha
+        "\u06c0": "\u0647",  # heh with ya above -> ha
+        "\u06a9": "\u0643",  # keheh -> kaf
+    }
+)
+
+
+def fold_text(text: str) -> str:
+    "Return the canonical folded form of a text used for matching"
+
+    return _DIACRITICS_RE.sub("", text).translate(_LETTER_MAP).casefold()
@@ -98,7 +98,7 @@ async def callback(request: Request, session: Session = Depends(get_session)):
 
 
 @router.get("/me")
-async def me(
+def me(
     access_token: str | None = Cookie(default=None),
     session: Session = Depends(get_session),
 ):
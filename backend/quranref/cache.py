@@ -0,0 +1,197 @@
+"""
+Server side cache of serialised API responses.
+
+Entries are the JSON bodies (and headers) of the expensive handlers, keyed by the endpoint and
+its normalised parameters and tagged with the corpus version they were built from. The local
+cache is an LRU bounded by the total size of the cached bodies; entries also expire after a
+TTL. When the corpus version changes every older entry is dropped.
+
+With ``RESPONSE_CACHE_SHARED=true`` entries are also written to the unlogged response_cache
+table, so uvicorn workers (and swarm replicas) warm each other's caches.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .db import raw_connection
+from .settings import get_settings
+
+
+class CachedResponse:
+    "Serialised response body and its extra headers"
+
+    __slots__ = ("body", "headers", "size")
+
+    def __init__(self, body: bytes, headers: dict[str, str] | None = None):
+        self.body = body
+        self.headers = headers or {}
+        self.size = len(body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+class PostgresCacheBackend:
+    "Response cache shared between processes through the response_cache table"
+
+    def get(self, key: str, version: str) -> CachedResponse | None:
+        with raw_connection() as conn:
+            row = conn.execute(
+                "SELECT body, headers FROM response_cache "
+                "WHERE key = %s AND version = %s AND expires_at > now()",
+                (key, version),
+            ).fetchone()
+
+        if row is None:
+            return None
+        body, headers = row
+        if isinstance(headers, str):
+            headers = json.loads(headers)
+        return CachedResponse(bytes(body), headers)
+
+    def set(self, key: str, version: str, value: CachedResponse, ttl: float) -> None:
+        with raw_connection() as conn:
+            conn.execute(
+                "INSERT INTO response_cache (key, version, expires_at, body, headers) "
+                "VALUES (%s, %s, now() + make_interval(secs => %s), %s, %s) "
+                "ON CONFLICT (key) DO UPDATE SET version = EXCLUDED.version, "
+                "expires_at = EXCLUDED.expires_at, body = EXCLUDED.body, "
+                "headers = EXCLUDED.headers",
+                (key, version, ttl, value.body, json.dumps(value.headers)),
+            )
+            conn.commit()
+
+    def purge(self, version: str) -> None:
+        "Delete entries of other corpus versions and expired entries"
+
+        with raw_connection() as conn:
+            conn.execute(
+                "DELETE FROM response_cache WHERE version <> %s OR expires_at <= now()",
+                (version,),
+            )
+            conn.commit()
+
+
+class ResponseCache:
+    "LRU/TTL cache of responses with a memory budget, optionally backed by a shared backend"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        shared: PostgresCacheBackend | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._bytes = 0
+        self._version = ""
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0}
+
+    def _check_version(self, version: str) -> None:
+        "Drop everything cached for an older corpus version"
+
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+        if self.shared is not None:
+            self.shared.purge(version)
+
+    def get(self, key: str, version: str) -> CachedResponse | None:
+        self._check_version(version)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return value
+                self._remove(key)
+
+        if self.shared is not None:
+            value = self.shared.get(key, version)
+            if value is not None:
+                self._store(key, value)
+                with self._lock:
+                    self.counters["shared_hits"] += 1
+                return value
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, key: str, version: str, value: CachedResponse) -> None:
+        self._check_version(version)
+        if version != self._version:
+            return
+
+        self._store(key, value)
+        if self.shared is not None:
+            self.shared.set(key, version, value, self.ttl)
+
+    def _store(self, key: str, value: CachedResponse) -> None:
+        if value.size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._bytes += value.size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1].size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "shared": self.shared is not None,
+                **self.counters,
+            }
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_settings()
+                _cache = ResponseCache(
+                    settings.response_cache_max_bytes,
+                    settings.response_cache_ttl,
+                    shared=PostgresCacheBackend() if settings.response_cache_shared else None,
+                )
+    return _cache
+
+
+def clear_response_cache() -> None:
+    if _cache is not None:
+        _cache.clear()
@@ -1,6 +1,7 @@
 import typer
 
 from .app_init import app_init
+from .commands import bench as cmd_bench
 from .commands import db as cmd_db
 from .commands import post_process as cmd_post_process
 
@@ -9,6 +10,7 @@ app.add_typer(cmd_db.app, name="db", help="Manage database structure")
 app.add_typer(
     cmd_post_process.app, name="post-process", help="Data post processing after import(s)"
 )
+app.add_typer(cmd_bench.app, name="bench", help="Benchmark a running API server")
 
 
 def cli_init(ctx: typer.Context):
@@ -0,0 +1,125 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+import typer
+from rich import print
+from rich.table import Table
+
+from .. import API_BASE
+
+app = typer.Typer(name="Benchmarks")
+
+DEFAULT_PATHS = [
+    "/text/1/arabic:simple-clean_english:maududi",
+    "/text/2:1-50/arabic:simple-clean_english:maududi",
+    "/search/الله/arabic:simple-clean/english:maududi?limit=50",
+]
+
+
+async def _run(
+    base_url: str, paths: list[str], concurrency: int, requests: int
+) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return elapsed, latencies, errors
+
+
+def _summary(elapsed: float, latencies: list[float]) -> tuple[float, float, float, float]:
+    "req/s, p50, p95 and max latency (ms) of one run"
+
+    latencies = sorted(latencies)
+    return (
+        len(latencies) / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        latencies[-1] * 1000,
+    )
+
+
+def _delta(value: float, baseline: float) -> str:
+    return f"{(value - baseline) / baseline * 100:+.1f}%" if baseline else "-"
+
+
+@app.command(name="http")
+def http(
+    base_url: str = typer.Option(
+        "http://localhost:41148", help="Server to benchmark (start it separately)"
+    ),
+    compare_url: str = typer.Option(
+        None,
+        help="Second server to benchmark against base-url, e.g. started with another "
+        "THREADPOOL_SIZE or DB pool size; the deltas are relative to base-url",
+    ),
+    path: list[str] = typer.Option(
+        None, help=f"API path (relative to {API_BASE}) to request, can be repeated"
+    ),
+    concurrency: list[int] = typer.Option(
+        [1, 8, 32], help="Concurrent clients, can be repeated to compare levels"
+    ),
+    requests: int = typer.Option(200, help="Requests per concurrency level"),
+):
+    """Measure API throughput and latency at different concurrency levels.
+
+    Throughput should grow with concurrency while requests overlap their database I/O; if it
+    stays flat, requests are being serialised (event loop blocking or pool/threadpool limits).
+    With --compare-url both servers are run at every level and the changes in req/s and p95
+    latency are reported.
+    """
+
+    paths = [f"{API_BASE}{p}" for p in (path or DEFAULT_PATHS)]
+
+    title = f"{base_url} - {requests} requests per level"
+    if compare_url:
+        title = f"{compare_url} vs {title}"
+    table = Table(title=title)
+    columns = ["concurrency", "req/s", "p50 ms", "p95 ms", "max ms", "errors"]
+    if compare_url:
+        columns += ["cmp req/s", "cmp p95 ms", "cmp errors", "req/s delta", "p95 delta"]
+    for column in columns:
+        table.add_column(column, justify="right")
+
+    for level in concurrency:
+        elapsed, latencies, errors = asyncio.run(_run(base_url, paths, level, requests))
+        rate, p50, p95, slowest = _summary(elapsed, latencies)
+        row = [
+            str(level),
+            f"{rate:.1f}",
+            f"{p50:.1f}",
+            f"{p95:.1f}",
+            f"{slowest:.1f}",
+            str(errors),
+        ]
+        if compare_url:
+            elapsed, latencies, cmp_errors = asyncio.run(
+                _run(compare_url, paths, level, requests)
+            )
+            cmp_rate, _cmp_p50, cmp_p95, _cmp_slowest = _summary(elapsed, latencies)
+            row += [
+                f"{cmp_rate:.1f}",
+                f"{cmp_p95:.1f}",
+                str(cmp_errors),
+                _delta(cmp_rate, rate),
+                _delta(cmp_p95, p95),
+            ]
+        table.add_row(*row)
+
+    print(table)
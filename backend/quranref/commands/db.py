@@ -1,13 +1,61 @@
-import bz2
 import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from itertools import batched
 from pathlib import Path
 
+import psycopg
 import typer
 from rich import print
+from rich.table import Table
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
 
 from ..data.surah_info import surah_info
+from ..data_files import (
+    COMPRESSIONS,
+    FORMATS,
+    data_file_name,
+    find_data_file,
+    iter_records,
+    read_manifest,
+    verify_manifest,
+    write_manifest,
+    write_records,
+)
 from ..db import get_db, graph as get_graph, GRAPH_NAME, raw_connection
+from ..graph_bulk import add_edges, add_vertices, vertex_ids
+from ..meta import bump_corpus_version, get_corpus_version
+from ..query_plans import (
+    DEFAULT_MIN_SEQ_SCAN_ROWS,
+    explain as explain_query,
+    hot_queries,
+    seq_scans,
+)
+from ..settings import get_settings
+from ..text_import import (
+    DEFAULT_BATCH_SIZE,
+    import_text_entries,
+    imported_files,
+    infer_text_spec,
+    link_texts,
+    parse_text_file,
+    prepare_text_import,
+    record_imported_file,
+)
+from ..text_search import refresh_aya_texts
 from ..models import Aya, AyaText, HasAya, HasWord, Surah, Text, Word
+from ..utils import file_digest
+from ..word_index import refresh_word_positions
+from ..word_stats import refresh_word_frequencies, top_words
 
 app = typer.Typer(name="Database structure related operations")
 
@@ -45,12 +93,91 @@ def init():
     g.create_index(Word, "word")
     g.create_index(Word, "count")
 
+    # Expression indexes matching the property access of AGE's compiled Cypher, which the
+    # json based indexes above (used by the SQL helpers) do not serve
+    _create_agtype_index(g, Surah.__label__, ["id"])
+    _create_agtype_index(g, Aya.__label__, ["id"])
+    _create_agtype_index(g, Aya.__label__, ["aya_number"])
+    _create_agtype_index(g, Word.__label__, ["word"])
+    _create_agtype_index(g, AyaText.__label__, ["language", "text_type"])
+    for edge_cls in [HasAya, HasWord, AyaText]:
+        _create_edge_endpoint_indexes(g, edge_cls.__label__)
+
     # Run SQL migrations (creates/updates users, meta_info, bookmarks, etc.)
     migrate()
 
     print("[green]Database initialization done.[/green]")
 
 
+def _create_agtype_index(g, label: str, fields: list[str]) -> None:
+    "Index properties of a label the way AGE accesses them in compiled Cypher"
+
+    expressions = ", ".join(
+        f"ag_catalog.agtype_access_operator(VARIADIC ARRAY[properties, '\"{field}\"'::agtype])"
+        for field in fields
+    )
+    with raw_connection() as conn:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{g.name}_{label}_{'_'.join(fields)}_agtype "
+            f'ON {g.name}."{label}" ({expressions})'
+        )
+        conn.commit()
+
+
+def _create_edge_endpoint_indexes(g, label: str) -> None:
+    with raw_connection() as conn:
+        for column in ["start_id", "end_id"]:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{g.name}_{label}_{column} "
+                f'ON {g.name}."{label}" ({column})'
+            )
+        conn.commit()
+
+
+@app.command()
+def explain(
+    surah: int = typer.Option(2, help="Surah of the sample text queries"),
+    language: str = typer.Option("arabic:simple-clean", help="language:text_type of the samples"),
+    word: str = typer.Option(None, help="Sample word (default: the most frequent word)"),
+    min_rows: int = typer.Option(
+        DEFAULT_MIN_SEQ_SCAN_ROWS, help="Flag sequential scans reading at least this many rows"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", help="Print the full plans"),
+):
+    """EXPLAIN (ANALYZE, BUFFERS) the API's hot queries and flag sequential scans
+
+    Exits with status 1 when a query scans a large table sequentially.
+    """
+    g = get_graph()
+    lang, text_type = language.split(":", 1)
+    if word is None:
+        top = top_words(1)
+        word = top[0][0] if top else "الله"
+
+    table = Table("Query", "Time (ms)", "Shared hit/read", "Sequential scans")
+    flagged = 0
+    for name, (sql, params) in hot_queries(g, surah, lang, text_type, word).items():
+        plan = explain_query(sql, params)
+        scans = seq_scans(plan, min_rows)
+        flagged += bool(scans)
+        table.add_row(
+            name,
+            f"{plan['Execution Time']:.2f}",
+            f"{plan.get('Shared Hit Blocks', 0)}/{plan.get('Shared Read Blocks', 0)}",
+            "[red]" + ", ".join(f"{rel} ({rows} rows)" for rel, rows in scans) + "[/red]"
+            if scans
+            else "[green]none[/green]",
+        )
+        if verbose:
+            print(f"[blue]{name}[/blue]")
+            print(plan)
+
+    print(table)
+    if flagged:
+        print(f"[red]{flagged} queries scan tables sequentially.[/red]")
+        raise typer.Exit(1)
+
+
 @app.command(name="populate-surahs")
 def populate_surahs():
     "Populate Surahs"
@@ -88,315 +215,463 @@ def import_text(
         file_okay=True,
         readable=True,
     ),
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows per insert statement"),
 ):
     "Import Arabic text or other language translations for Ayas"
 
-    if file_name.suffix == ".bz2":
-        fp = bz2.open(file_name, "rt")
-    else:
-        fp = open(file_name, "r")
-
-    bismillah_text = ''
-    current_surah = ''
-
     g = get_graph()
+    started = time.perf_counter()
+
+    entries = parse_text_file(file_name)
+    print(f"[blue]Parsed {len(entries)} ayas from {file_name.name}[/blue]")
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+    ) as progress:
+        task = progress.add_task("Linking texts", total=len(entries))
+
+        counts = import_text_entries(
+            g,
+            entries,
+            language,
+            text_name,
+            batch_size=batch_size,
+            on_progress=lambda count: progress.advance(task, count),
+        )
+        progress.update(task, completed=len(entries))
 
-    for line in fp:
-        if not line.strip():
-            break
-
-        surah, aya, content = line.split('|', 2)
-        content = content.strip()
-
-        if not bismillah_text:
-            bismillah_text = content
-
-        if current_surah != surah:
-            current_surah = surah
-            if content.startswith(bismillah_text):
-                if content[len(bismillah_text):].strip():
-                    bismillah_aya_doc = Aya.get_or_new(g, surah_number=int(surah), aya_number=0)
-                    AyaText.new(g, bismillah_aya_doc, bismillah_text, language, text_name)
+    refresh_aya_texts(g, language, text_name)
+    record_imported_file(file_name, file_digest(file_name), language, text_name)
+    bump_corpus_version()
 
-                    content = content[len(bismillah_text):].strip()
+    elapsed = time.perf_counter() - started
+    print(
+        f"[green]{language}-{text_name} text imported: {counts['edges']} ayas linked, "
+        f"{counts['texts']} new texts, {counts['ayas']} new ayas, {counts['skipped']} already "
+        f"present, in {elapsed:.1f}s ({len(entries) / elapsed:.0f} ayas/s).[/green]"
+    )
 
-        if content:
-            aya_doc = Aya.get_or_new(g, surah_number=int(surah), aya_number=int(aya))
-            AyaText.new(g, aya_doc, content, language, text_name)
 
-    fp.close()
+@app.command(name="import-dir")
+def import_dir(
+    directory: Path = typer.Argument(
+        ...,
+        help="Directory of text files named like ur.maududi.txt.bz2 (language code.text name).",
+        exists=True,
+        dir_okay=True,
+        file_okay=False,
+        readable=True,
+    ),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Processes parsing files"),
+    connections: int = typer.Option(4, help="Concurrent database writers"),
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows per insert statement"),
+    force: bool = typer.Option(False, help="Also import files already imported unchanged"),
+):
+    "Import every text file of a directory, inferring language and text type from file names"
 
-    print(f"[green]{language}-{text_name} text imported.[/green]")
+    g = get_graph()
+    started = time.perf_counter()
+
+    recorded = imported_files()
+    pending = []
+    for file_name in sorted(directory.iterdir()):
+        if not file_name.name.endswith((".txt", ".txt.bz2")):
+            continue
+        digest = file_digest(file_name)
+        if not force and recorded.get(file_name.name, {}).get("sha256") == digest:
+            print(f"[yellow]  {file_name.name} already imported, skipping[/yellow]")
+            continue
+        pending.append((file_name, digest))
+
+    # Vertex creation is serialised (concurrent imports could create the same Aya/Text);
+    # edges of different files are inserted concurrently over at most `connections`
+    # connections. A file that cannot be read/parsed or written is reported and skipped.
+    vertex_lock = threading.Lock()
+
+    def write(file_name: Path, entries: list[tuple[int, int, str]]):
+        language, text_type = infer_text_spec(file_name)
+        with vertex_lock:
+            plan = prepare_text_import(g, entries, language, text_type, batch_size)
+        return language, text_type, link_texts(g, plan, batch_size)
+
+    # parsed files waiting for a writer are held in memory, so parse only a few files ahead
+    window = workers + connections
+    files = iter(pending)
+    parsing = {}
+    writing = {}
+    imported: set[tuple[str, str]] = set()
+    failed = []
+    total_lines = 0
+
+    with (
+        ProcessPoolExecutor(max_workers=workers) as parsers,
+        ThreadPoolExecutor(max_workers=connections) as writers,
+        Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+        ) as progress,
+    ):
+        task = progress.add_task("Importing files", total=len(pending))
+
+        def fill_window():
+            while len(parsing) + len(writing) < window:
+                item = next(files, None)
+                if item is None:
+                    return
+                parsing[parsers.submit(parse_text_file, item[0])] = item
+
+        fill_window()
+        while parsing or writing:
+            done, _not_done = wait([*parsing, *writing], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    file_name, digest = parsing.pop(future)
+                    try:
+                        entries = future.result()
+                    except (OSError, EOFError, ValueError) as exc:
+                        failed.append(file_name.name)
+                        progress.console.print(f"[red]  {file_name.name}: {exc}[/red]")
+                        progress.advance(task)
+                        continue
+                    total_lines += len(entries)
+                    writing[writers.submit(write, file_name, entries)] = (file_name, digest)
+                    continue
+
+                file_name, digest = writing.pop(future)
+                try:
+                    language, text_type, edges = future.result()
+                except (ValueError, psycopg.Error) as exc:
+                    failed.append(file_name.name)
+                    progress.console.print(f"[red]  {file_name.name}: {exc}[/red]")
+                else:
+                    record_imported_file(file_name, digest, language, text_type)
+                    imported.add((language, text_type))
+                    progress.console.print(
+                        f"  {file_name.name}: {edges} ayas linked as {language}:{text_type}"
+                    )
+                progress.advance(task)
+            fill_window()
+
+    for language, text_type in sorted(imported):
+        refresh_aya_texts(g, language, text_type)
+    if imported:
+        bump_corpus_version()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"[green]{len(pending) - len(failed)} files imported in {elapsed:.1f}s "
+        f"({total_lines / elapsed:.0f} ayas/s).[/green]"
+    )
+    if failed:
+        print(f"[red]{len(failed)} files failed: {', '.join(failed)}[/red]")
+        raise typer.Exit(code=1)
 
 
 @app.command(name="import-json")
 def import_json(
     data_dir: Path = typer.Argument(
         ...,
-        help="Path to directory containing JSON export files.",
+        help="Path to directory containing JSON export files (.json arrays or .ndjson[.zst|.bz2]).",
         exists=True,
         dir_okay=True,
         file_okay=False,
         readable=True,
     ),
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows per insert statement"),
 ):
     "Bulk import data from JSON exports (from ArangoDB migration)"
 
+    manifest = read_manifest(data_dir)
+    if manifest is not None:
+        print("[blue]Verifying manifest checksums...[/blue]")
+        try:
+            verify_manifest(data_dir, manifest)
+        except ValueError as exc:
+            print(f"[red]{exc}[/red]")
+            raise typer.Exit(1)
+
+    def data_file(name: str) -> Path | None:
+        if manifest is not None:
+            entry = manifest["files"].get(name)
+            return data_dir / entry["file"] if entry else None
+        return find_data_file(data_dir, name)
+
     g = get_graph()
+    for vertex_cls in [Surah, Aya, Text, Word]:
+        g.ensure_label(vertex_cls)
+    for edge_cls in [HasAya, HasWord, AyaText]:
+        g.ensure_label(edge_cls, kind="e")
 
-    # 1. Import Surahs
-    surahs_file = data_dir / "surahs.json"
-    if surahs_file.exists():
-        print("[blue]Importing surahs...[/blue]")
-        with open(surahs_file) as f:
-            surahs_data = json.load(f)
-        surahs = [
-            Surah(
-                id=s["_key"],
-                surah_number=s["surah_number"],
-                arabic_name=s["arabic_name"],
-                english_name=s["english_name"],
-                translated_name=s["translated_name"],
-                nuzool_location=s["nuzool_location"],
-                nuzool_order=s["nuzool_order"],
-                rukus=s["rukus"],
-                total_ayas=s["total_ayas"],
-            )
-            for s in surahs_data
-        ]
-        g.bulk_add(surahs)
-        print(f"[green]  {len(surahs)} surahs imported.[/green]")
-
-    # 2. Import Ayas
-    ayas_file = data_dir / "ayas.json"
-    if ayas_file.exists():
-        print("[blue]Importing ayas...[/blue]")
-        with open(ayas_file) as f:
-            ayas_data = json.load(f)
-        ayas = [
-            Aya(
-                id=a["_key"],
-                surah_key=a["surah_key"],
-                aya_number=a["aya_number"],
-            )
-            for a in ayas_data
-        ]
-        g.bulk_add(ayas)
-        print(f"[green]  {len(ayas)} ayas imported.[/green]")
-
-    # 3. Import Texts
-    texts_file = data_dir / "texts.json"
-    if texts_file.exists():
-        print("[blue]Importing texts...[/blue]")
-        with open(texts_file) as f:
-            texts_data = json.load(f)
-        texts = [
-            Text(id=t["_key"], text=t["text"])
-            for t in texts_data
-        ]
-        g.bulk_add(texts)
-        print(f"[green]  {len(texts)} texts imported.[/green]")
-
-    # 4. Import Words
-    words_file = data_dir / "words.json"
-    if words_file.exists():
-        print("[blue]Importing words...[/blue]")
-        with open(words_file) as f:
-            words_data = json.load(f)
-        words = [
-            Word(id=w["_key"], word=w["word"], count=w.get("count", 1))
-            for w in words_data
-        ]
-        g.bulk_add(words)
-        print(f"[green]  {len(words)} words imported.[/green]")
-
-    # Build lookup maps for edge import (id string → graph_id)
+    # Files are streamed record by record and written in batches, so memory use stays
+    # bounded by the batch size and the id -> graph id lookup maps.
+
+    def import_vertices(name: str, label: str, to_vertex) -> None:
+        path = data_file(name)
+        if path is None:
+            return
+        print(f"[blue]Importing {name}...[/blue]")
+        vertices = (to_vertex(r).model_dump(mode="json") for r in iter_records(path))
+        added = add_vertices(g, label, vertices, batch_size)
+        print(f"[green]  {len(added)} {name} imported.[/green]")
+
+    def import_edges(name: str, to_edges) -> None:
+        path = data_file(name)
+        if path is None:
+            return
+        print(f"[blue]Importing {name}...[/blue]")
+        totals: dict[str, int] = {}
+        edges = (edge for r in iter_records(path) for edge in to_edges(r))
+        for batch in batched(edges, batch_size):
+            by_label: dict[str, list] = {}
+            for label, start, end, props in batch:
+                by_label.setdefault(label, []).append((start, end, props))
+            for label, label_edges in by_label.items():
+                totals[label] = totals.get(label, 0) + add_edges(g, label, label_edges)
+            print(f"  ... {sum(totals.values())} edges imported so far")
+        for label, total in totals.items():
+            print(f"[green]  {total} {label} edges imported.[/green]")
+
+    # 1-4. Vertices
+    import_vertices(
+        "surahs",
+        Surah.__label__,
+        lambda s: Surah(
+            id=s["_key"],
+            surah_number=s["surah_number"],
+            arabic_name=s["arabic_name"],
+            english_name=s["english_name"],
+            translated_name=s["translated_name"],
+            nuzool_location=s["nuzool_location"],
+            nuzool_order=s["nuzool_order"],
+            rukus=s["rukus"],
+            total_ayas=s["total_ayas"],
+        ),
+    )
+    import_vertices(
+        "ayas",
+        Aya.__label__,
+        lambda a: Aya(id=a["_key"], surah_key=a["surah_key"], aya_number=a["aya_number"]),
+    )
+    import_vertices(
+        "texts",
+        Text.__label__,
+        lambda t: Text(id=t["_key"], text=t["text"]),
+    )
+    import_vertices(
+        "words",
+        Word.__label__,
+        lambda w: Word(id=w["_key"], word=w["word"], count=w.get("count", 1)),
+    )
+
+    # Lookup maps for edge import (id property -> graph id)
     print("[blue]Building vertex lookup maps...[/blue]")
-    surah_map = {s.id: s for s in g.query(Surah).all()}
-    aya_map = {a.id: a for a in g.query(Aya).all()}
-    text_map = {t.id: t for t in g.query(Text).all()}
-    word_map = {w.id: w for w in g.query(Word).all()}
-
-    # 5. Import HAS_AYA edges (Surah→Aya) and HAS_WORD edges (Aya→Word) from has_edges.json
-    has_file = data_dir / "has_edges.json"
-    if has_file.exists():
-        print("[blue]Importing has edges (HAS_AYA + HAS_WORD)...[/blue]")
-        with open(has_file) as f:
-            has_data = json.load(f)
-
-        has_aya_triples = []
-        has_word_triples = []
-
-        for e in has_data:
-            from_col, from_key = e["_from"].split("/", 1)
-            to_col, to_key = e["_to"].split("/", 1)
-
-            if from_col == "surahs" and to_col == "ayas":
-                surah = surah_map.get(from_key)
-                aya = aya_map.get(to_key)
-                if surah and aya:
-                    has_aya_triples.append((surah, HasAya(), aya))
-            elif from_col == "ayas" and to_col == "words":
-                aya = aya_map.get(from_key)
-                word = word_map.get(to_key)
-                if aya and word:
-                    has_word_triples.append((aya, HasWord(), word))
-
-        if has_aya_triples:
-            g.bulk_add_edges(has_aya_triples)
-            print(f"[green]  {len(has_aya_triples)} HAS_AYA edges imported.[/green]")
-        if has_word_triples:
-            g.bulk_add_edges(has_word_triples)
-            print(f"[green]  {len(has_word_triples)} HAS_WORD edges imported.[/green]")
-
-    # 6. Import AYA_TEXT edges (Aya→Text) — batched to avoid OOM on small servers
-    aya_texts_file = data_dir / "aya_texts_edges.json"
-    if aya_texts_file.exists():
-        print("[blue]Importing AYA_TEXT edges...[/blue]")
-        with open(aya_texts_file) as f:
-            aya_texts_data = json.load(f)
-
-        batch_size = 50_000
-        total = 0
-        aya_text_triples = []
-        for e in aya_texts_data:
-            _from_col, from_key = e["_from"].split("/", 1)
-            _to_col, to_key = e["_to"].split("/", 1)
-
-            aya = aya_map.get(from_key)
-            text = text_map.get(to_key)
-            if aya and text:
-                edge = AyaText(language=e["language"], text_type=e["text_type"])
-                aya_text_triples.append((aya, edge, text))
-
-            if len(aya_text_triples) >= batch_size:
-                g.bulk_add_edges(aya_text_triples)
-                total += len(aya_text_triples)
-                print(f"  ... {total} AYA_TEXT edges imported so far")
-                aya_text_triples = []
-
-        if aya_text_triples:
-            g.bulk_add_edges(aya_text_triples)
-            total += len(aya_text_triples)
-        print(f"[green]  {total} AYA_TEXT edges imported.[/green]")
-
-    # 7. Import meta_info
-    meta_file = data_dir / "meta_info.json"
-    if meta_file.exists():
+    surah_ids = vertex_ids(g, Surah.__label__)
+    aya_ids = vertex_ids(g, Aya.__label__)
+    word_ids = vertex_ids(g, Word.__label__)
+
+    # 5. HAS_AYA edges (Surah→Aya) and HAS_WORD edges (Aya→Word)
+    def has_edges(e: dict):
+        from_col, from_key = e["_from"].split("/", 1)
+        to_col, to_key = e["_to"].split("/", 1)
+        if from_col == "surahs" and to_col == "ayas":
+            start, end, label = surah_ids.get(from_key), aya_ids.get(to_key), HasAya.__label__
+            props = {}
+        elif from_col == "ayas" and to_col == "words":
+            start, end, label = aya_ids.get(from_key), word_ids.get(to_key), HasWord.__label__
+            props = {"generation": e.get("generation", 0)}
+        else:
+            return
+        if start is not None and end is not None:
+            yield label, start, end, props
+
+    import_edges("has_edges", has_edges)
+
+    # 6. AYA_TEXT edges (Aya→Text)
+    text_ids = vertex_ids(g, Text.__label__)
+
+    def aya_text_edges(e: dict):
+        start = aya_ids.get(e["_from"].split("/", 1)[1])
+        end = text_ids.get(e["_to"].split("/", 1)[1])
+        if start is not None and end is not None:
+            props = {"language": e["language"], "text_type": e["text_type"]}
+            yield AyaText.__label__, start, end, props
+
+    import_edges("aya_texts_edges", aya_text_edges)
+
+    # 7. meta_info
+    meta_file = data_file("meta_info")
+    if meta_file is not None:
         print("[blue]Importing meta_info...[/blue]")
-        with open(meta_file) as f:
-            meta_data = json.load(f)
+        meta_count = 0
         with raw_connection() as conn:
-            for rec in meta_data:
+            for rec in iter_records(meta_file):
                 conn.execute(
                     "INSERT INTO meta_info (key, value) VALUES (%s, %s) "
                     "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value",
                     (rec["_key"], json.dumps(rec["value"])),
                 )
+                meta_count += 1
             conn.commit()
-        print(f"[green]  {len(meta_data)} meta_info records imported.[/green]")
-
+        print(f"[green]  {meta_count} meta_info records imported.[/green]")
+
+    print("[blue]Refreshing aya_texts search table...[/blue]")
+    refresh_aya_texts(g)
+    # word_positions is derived from the texts and not part of the export
+    print("[blue]Rebuilding word positions...[/blue]")
+    refresh_word_positions(g)
+    print("[blue]Refreshing word frequencies...[/blue]")
+    refresh_word_frequencies(g)
+    bump_corpus_version()
     print("[green]JSON import complete![/green]")
 
 
+def _export_sources(graph_name: str) -> dict[str, tuple[str, Callable[[tuple], dict]]]:
+    "Entity file name -> (SQL query over the label tables, row -> exported record)"
+
+    def props(alias: str) -> str:
+        return f"{alias}.properties::text::json"
+
+    def key(alias: str) -> str:
+        return f"({props(alias)}->>'id')"
+
+    def vertices(label: str) -> str:
+        return f'SELECT {props("v")} FROM {graph_name}."{label}" AS v ORDER BY v.id'
+
+    def edges(label: str, start: str, end: str) -> str:
+        return (
+            f'FROM {graph_name}."{label}" AS e '
+            f'JOIN {graph_name}."{start}" AS s ON s.id = e.start_id '
+            f'JOIN {graph_name}."{end}" AS t ON t.id = e.end_id'
+        )
+
+    surah_fields = [
+        "surah_number", "arabic_name", "english_name", "translated_name",
+        "nuzool_location", "nuzool_order", "rukus", "total_ayas",
+    ]
+    return {
+        "surahs": (
+            vertices(Surah.__label__),
+            lambda r: {"_key": r[0]["id"], **{f: r[0].get(f) for f in surah_fields}},
+        ),
+        "ayas": (
+            vertices(Aya.__label__),
+            lambda r: {
+                "_key": r[0]["id"], "surah_key": r[0]["surah_key"], "aya_number": r[0]["aya_number"]
+            },
+        ),
+        "texts": (
+            vertices(Text.__label__),
+            lambda r: {"_key": r[0]["id"], "text": r[0]["text"]},
+        ),
+        "words": (
+            vertices(Word.__label__),
+            lambda r: {"_key": r[0]["id"], "word": r[0]["word"], "count": r[0].get("count", 1)},
+        ),
+        "has_edges": (
+            (
+                f"SELECT 'surahs/' || {key('s')}, 'ayas/' || {key('t')}, NULL::int "
+                f"{edges(HasAya.__label__, Surah.__label__, Aya.__label__)} "
+                "UNION ALL "
+                f"SELECT 'ayas/' || {key('s')}, 'words/' || {key('t')}, "
+                f"coalesce(({props('e')}->>'generation')::int, 0) "
+                f"{edges(HasWord.__label__, Aya.__label__, Word.__label__)}"
+            ),
+            lambda r: {
+                "_from": r[0], "_to": r[1], **({} if r[2] is None else {"generation": r[2]})
+            },
+        ),
+        "aya_texts_edges": (
+            (
+                f"SELECT {key('s')}, {key('t')}, "
+                f"{props('e')}->>'language', "
+                f"{props('e')}->>'text_type' "
+                f"{edges(AyaText.__label__, Aya.__label__, Text.__label__)}"
+            ),
+            lambda r: {
+                "_from": f"ayas/{r[0]}", "_to": f"texts/{r[1]}", "language": r[2], "text_type": r[3]
+            },
+        ),
+        "meta_info": (
+            "SELECT key, value FROM meta_info ORDER BY key",
+            lambda r: {"_key": r[0], "value": r[1]},
+        ),
+    }
+
+
+def _stream_rows(cursor_name: str, query: str, itersize: int) -> Iterator[tuple]:
+    "Yield the rows of a query from a server side cursor, fetching itersize rows at a time"
+
+    with raw_connection() as conn, conn.cursor(name=cursor_name) as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query)
+        yield from cursor
+
+
 @app.command(name="export-json")
 def export_json(
     output_dir: Path = typer.Argument(
         ...,
         help="Path to directory where JSON export files will be written.",
     ),
+    fmt: str = typer.Option(
+        "json", "--format", help=f"File format: {', '.join(FORMATS)}"
+    ),
+    compression: str = typer.Option(
+        "none", help=f"Compression of the entity files: {', '.join(COMPRESSIONS)}"
+    ),
+    workers: int = typer.Option(
+        0, help="Entity files written at a time (default: all, limited by the DB pool size)"
+    ),
+    itersize: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows fetched per cursor round trip"),
 ):
-    "Export all graph data and meta_info to JSON files"
+    """Export all graph data and meta_info to JSON files, with a manifest.json
+
+    Rows are streamed from server side cursors straight to disk, every entity file in its own
+    worker thread.
+    """
+    if fmt not in FORMATS:
+        raise typer.BadParameter(f"Unknown format {fmt}", param_hint="--format")
+    if compression not in COMPRESSIONS:
+        raise typer.BadParameter(f"Unknown compression {compression}", param_hint="--compression")
 
     output_dir.mkdir(parents=True, exist_ok=True)
     g = get_graph()
-
-    # 1. Export Surahs
-    surahs = g.query(Surah).all()
-    surahs_data = [
-        {
-            "_key": s.id,
-            "surah_number": s.surah_number,
-            "arabic_name": s.arabic_name,
-            "english_name": s.english_name,
-            "translated_name": s.translated_name,
-            "nuzool_location": s.nuzool_location,
-            "nuzool_order": s.nuzool_order,
-            "rukus": s.rukus,
-            "total_ayas": s.total_ayas,
+    sources = _export_sources(g.name)
+    workers = workers or min(len(sources), get_settings().db_pool_max_size)
+
+    def export_entity(name: str, query: str, to_record: Callable[[tuple], dict]) -> dict:
+        file_name = data_file_name(name, fmt, compression)
+        rows = write_records(
+            output_dir / file_name,
+            (to_record(row) for row in _stream_rows(f"export_{name}", query, itersize)),
+        )
+        return {"file": file_name, "rows": rows, "sha256": file_digest(output_dir / file_name)}
+
+    start = time.perf_counter()
+    files = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(export_entity, name, query, to_record): name
+            for name, (query, to_record) in sources.items()
         }
-        for s in surahs
-    ]
-    _write_json(output_dir / "surahs.json", surahs_data)
-    print(f"[green]  {len(surahs_data)} surahs exported.[/green]")
-
-    # 2. Export Ayas
-    ayas = g.query(Aya).all()
-    ayas_data = [
-        {"_key": a.id, "surah_key": a.surah_key, "aya_number": a.aya_number}
-        for a in ayas
-    ]
-    _write_json(output_dir / "ayas.json", ayas_data)
-    print(f"[green]  {len(ayas_data)} ayas exported.[/green]")
-
-    # 3. Export Texts
-    texts = g.query(Text).all()
-    texts_data = [{"_key": t.id, "text": t.text} for t in texts]
-    _write_json(output_dir / "texts.json", texts_data)
-    print(f"[green]  {len(texts_data)} texts exported.[/green]")
-
-    # 4. Export Words
-    words = g.query(Word).all()
-    words_data = [{"_key": w.id, "word": w.word, "count": w.count} for w in words]
-    _write_json(output_dir / "words.json", words_data)
-    print(f"[green]  {len(words_data)} words exported.[/green]")
-
-    # 5. Export HAS_AYA and HAS_WORD edges
-    has_aya_rows = g.cypher(
-        "MATCH (s:Surah)-[e:HAS_AYA]->(a:Aya) RETURN s.id, a.id",
-        columns=["surah_id", "aya_id"],
-    )
-    has_word_rows = g.cypher(
-        "MATCH (a:Aya)-[e:HAS_WORD]->(w:Word) RETURN a.id, w.id",
-        columns=["aya_id", "word_id"],
-    )
-    has_edges = [
-        {"_from": f"surahs/{r['surah_id']}", "_to": f"ayas/{r['aya_id']}"}
-        for r in has_aya_rows
-    ] + [
-        {"_from": f"ayas/{r['aya_id']}", "_to": f"words/{r['word_id']}"}
-        for r in has_word_rows
-    ]
-    _write_json(output_dir / "has_edges.json", has_edges)
-    print(f"[green]  {len(has_edges)} has edges exported.[/green]")
+        for future in as_completed(futures):
+            name = futures[future]
+            files[name] = future.result()
+            print(f"[green]  {files[name]['rows']} {name} records exported.[/green]")
 
-    # 6. Export AYA_TEXT edges
-    aya_text_rows = g.cypher(
-        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) RETURN a.id, t.id, e.language, e.text_type",
-        columns=["aya_id", "text_id", "language", "text_type"],
-    )
-    aya_texts_data = [
+    write_manifest(
+        output_dir,
         {
-            "_from": f"ayas/{r['aya_id']}",
-            "_to": f"texts/{r['text_id']}",
-            "language": r["language"],
-            "text_type": r["text_type"],
-        }
-        for r in aya_text_rows
-    ]
-    _write_json(output_dir / "aya_texts_edges.json", aya_texts_data)
-    print(f"[green]  {len(aya_texts_data)} AYA_TEXT edges exported.[/green]")
-
-    # 7. Export meta_info
-    with raw_connection() as conn:
-        cursor = conn.execute("SELECT key, value FROM meta_info")
-        meta_data = [{"_key": row[0], "value": row[1]} for row in cursor.fetchall()]
-    _write_json(output_dir / "meta_info.json", meta_data)
-    print(f"[green]  {len(meta_data)} meta_info records exported.[/green]")
-
-    print(f"[green]Export complete! Files written to {output_dir}[/green]")
-
-
-def _write_json(path: Path, data: list) -> None:
-    with open(path, "w") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+            "format": fmt,
+            "compression": compression,
+            "corpus_version": get_corpus_version(),
+            "files": {name: files[name] for name in sources},
+        },
+    )
+    elapsed = time.perf_counter() - start
+    print(f"[green]Export complete in {elapsed:.1f}s! Files written to {output_dir}[/green]")
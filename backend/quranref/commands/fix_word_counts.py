@@ -1,64 +1,42 @@
 """Fix word counts by recalculating from actual aya edges."""
 
+import time
+
 from rich import print
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..db import graph as get_graph
+from ..meta import bump_corpus_version
+from ..word_index import fix_word_counts as fix_counts, word_count_diff
+from ..word_stats import refresh_word_frequencies
+
+# words listed by a dry run
+DRY_RUN_SAMPLE_SIZE = 50
 
 
-def fix_word_counts():
+def fix_word_counts(dry_run: bool = False):
     """Recalculate word counts from actual aya-word edges."""
 
     g = get_graph()
+    start = time.perf_counter()
+
+    if dry_run:
+        diff = word_count_diff(g)
+        elapsed = time.perf_counter() - start
+        for word, stored, ayas in diff[:DRY_RUN_SAMPLE_SIZE]:
+            print(f"  {word}: {stored} -> {ayas}")
+        if len(diff) > DRY_RUN_SAMPLE_SIZE:
+            print(f"  ... and {len(diff) - DRY_RUN_SAMPLE_SIZE} more")
+        print(f"[yellow]{len(diff)} word counts would change ({elapsed:.2f}s).[/yellow]")
+        return
 
     print("[yellow]Recalculating word counts from edges...[/yellow]")
+    fixed_count = fix_counts(g)
+    elapsed = time.perf_counter() - start
+    print(f"[green]Fixed {fixed_count} word counts in {elapsed:.2f}s![/green]")
 
-    # Get count of HAS_WORD edges per word using Cypher
-    results = g.cypher(
-        "MATCH (a:Aya)-[:HAS_WORD]->(w:Word) "
-        "RETURN id(w) as word_gid, w.word as word, count(a) as edge_count",
-        columns=["word_gid", "word", "edge_count"],
-        return_type="raw",
-    )
-
-    edge_counts = {r["word_gid"]: r["edge_count"] for r in results}
-    print(f"[blue]Found {len(edge_counts)} words with edges[/blue]")
-
-    # Get all words
-    from ..models import Word
-    all_words = g.query(Word).all()
-    print(f"[blue]Total words: {len(all_words)}[/blue]")
-
-    fixed_count = 0
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True,
-    ) as progress:
-        task = progress.add_task("Fixing counts...", total=len(all_words))
-
-        for word in all_words:
-            actual_count = edge_counts.get(word.graph_id, 0)
-
-            if word.count != actual_count:
-                word.count = actual_count
-                g.update(word)
-                fixed_count += 1
-
-            progress.advance(task)
-
-    print(f"[green]Fixed {fixed_count} word counts![/green]")
-
-    # Verify with a sample
-    print("\n[yellow]Verification sample:[/yellow]")
-    sample = g.cypher(
-        "MATCH (w:Word) WHERE w.word = $word RETURN w.word, w.count",
-        columns=["word", "count"],
-        return_type="raw",
-        word="كاشف",
-    )
-    for r in sample:
-        print(f"  {r}")
+    if fixed_count:
+        refresh_word_frequencies(g)
+        bump_corpus_version()
 
 
 if __name__ == "__main__":
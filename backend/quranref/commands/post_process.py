@@ -1,117 +1,100 @@
 import json
+import time
 
 import typer
 from rich import print
 
 from ..db import graph as get_graph, raw_connection
-from ..models import Aya, AyaText, HasAya, HasWord, Surah, Text, Word
-from ..utils import text_to_digest
+from ..graph_bulk import DEFAULT_BATCH_SIZE, add_edges, vertex_ids
+from ..meta import bump_corpus_version
+from ..text_import import remove_bismillah
+from ..text_search import refresh_aya_texts
+from ..models import AyaText, HasAya, Surah
+from ..word_index import rebuild_words, update_words
+from ..word_stats import refresh_word_frequencies
 
 app = typer.Typer(name="Data post processing after import(s)")
 
 
 @app.command(name="link-ayas-to-surahs")
-def link_ayas_to_surahs():
-    "Link Ayas to Surahs via HAS_AYA edges"
+def link_ayas_to_surahs(
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows per insert statement"),
+):
+    "Link Ayas to Surahs via HAS_AYA edges, adding only the missing ones"
 
     g = get_graph()
+    g.ensure_label(HasAya, kind="e")
+
+    surah_ids = vertex_ids(g, Surah.__label__)
+    ayas = g.cypher("MATCH (a:Aya) RETURN id(a), a.surah_key", columns=["gid", "surah_key"])
+    linked = {
+        (r["surah_gid"], r["aya_gid"])
+        for r in g.cypher(
+            "MATCH (s:Surah)-[:HAS_AYA]->(a:Aya) RETURN id(s), id(a)",
+            columns=["surah_gid", "aya_gid"],
+        )
+    }
 
-    surahs = g.query(Surah).all()
-    for surah in surahs:
-        ayas = g.query(Aya).filter_by(surah_key=surah.id).all()
-        triples = [(surah, HasAya(), aya) for aya in ayas]
-        if triples:
-            g.bulk_add_edges(triples)
-
+    missing = []
+    unknown_surah = 0
+    for aya in ayas:
+        surah_gid = surah_ids.get(aya["surah_key"])
+        if surah_gid is None:
+            unknown_surah += 1
+        elif (surah_gid, aya["gid"]) not in linked:
+            missing.append((surah_gid, aya["gid"], {}))
+
+    created = add_edges(g, HasAya.__label__, missing, batch_size)
+    print(
+        f"[blue]{created} HAS_AYA edges created, {len(ayas) - len(missing) - unknown_surah} "
+        f"ayas already linked, {unknown_surah} ayas without a surah[/blue]"
+    )
     print("[green]Done![/green]")
 
 
 @app.command(name="make-words")
-def make_words():
+def make_words(
+    full: bool = typer.Option(
+        False,
+        "--full",
+        help="Build a new word generation from every aya's text and switch over to it",
+    ),
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows per insert statement"),
+):
     """Extract words from Ayas and store them in the database.
 
     This command is idempotent - running it multiple times will produce
-    the same result. It clears existing word data before rebuilding.
+    the same result. Only ayas whose simple-clean text changed since the last
+    run are processed. With --full the words are rebuilt next to the live ones
+    and swapped in at the end, so the word endpoints never see partial data.
     """
 
     g = get_graph()
 
-    # Clear existing word-related data to ensure idempotency
-    print("[yellow]Clearing existing word data for clean rebuild...[/yellow]")
-
-    # Remove all HAS_WORD edges
-    g.cypher("MATCH ()-[e:HAS_WORD]->() DELETE e")
-
-    # Remove all Word vertices
-    g.cypher("MATCH (w:Word) DELETE w")
-
     print("[blue]Extracting words from ayas...[/blue]")
+    start = time.perf_counter()
+    if full:
+        changes = rebuild_words(g, batch_size)
+        print(f"[blue]Word generation {changes.pop('generation')} is live.[/blue]")
+    else:
+        changes = update_words(g, batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"[blue]{changes['ayas']} ayas processed: "
+        f"{changes['words_added']} words added, {changes['words_removed']} removed, "
+        f"{changes['counts_updated']} counts updated, "
+        f"{changes['edges_added']} HAS_WORD edges added, {changes['edges_removed']} removed "
+        f"in {elapsed:.1f}s[/blue]"
+    )
 
-    ayas = g.query(Aya).all()
-    word_counts: dict[str, int] = {}
-    aya_words_map: dict[str, list[str]] = {}  # aya.id -> list of word hashes
-
-    for aya in ayas:
-        if aya.aya_number == 0:
-            continue
-
-        # Get simple-clean text for this aya
-        results = g.cypher(
-            "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
-            "WHERE a.id = $aya_id AND e.text_type = $text_type "
-            "RETURN t.text",
-            columns=["text"],
-            return_type="raw",
-            aya_id=aya.id,
-            text_type="simple-clean",
-        )
-
-        if not results:
-            continue
-
-        aya_text = results[0]["text"]
-        print("Processing Aya:", aya.id)
-
-        aya_word_hashes = []
-        seen_in_aya: set[str] = set()
-        for word_str in aya_text.split(" "):
-            word_hash = text_to_digest(word_str)
-            aya_word_hashes.append(word_hash)
-            # Count each unique word once per aya (matches HAS_WORD edge semantics)
-            if word_str not in seen_in_aya:
-                seen_in_aya.add(word_str)
-                word_counts[word_str] = word_counts.get(word_str, 0) + 1
-
-        aya_words_map[aya.id] = aya_word_hashes
-
-    # Bulk create word vertices
-    print("[blue]Creating word vertices...[/blue]")
-    word_objects = {}
-    words_to_add = []
-    for word_str, count in word_counts.items():
-        w = Word.new(word=word_str, count=count)
-        words_to_add.append(w)
-        word_objects[text_to_digest(word_str)] = w
-
-    g.bulk_add(words_to_add)
-
-    # Bulk create HAS_WORD edges
-    print("[blue]Creating HAS_WORD edges...[/blue]")
-    aya_map = {a.id: a for a in ayas}
-    edge_triples = []
-    seen_edges: set[tuple[str, str]] = set()
-
-    for aya_id, word_hashes in aya_words_map.items():
-        aya = aya_map[aya_id]
-        for wh in word_hashes:
-            edge_key = (aya_id, wh)
-            if edge_key not in seen_edges:
-                seen_edges.add(edge_key)
-                word_obj = word_objects[wh]
-                edge_triples.append((aya, HasWord(), word_obj))
-
-    if edge_triples:
-        g.bulk_add_edges(edge_triples)
+    if not full:
+        if not changes["texts"]:
+            print("[green]No aya text changed, nothing to do.[/green]")
+            return
+        print("[blue]Refreshing word frequencies...[/blue]")
+        refresh_word_frequencies(g)
+    bump_corpus_version()
 
     print("[green]Done![/green]")
 
@@ -145,80 +128,55 @@ def update_meta_info():
         )
         conn.commit()
 
+    bump_corpus_version()
     print("[green]Text types updated![/green]")
 
 
-@app.command(name="fix-word-counts")
-def fix_word_counts_cmd():
-    """Recalculate word counts from actual aya-word edges."""
-    from .fix_word_counts import fix_word_counts as _fix
-    _fix()
-
-
-@app.command(name="remove-bismillah")
-def remove_bismillah():
-    "Remove bismillah from the arabic of first aya of each Surah"
+@app.command(name="refresh-aya-texts")
+def refresh_aya_texts_cmd(
+    language: str = typer.Option(None, help="Only refresh this language"),
+    text_type: str = typer.Option(None, help="Only refresh this text type"),
+):
+    "Rebuild the aya_texts search table from the graph"
 
     g = get_graph()
+    total = refresh_aya_texts(g, language, text_type)
+    print(f"[green]{total} aya_texts rows refreshed![/green]")
 
-    # Get available arabic text types from meta_info
-    with raw_connection() as conn:
-        result = conn.execute(
-            "SELECT value FROM meta_info WHERE key = %s", ("text-types",)
-        ).fetchone()
-
-    if not result:
-        print("[red]No text-types found in meta_info. Run update-meta-info first.[/red]")
-        return
-
-    text_types_data = result[0] if isinstance(result[0], dict) else json.loads(result[0])
-    arabic_text_types = text_types_data.get("arabic", [])
-
-    for arabic_text_type in arabic_text_types:
-        # Get bismillah text from aya 1:1
-        results = g.cypher(
-            "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
-            "WHERE a.id = $aya_id AND e.language = $lang AND e.text_type = $tt "
-            "RETURN t.text, id(t) as text_gid",
-            columns=["text", "text_gid"],
-            return_type="raw",
-            aya_id="1:1",
-            lang="arabic",
-            tt=arabic_text_type,
-        )
 
-        if not results:
-            continue
+@app.command(name="refresh-word-frequencies")
+def refresh_word_frequencies_cmd():
+    "Rebuild the word_frequencies table and word count histogram from the Word vertices"
+
+    g = get_graph()
+    total = refresh_word_frequencies(g)
+    bump_corpus_version()
+    print(f"[green]{total} word_frequencies rows refreshed![/green]")
 
-        bismillah_text = results[0]["text"]
 
-        # Process first aya of surahs 2 to 114
-        for surah_number in range(2, 115):
-            aya_key = f"{surah_number}:1"
-            results = g.cypher(
-                "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
-                "WHERE a.id = $aya_id AND e.language = $lang AND e.text_type = $tt "
-                "RETURN t.text, id(t) as text_gid",
-                columns=["text", "text_gid"],
-                return_type="raw",
-                aya_id=aya_key,
-                lang="arabic",
-                tt=arabic_text_type,
-            )
+@app.command(name="fix-word-counts")
+def fix_word_counts_cmd(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only list the counts that are wrong"),
+):
+    """Recalculate word counts from actual aya-word edges."""
+    from .fix_word_counts import fix_word_counts as _fix
+    _fix(dry_run)
 
-            if not results:
-                continue
 
-            aya_text = results[0]["text"]
-            text_gid = results[0]["text_gid"]
+@app.command(name="remove-bismillah")
+def remove_bismillah_cmd(
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, help="Rows per statement"),
+):
+    "Remove bismillah from the arabic of first aya of each Surah"
 
-            if aya_text.startswith(bismillah_text):
-                print(f"Removing bismillah from surah {surah_number}, aya: 1, {aya_text}")
-                new_text = aya_text[len(bismillah_text):].strip()
+    g = get_graph()
 
-                # Update the text vertex
-                text_vertex = g.query(Text).by_id(text_gid)
-                text_vertex.text = new_text
-                g.update(text_vertex)
+    start = time.perf_counter()
+    changed = remove_bismillah(g, "arabic", batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"[blue]Bismillah removed from {changed} ayas in {elapsed:.2f}s[/blue]")
 
+    if changed:
+        refresh_aya_texts(g, language="arabic")
+        bump_corpus_version()
     print("[green]Done![/green]")
@@ -0,0 +1,234 @@
+"""
+Positional word index (concordance) of the simple-clean Arabic text.
+
+make-words stores every word's occurrences as two packed arrays of unsigned 16 bit integers
+in the word_positions table: the ordinals (mushaf order) of the ayas it occurs in and its
+token positions there. The aya keys in ordinal order are kept in meta_info under
+"word-position-ayas". Workers load the table into memory and rebuild every aya's token
+sequence from it, so keyword-in-context, phrase and proximity queries need no text fetches.
+Each word's distinct aya ordinals are kept as a sorted posting list, which the ayas-by-word
+endpoint intersects (all words) or merges (any word) to find ayas.
+"""
+
+import heapq
+import logging
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+
+from .db import raw_connection
+from .meta import current_corpus_version, get_meta_info, set_meta_info
+from .utils import aya_sort_key
+
+log = logging.getLogger(__name__)
+
+# meta_info key holding the aya keys of the word_positions ordinals, in mushaf order
+WORD_POSITION_AYAS_KEY = "word-position-ayas"
+
+_TYPECODE = "H"
+
+
+def pack(values: Iterable[int]) -> bytes:
+    "Little endian unsigned 16 bit integers"
+
+    packed = array(_TYPECODE, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack(data: bytes) -> array:
+    packed = array(_TYPECODE)
+    packed.frombytes(data)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def word_positions(
+    aya_words: dict[str, list[str]],
+) -> tuple[list[str], dict[str, tuple[array, array]]]:
+    "Aya keys in mushaf order and word -> (aya ordinals, token positions) of the ayas' words"
+
+    aya_keys = sorted(aya_words, key=aya_sort_key)
+    positions: dict[str, tuple[array, array]] = {}
+    for ordinal, aya_key in enumerate(aya_keys):
+        for position, word in enumerate(aya_words[aya_key]):
+            ordinals, token_positions = positions.setdefault(
+                word, (array(_TYPECODE), array(_TYPECODE))
+            )
+            ordinals.append(ordinal)
+            token_positions.append(position)
+    return aya_keys, positions
+
+
+def store_word_positions(conn, aya_words: dict[str, list[str]]) -> int:
+    """Replace the word_positions rows with the positions of the ayas' words, in order.
+
+    Runs in the connection's transaction. Returns the number of words stored.
+    """
+    aya_keys, positions = word_positions(aya_words)
+
+    conn.execute("DELETE FROM word_positions")
+    with conn.cursor().copy("COPY word_positions (word, ordinals, positions) FROM STDIN") as copy:
+        for word, (ordinals, token_positions) in positions.items():
+            copy.write_row((word, pack(ordinals), pack(token_positions)))
+    set_meta_info(WORD_POSITION_AYAS_KEY, aya_keys, conn)
+    return len(positions)
+
+
+def intersect_postings(postings: list[Sequence]) -> list:
+    "Ordinals (or other sortable aya references) found in every sorted posting list"
+
+    if not postings:
+        return []
+
+    postings = sorted(postings, key=len)
+    matched = []
+    starts = [0] * len(postings)
+    for ordinal in postings[0]:
+        for i, others in enumerate(postings[1:], start=1):
+            starts[i] = bisect_left(others, ordinal, starts[i])
+            if starts[i] == len(others) or others[starts[i]] != ordinal:
+                break
+        else:
+            matched.append(ordinal)
+    return matched
+
+
+def merge_postings(postings: list[Sequence]) -> list:
+    "Ordinals (or other sortable aya references) found in any of the sorted posting lists"
+
+    merged: list = []
+    for ordinal in heapq.merge(*postings):
+        if not merged or merged[-1] != ordinal:
+            merged.append(ordinal)
+    return merged
+
+
+class ConcordanceIndex:
+    "Word occurrences and the token sequence of every aya, addressed by aya ordinal"
+
+    def __init__(
+        self, aya_keys: list[str], positions: dict[str, tuple[array, array]], version: str = ""
+    ):
+        self.version = version
+        self.aya_keys: tuple[str, ...] = tuple(aya_keys)
+        self.positions = positions
+
+        # word -> sorted ordinals of the ayas containing it
+        self.postings: dict[str, array] = {
+            word: array(_TYPECODE, sorted(set(ordinals)))
+            for word, (ordinals, _token_positions) in positions.items()
+        }
+
+        tokens: list[list[str]] = [[] for _ in self.aya_keys]
+        for word, (ordinals, token_positions) in positions.items():
+            for ordinal, position in zip(ordinals, token_positions):
+                aya_tokens = tokens[ordinal]
+                if position >= len(aya_tokens):
+                    aya_tokens.extend([""] * (position + 1 - len(aya_tokens)))
+                aya_tokens[position] = word
+        self.tokens: tuple[tuple[str, ...], ...] = tuple(tuple(t) for t in tokens)
+
+    def __len__(self) -> int:
+        return len(self.aya_keys)
+
+    def occurrences(self, word: str) -> list[tuple[int, int]]:
+        "(aya ordinal, token position) of every occurrence of the word, in mushaf order"
+
+        ordinals, token_positions = self.positions.get(word, ((), ()))
+        return list(zip(ordinals, token_positions))
+
+    def phrase(self, words: list[str]) -> list[tuple[int, int]]:
+        "(aya ordinal, start position) of every occurrence of the words in a row"
+
+        if not words:
+            return []
+
+        # Start from the rarest word and check its neighbours in the aya's tokens
+        anchor = min(range(len(words)), key=lambda i: len(self.occurrences(words[i])))
+        matches = []
+        for ordinal, position in self.occurrences(words[anchor]):
+            start = position - anchor
+            if start >= 0 and self.tokens[ordinal][start:start + len(words)] == tuple(words):
+                matches.append((ordinal, start))
+        return sorted(matches)
+
+    def near(self, words: list[str], other: str, distance: int) -> list[tuple[int, int]]:
+        "Occurrences of the phrase with the other word at most distance tokens before/after it"
+
+        matches = []
+        for ordinal, start in self.phrase(words):
+            aya_tokens = self.tokens[ordinal]
+            end = start + len(words)
+            before = aya_tokens[max(start - distance, 0):start]
+            after = aya_tokens[end:end + distance]
+            if other in before or other in after:
+                matches.append((ordinal, start))
+        return matches
+
+    def kwic(self, ordinal: int, start: int, length: int, window: int) -> dict:
+        "Keyword in context line of length tokens at start, with window tokens on each side"
+
+        aya_tokens = self.tokens[ordinal]
+        end = start + length
+        return {
+            "aya_key": self.aya_keys[ordinal],
+            "position": start,
+            "left": " ".join(aya_tokens[max(start - window, 0):start]),
+            "keyword": " ".join(aya_tokens[start:end]),
+            "right": " ".join(aya_tokens[end:end + window]),
+        }
+
+    @classmethod
+    def load(cls, version: str = "") -> "ConcordanceIndex":
+        "Load the word_positions table"
+
+        started = time.perf_counter()
+        aya_keys = get_meta_info(WORD_POSITION_AYAS_KEY, [])
+        with raw_connection() as conn:
+            rows = conn.execute("SELECT word, ordinals, positions FROM word_positions").fetchall()
+
+        index = cls(
+            aya_keys,
+            {word: (unpack(ordinals), unpack(positions)) for word, ordinals, positions in rows},
+            version=version,
+        )
+        log.info(
+            f"Loaded concordance of {len(index)} ayas and {len(index.positions)} words "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return index
+
+
+_index: ConcordanceIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_concordance_index() -> ConcordanceIndex:
+    """Return the loaded index, (re)loading it when the corpus version changed.
+
+    An empty index (make-words not run yet) is loaded again on the next call.
+    """
+    global _index
+
+    version = current_corpus_version()
+    index = _index
+    if index is None or index.version != version or not index.positions:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != version or not index.positions:
+                index = ConcordanceIndex.load(version)
+                _index = index
+    return index
+
+
+def clear_concordance_index() -> None:
+    global _index
+
+    with _index_lock:
+        _index = None
@@ -0,0 +1,163 @@
+"""
+Reading and writing the JSON export files used by import-json/export-json.
+
+An entity file holds one JSON object per record, either as a single JSON array
+(``texts.json``) or as newline delimited JSON (``texts.ndjson``), optionally compressed
+(``texts.ndjson.zst``, ``texts.ndjson.bz2``). Files are read and written incrementally, so
+memory use does not depend on the file size.
+
+export-json also writes a ``manifest.json`` with the row count and SHA-256 of every entity
+file, which import-json checks before importing anything.
+"""
+
+import bz2
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+from .utils import file_digest
+
+FORMATS = {"json": ".json", "ndjson": ".ndjson"}
+COMPRESSIONS = {"none": "", "bz2": ".bz2", "zstd": ".zst"}
+MANIFEST_FILE = "manifest.json"
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def data_file_name(name: str, fmt: str = "json", compression: str = "none") -> str:
+    "File name of an entity file, e.g. ('texts', 'ndjson', 'zstd') -> 'texts.ndjson.zst'"
+
+    return f"{name}{FORMATS[fmt]}{COMPRESSIONS[compression]}"
+
+
+def find_data_file(data_dir: Path, name: str) -> Path | None:
+    "Path of the entity file (e.g. name='texts') in any supported format, None if missing"
+
+    for fmt in FORMATS:
+        for compression in COMPRESSIONS:
+            path = data_dir / data_file_name(name, fmt, compression)
+            if path.exists():
+                return path
+    return None
+
+
+def _zstd_module():
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        try:
+            import zstandard as zstd
+        except ImportError:
+            raise RuntimeError(
+                "Reading/writing .zst files needs Python 3.14+ or the zstandard package "
+                "(pip install quranref[zstd])"
+            ) from None
+    return zstd
+
+
+def open_data_file(path: Path, mode: str = "rt") -> TextIO:
+    "Open an entity file as text, (de)compressing according to its suffix"
+
+    if path.suffix == ".bz2":
+        return bz2.open(path, mode, encoding="utf-8")
+    if path.suffix == ".zst":
+        return _zstd_module().open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _is_ndjson(path: Path) -> bool:
+    return FORMATS["ndjson"] in path.suffixes
+
+
+def _iter_json_array(fp: TextIO) -> Iterator[Any]:
+    "Yield the items of a top level JSON array, reading the file in chunks"
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while not buffer:
+        chunk = fp.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            raise ValueError("Expected a JSON array")
+        buffer = chunk.lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array")
+    buffer = buffer[1:]
+
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(","):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith("]"):
+            return
+
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                pass  # item continues in the next chunk
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+
+        chunk = fp.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            raise ValueError("Unexpected end of JSON array")
+        buffer += chunk
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    "Yield the records of an entity file one at a time"
+
+    with open_data_file(path) as fp:
+        if _is_ndjson(path):
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(fp)
+
+
+def write_records(path: Path, records: Iterable[dict]) -> int:
+    "Write records to an entity file in the format given by its suffixes, returning their count"
+
+    rows = 0
+    with open_data_file(path, "wt") as fp:
+        if _is_ndjson(path):
+            for record in records:
+                fp.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                fp.write("\n")
+                rows += 1
+        else:
+            fp.write("[")
+            for record in records:
+                fp.write(",\n  " if rows else "\n  ")
+                fp.write(json.dumps(record, ensure_ascii=False))
+                rows += 1
+            fp.write("\n]\n" if rows else "]\n")
+    return rows
+
+
+def write_manifest(data_dir: Path, manifest: dict) -> None:
+    with open(data_dir / MANIFEST_FILE, "w", encoding="utf-8") as fp:
+        json.dump(manifest, fp, ensure_ascii=False, indent=2)
+
+
+def read_manifest(data_dir: Path) -> dict | None:
+    path = data_dir / MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def verify_manifest(data_dir: Path, manifest: dict) -> None:
+    "Raise ValueError if an entity file listed in the manifest is missing or was changed"
+
+    for name, entry in manifest.get("files", {}).items():
+        path = data_dir / entry["file"]
+        if not path.exists():
+            raise ValueError(f"{entry['file']} ({name}) listed in the manifest is missing")
+        if file_digest(path) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for {entry['file']}")
@@ -1,7 +1,7 @@
 from collections.abc import Generator
 
 from age_orm import Database, Graph
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from .settings import get_settings
@@ -9,21 +9,47 @@ from .settings import get_settings
 GRAPH_NAME = "quran_graph"
 
 _db: Database | None = None
+_graph: Graph | None = None
 _engine = None
 _session_factory = None
+_engine_counters = {"connects": 0, "checkouts": 0}
+
+
+def _connect_options() -> dict:
+    "libpq connection parameters shared by the graph and SQLAlchemy pools"
+
+    settings = get_settings()
+    if settings.db_statement_timeout:
+        return {"options": f"-c statement_timeout={settings.db_statement_timeout}"}
+    return {}
 
 
 def get_db() -> Database:
     global _db
     if _db is None:
         settings = get_settings()
-        _db = Database(settings.db_dsn)
+        # age-orm configures every new pool connection once (LOAD 'age' and search_path),
+        # so checkouts need no per-request setup.
+        _db = Database(
+            settings.db_dsn,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            max_idle=settings.db_pool_max_idle,
+            timeout=settings.db_pool_timeout,
+            kwargs=_connect_options(),
+            name="graph",
+        )
     return _db
 
 
 def graph() -> Graph:
+    global _graph
     db = get_db()
-    return db.graph(GRAPH_NAME)
+    # db.graph() checks that the graph exists, which costs a pool checkout and a query;
+    # do that once per Database instead of on every request.
+    if _graph is None or _graph._db is not db:
+        _graph = db.graph(GRAPH_NAME)
+    return _graph
 
 
 def raw_connection():
@@ -44,10 +70,51 @@ def _sa_dsn() -> str:
 def get_engine():
     global _engine
     if _engine is None:
-        _engine = create_engine(_sa_dsn())
+        settings = get_settings()
+        _engine = create_engine(
+            _sa_dsn(),
+            pool_size=settings.sa_pool_size,
+            max_overflow=settings.sa_pool_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=True,
+            connect_args=_connect_options(),
+        )
+        event.listen(_engine, "connect", _count_engine_event("connects"))
+        event.listen(_engine, "checkout", _count_engine_event("checkouts"))
     return _engine
 
 
+def _count_engine_event(counter: str):
+    def listener(*args):
+        _engine_counters[counter] += 1
+
+    return listener
+
+
+def pool_stats() -> dict:
+    """Usage statistics of the graph (psycopg) and SQLAlchemy connection pools.
+
+    Graph pool counters come from psycopg_pool and accumulate since the pool was created:
+    requests_waiting is the current number of clients waiting for a connection and
+    requests_wait_ms the total time clients spent waiting.
+    """
+    stats = {}
+    if _db is not None:
+        stats["graph"] = _db._pool.get_stats()
+
+    if _engine is not None:
+        pool = _engine.pool
+        stats["sqlalchemy"] = {
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            **_engine_counters,
+        }
+
+    return stats
+
+
 def get_session_factory():
     global _session_factory
     if _session_factory is None:
@@ -0,0 +1,172 @@
+"""
+Set based helpers for writing to the graph's label tables.
+
+age-orm's bulk_add/bulk_add_edges cover inserts of model instances. The helpers here work
+directly on graph ids for the import and maintenance commands, which touch tens of thousands
+of vertices at a time and would otherwise issue one Cypher statement per vertex.
+"""
+
+import json
+from collections.abc import Iterable
+from itertools import batched
+
+from age_orm import Graph
+
+from .db import raw_connection
+
+DEFAULT_BATCH_SIZE = 5_000
+
+
+def set_properties(
+    g: Graph,
+    label: str,
+    updates: Iterable[tuple[int, dict]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Merge properties into existing vertices/edges of a label.
+
+    updates holds (graph_id, {property: value}) pairs; other properties are left as they are.
+    Returns the number of updated entities.
+    """
+    updated = 0
+    for batch in batched(updates, batch_size):
+        with raw_connection() as conn:
+            cursor = conn.execute(
+                f'UPDATE {g.name}."{label}" AS n '
+                "SET properties = (n.properties::text::jsonb || v.props)::text::agtype "
+                "FROM (SELECT unnest(%s::bigint[]) AS gid, unnest(%s::jsonb[]) AS props) AS v "
+                "WHERE n.id = v.gid::text::graphid",
+                (
+                    [gid for gid, _props in batch],
+                    [json.dumps(props, ensure_ascii=False) for _gid, props in batch],
+                ),
+            )
+            updated += cursor.rowcount
+            conn.commit()
+    return updated
+
+
+def find_vertex_ids(
+    g: Graph, label: str, keys: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> dict[str, int]:
+    """Map vertices' id properties to their graph ids.
+
+    Looks the keys up through the unique (properties->>'id') index created by db init.
+    Keys without a vertex are left out.
+    """
+    found = {}
+    with raw_connection() as conn:
+        for batch in batched(keys, batch_size):
+            rows = conn.execute(
+                f"SELECT properties::text::json->>'id', id::text::bigint "
+                f'FROM {g.name}."{label}" '
+                "WHERE (properties::text::json->>'id') = ANY(%s)",
+                (list(batch),),
+            ).fetchall()
+            found.update(rows)
+    return found
+
+
+def add_vertices(
+    g: Graph, label: str, vertices: Iterable[dict], batch_size: int = DEFAULT_BATCH_SIZE
+) -> dict[str, int]:
+    """Insert vertices given as property dicts, returning their id property -> graph id.
+
+    Unlike Graph.bulk_add, graph ids come from RETURNING, so concurrent writers to the same
+    label cannot mix them up.
+    """
+    added = {}
+    for batch in batched(vertices, batch_size):
+        with raw_connection() as conn:
+            rows = conn.execute(
+                f'INSERT INTO {g.name}."{label}" (properties) '
+                "SELECT p::agtype FROM unnest(%s::text[]) AS p "
+                "RETURNING properties::text::json->>'id', id::text::bigint",
+                ([json.dumps(props, ensure_ascii=False) for props in batch],),
+            ).fetchall()
+            conn.commit()
+        added.update(rows)
+    return added
+
+
+def add_edges(
+    g: Graph,
+    label: str,
+    edges: Iterable[tuple[int, int, dict]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Insert edges given as (start graph id, end graph id, properties) triples.
+
+    Returns the number of inserted edges.
+    """
+    added = 0
+    for batch in batched(edges, batch_size):
+        with raw_connection() as conn:
+            cursor = conn.execute(
+                f'INSERT INTO {g.name}."{label}" (start_id, end_id, properties) '
+                "SELECT s::text::graphid, e::text::graphid, p::agtype "
+                "FROM unnest(%s::bigint[], %s::bigint[], %s::text[]) AS v(s, e, p)",
+                (
+                    [start for start, _end, _props in batch],
+                    [end for _start, end, _props in batch],
+                    [json.dumps(props, ensure_ascii=False) for _start, _end, props in batch],
+                ),
+            )
+            added += cursor.rowcount
+            conn.commit()
+    return added
+
+
+def vertex_ids(g: Graph, label: str) -> dict[str, int]:
+    "Map the id property of every vertex of a label to its graph id"
+
+    with raw_connection() as conn:
+        rows = conn.execute(
+            f"SELECT properties::text::json->>'id', id::text::bigint FROM {g.name}.\"{label}\""
+        ).fetchall()
+    return dict(rows)
+
+
+def delete_by_ids(
+    g: Graph, label: str, gids: Iterable[int], batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """Delete vertices/edges of a label by graph id, returning the number deleted.
+
+    Deleting a vertex this way does not touch its edges; callers remove those first.
+    """
+    deleted = 0
+    for batch in batched(gids, batch_size):
+        with raw_connection() as conn:
+            cursor = conn.execute(
+                f'DELETE FROM {g.name}."{label}" '
+                "WHERE id IN (SELECT unnest(%s::bigint[])::text::graphid)",
+                (list(batch),),
+            )
+            deleted += cursor.rowcount
+            conn.commit()
+    return deleted
+
+
+def set_edge_ends(
+    g: Graph,
+    label: str,
+    ends: Iterable[tuple[int, int]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Point existing edges of a label at other end vertices.
+
+    ends holds (edge graph id, new end vertex graph id) pairs. Returns the number of updated
+    edges.
+    """
+    updated = 0
+    for batch in batched(ends, batch_size):
+        with raw_connection() as conn:
+            cursor = conn.execute(
+                f'UPDATE {g.name}."{label}" AS e SET end_id = v.end_gid::text::graphid '
+                "FROM (SELECT unnest(%s::bigint[]) AS gid, unnest(%s::bigint[]) AS end_gid) AS v "
+                "WHERE e.id = v.gid::text::graphid",
+                ([gid for gid, _end in batch], [end for _gid, end in batch]),
+            )
+            updated += cursor.rowcount
+            conn.commit()
+    return updated
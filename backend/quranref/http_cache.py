@@ -0,0 +1,65 @@
+"""
+HTTP caching for the read-only corpus endpoints.
+
+Their responses only change when an import/post-processing command changes the corpus and
+bumps the corpus version in meta_info, so the version makes a strong ETag for all of them.
+Conditional requests carrying a current ETag are answered with 304 without running the
+route, and Cache-Control lets browsers and the reverse proxy reuse responses meanwhile.
+"""
+
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from . import API_BASE
+from .meta import current_corpus_version
+from .settings import get_settings
+
+CACHEABLE_PATHS = (
+    "/letters",
+    "/surahs",
+    "/text-types",
+    "/text/",
+    "/words-by-",
+    "/ayas-by-word/",
+    "/available-word-counts",
+    "/top-most-frequent-words/",
+)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixed tags match too
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class CorpusCacheMiddleware(BaseHTTPMiddleware):
+    "ETag / Cache-Control / 304 handling for the corpus endpoints"
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        path = request.url.path
+        if request.method not in ("GET", "HEAD") or not path.startswith(
+            tuple(API_BASE + p for p in CACHEABLE_PATHS)
+        ):
+            return await call_next(request)
+
+        version = await run_in_threadpool(current_corpus_version)
+        if not version:
+            # the corpus has not been versioned yet (no import since upgrading)
+            return await call_next(request)
+
+        etag = f'"{version}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={get_settings().http_cache_max_age}",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
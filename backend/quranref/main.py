@@ -1,6 +1,8 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -11,12 +13,32 @@ from . import API_BASE
 from .api import router as api_router
 from .auth import router as auth_router
 from .bookmarks import router as bookmarks_router
+from .db import graph
+from .http_cache import CorpusCacheMiddleware
+from .search_index import preload_search_indexes
 from .settings import get_settings
+from .snapshot import get_corpus_snapshot
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    # Database access is synchronous (psycopg), so routes touching the database are plain
+    # ``def`` functions run in anyio's threadpool; its size bounds the concurrent queries.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    if settings.corpus_snapshot:
+        get_corpus_snapshot(graph())
+    if settings.search_index_preload:
+        preload_search_indexes(graph(), settings.search_index_preload)
+    yield
+
 
 app = FastAPI(
     title="QuranRef API",
     description="API for Quran Reference Application",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS for the API
@@ -30,8 +52,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
+app.add_middleware(CorpusCacheMiddleware)
+
 # Session middleware (required by authlib for OAuth state)
 settings = get_settings()
 app.add_middleware(SessionMiddleware, secret_key=settings.jwt_secret_key)
@@ -0,0 +1,84 @@
+"""
+Helpers for the meta_info key/value table.
+
+Besides the text types listing, meta_info holds the corpus version: an opaque key bumped
+by every command that changes the imported corpus. In-process caches built from the corpus
+compare against it to know when they are stale.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any
+
+from .db import raw_connection
+from .settings import get_settings
+
+CORPUS_VERSION_KEY = "corpus-version"
+
+_version_lock = threading.Lock()
+_cached_version: str | None = None
+_version_checked_at = 0.0
+
+
+def get_meta_info(key: str, default: Any = None) -> Any:
+    with raw_connection() as conn:
+        result = conn.execute("SELECT value FROM meta_info WHERE key = %s", (key,)).fetchone()
+
+    if not result:
+        return default
+
+    value = result[0]
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value
+
+
+def set_meta_info(key: str, value: Any, conn=None) -> None:
+    "Store a meta_info value; given a connection, as part of its open transaction"
+
+    if conn is None:
+        with raw_connection() as own_conn:
+            set_meta_info(key, value, own_conn)
+            own_conn.commit()
+        return
+
+    conn.execute(
+        "INSERT INTO meta_info (key, value) VALUES (%s, %s) "
+        "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value",
+        (key, json.dumps(value)),
+    )
+
+
+def get_corpus_version() -> str:
+    "Read the corpus version from the database"
+
+    return get_meta_info(CORPUS_VERSION_KEY, "")
+
+
+def bump_corpus_version() -> str:
+    "Store a new corpus version, invalidating caches built from the previous corpus"
+
+    global _cached_version
+
+    version = uuid.uuid4().hex
+    set_meta_info(CORPUS_VERSION_KEY, version)
+    with _version_lock:
+        _cached_version = None
+    return version
+
+
+def current_corpus_version() -> str:
+    """Corpus version as seen by this process.
+
+    The database is consulted at most once per ``corpus_version_check_interval`` seconds.
+    """
+    global _cached_version, _version_checked_at
+
+    interval = get_settings().corpus_version_check_interval
+    with _version_lock:
+        if _cached_version is None or time.monotonic() - _version_checked_at >= interval:
+            _cached_version = get_corpus_version()
+            _version_checked_at = time.monotonic()
+        return _cached_version
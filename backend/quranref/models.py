@@ -101,6 +101,8 @@ class HasWord(Edge):
 
     __label__ = "HAS_WORD"
 
+    generation: int = 0  # word generation the edge belongs to, see word_index
+
 
 class AyaText(Edge):
     "Links Aya to Text with language and text_type metadata"
@@ -0,0 +1,135 @@
+"""
+EXPLAIN ANALYZE of the API's hot queries, to catch missing indexes before deploy.
+
+Cypher queries are explained in the ``SELECT * FROM cypher(...)`` form age-orm runs them in,
+so the plans show which label table indexes AGE's compiled SQL uses. Sequential scans reading
+many rows usually mean a property filter is not backed by an index (see ``db init``).
+"""
+
+from age_orm import Graph
+from age_orm.utils.serialization import substitute_cypher_params
+
+from .arabic import fold_text
+from .db import raw_connection
+from .text_search import AYA_TEXTS_SQL, SURAH_TEXTS_SQL, search_query
+from .word_index import current_word_generation
+
+# sequential scans reading fewer rows (small label tables, meta_info) are not flagged
+DEFAULT_MIN_SEQ_SCAN_ROWS = 1_000
+
+_TEXT_COLUMNS = ["aya_id", "language", "text_type", "text"]
+
+
+def cypher_sql(g: Graph, statement: str, columns: list[str], **params) -> str:
+    "SQL age-orm runs for g.cypher(statement, columns, **params)"
+
+    column_clause = ", ".join(f'"{c}" agtype' for c in columns)
+    resolved = substitute_cypher_params(statement, params)
+    return f"SELECT * FROM cypher('{g.name}', $$ {resolved} $$) AS ({column_clause})"
+
+
+def hot_queries(
+    g: Graph, surah: int, language: str, text_type: str, word: str
+) -> dict[str, tuple[str, tuple | None]]:
+    """Name -> (SQL, parameters) of the queries behind the text, word and search endpoints.
+
+    ayas-by-word finds its ayas in memory (see concordance) and runs a texts by aya query,
+    falling back to the HAS_WORD edges for words the concordance does not have.
+    """
+
+    lang = {"lang": language, "tt": text_type}
+    aya_keys = [f"{surah}:{aya_number}" for aya_number in range(1, 11)]
+    queries = {
+        "text (graph)": (
+            cypher_sql(
+                g,
+                "MATCH (s:Surah)-[:HAS_AYA]->(a:Aya)-[e:AYA_TEXT]->(t:Text) "
+                "WHERE s.id = $surah AND (e.language = $lang AND e.text_type = $tt) "
+                "AND a.aya_number >= 1 AND a.aya_number <= 10 "
+                "RETURN a.id, e.language, e.text_type, t.text",
+                _TEXT_COLUMNS,
+                surah=str(surah),
+                **lang,
+            ),
+            None,
+        ),
+        "text (aya_texts)": (SURAH_TEXTS_SQL, ([language], [text_type], surah, 1, 10)),
+        "text ranges (graph)": (
+            cypher_sql(
+                g,
+                "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+                "WHERE ((a.surah_key = $surah_0 AND a.aya_number >= $start_0 "
+                "AND a.aya_number <= $end_0) OR (a.surah_key = $surah_1 "
+                "AND a.aya_number >= $start_1 AND a.aya_number <= $end_1)) "
+                "AND (e.language = $lang AND e.text_type = $tt) "
+                "RETURN a.surah_key, a.aya_number, a.id, e.language, e.text_type, t.text",
+                ["surah_key", "aya_number", *_TEXT_COLUMNS],
+                surah_0=str(surah),
+                start_0=1,
+                end_0=5,
+                surah_1=str(surah),
+                start_1=8,
+                end_1=10,
+                **lang,
+            ),
+            None,
+        ),
+        "texts by aya (graph)": (
+            cypher_sql(
+                g,
+                "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+                "WHERE a.id IN $aya_ids AND (e.language = $lang AND e.text_type = $tt) "
+                "RETURN a.id, e.language, e.text_type, t.text",
+                _TEXT_COLUMNS,
+                aya_ids=aya_keys,
+                **lang,
+            ),
+            None,
+        ),
+        "texts by aya (aya_texts)": (AYA_TEXTS_SQL, ([language], [text_type], aya_keys)),
+        "ayas by word (graph)": (
+            cypher_sql(
+                g,
+                "MATCH (a:Aya)-[h:HAS_WORD]->(w:Word) "
+                "WHERE w.word IN $words AND coalesce(h.generation, 0) = $generation "
+                "RETURN w.word, a.id",
+                ["word", "aya_id"],
+                words=[word],
+                generation=current_word_generation(),
+            ),
+            None,
+        ),
+        "words by letter": (
+            "SELECT word, count FROM word_frequencies WHERE initial = %s ORDER BY word",
+            (fold_text(word)[:1],),
+        ),
+    }
+    search = search_query(language, text_type, word)
+    if search is not None:
+        queries["search (aya_texts)"] = search
+    return queries
+
+
+def explain(sql: str, params: tuple | None = None) -> dict:
+    "Top plan node of EXPLAIN (ANALYZE, BUFFERS) of a query, with the execution time"
+
+    with raw_connection() as conn:
+        result = conn.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params).fetchone()
+        conn.rollback()
+
+    output = result[0][0]
+    return {**output["Plan"], "Execution Time": output["Execution Time"]}
+
+
+def seq_scans(plan: dict, min_rows: int = DEFAULT_MIN_SEQ_SCAN_ROWS) -> list[tuple[str, int]]:
+    "(relation, rows read) of the plan's sequential scans reading at least min_rows rows"
+
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        loops = plan.get("Actual Loops", 1)
+        rows = int((plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)) * loops)
+        if rows >= min_rows:
+            found.append((plan.get("Relation Name", "?"), rows))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, min_rows))
+    return found
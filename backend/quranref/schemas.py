@@ -17,6 +17,37 @@ class AyaResultSchema(BaseModel):
     texts: dict[str, dict[str, str]]
 
 
+class TextRangesRequest(BaseModel):
+    """
+    ayas_specs holds aya specs like "2:255", "3:18-20" or "112" (a whole surah)
+
+    languages_spec is like "arabic:simple-clean_english:maududi"
+    """
+
+    ayas_specs: list[str]
+    languages_spec: str
+
+
+class TextRangeResultSchema(BaseModel):
+    "Texts of the ayas of one requested aya spec"
+
+    ayas_spec: str
+    ayas: list[AyaResultSchema]
+
+
+class ConcordanceLineSchema(BaseModel):
+    """
+    Keyword in context line: keyword is the matched word (or phrase) at token position
+    in the aya, left and right hold up to window words before and after it
+    """
+
+    aya_key: str
+    position: int
+    left: str
+    keyword: str
+    right: str
+
+
 # --- Bookmark schemas ---
 
 
@@ -0,0 +1,192 @@
+"""
+In-process full-text index used by the search endpoint.
+
+Texts of one language/text_type are folded (see arabic.fold_text) and tokenized on whitespace
+into an inverted index (token -> aya ordinal -> token positions). Lookups preserve the
+substring semantics of the old ``t.text CONTAINS $term`` query: a single term matches any token
+containing it and a multi word term is matched as a phrase over consecutive token positions.
+"""
+
+import logging
+import threading
+import time
+
+from age_orm import Graph
+
+from .arabic import fold_text
+from .meta import current_corpus_version
+from .utils import aya_sort_key
+
+log = logging.getLogger(__name__)
+
+
+def _trigrams(token: str) -> set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    "Positional inverted index over the texts of a single language/text_type"
+
+    def __init__(
+        self, language: str, text_type: str, rows: list[tuple[str, str]], version: str = ""
+    ):
+        self.language = language
+        self.text_type = text_type
+        self.version = version
+
+        rows = sorted(rows, key=lambda r: aya_sort_key(r[0]))
+        self.aya_keys: list[str] = [aya_key for aya_key, _text in rows]
+        self.texts: list[str] = [text for _aya_key, text in rows]
+
+        # token -> {aya ordinal: (position, ...)}
+        self.postings: dict[str, dict[int, tuple[int, ...]]] = {}
+        positions: dict[str, dict[int, list[int]]] = {}
+        for ordinal, text in enumerate(self.texts):
+            for position, token in enumerate(fold_text(text).split()):
+                positions.setdefault(token, {}).setdefault(ordinal, []).append(position)
+
+        for token, token_postings in positions.items():
+            self.postings[token] = {o: tuple(p) for o, p in token_postings.items()}
+
+        # trigram -> vocabulary tokens, used to narrow substring lookups
+        self._vocab_trigrams: dict[str, set[str]] = {}
+        for token in self.postings:
+            for trigram in _trigrams(token):
+                self._vocab_trigrams.setdefault(trigram, set()).add(token)
+
+    def __len__(self) -> int:
+        return len(self.aya_keys)
+
+    def _vocab_candidates(self, fragment: str) -> set[str] | list[str]:
+        if len(fragment) < 3:
+            return list(self.postings)
+
+        candidates: set[str] | None = None
+        for trigram in _trigrams(fragment):
+            tokens = self._vocab_trigrams.get(trigram)
+            if not tokens:
+                return set()
+            candidates = set(tokens) if candidates is None else candidates & tokens
+        return candidates or set()
+
+    def _tokens_matching(self, fragment: str, mode: str) -> list[str]:
+        "Vocabulary tokens that contain, start with, end with or equal the fragment"
+
+        if mode == "exact":
+            return [fragment] if fragment in self.postings else []
+
+        candidates = self._vocab_candidates(fragment)
+        if mode == "prefix":
+            return [t for t in candidates if t.startswith(fragment)]
+        if mode == "suffix":
+            return [t for t in candidates if t.endswith(fragment)]
+        return [t for t in candidates if fragment in t]
+
+    def _merged_postings(self, tokens: list[str]) -> dict[int, set[int]]:
+        merged: dict[int, set[int]] = {}
+        for token in tokens:
+            for ordinal, token_positions in self.postings[token].items():
+                merged.setdefault(ordinal, set()).update(token_positions)
+        return merged
+
+    def search(self, term: str, whole_words: bool = False) -> list[int]:
+        """Return ordinals (in mushaf order) of the ayas whose text contains the term.
+
+        With whole_words every word of the term has to match a complete token.
+        """
+        words = fold_text(term).split()
+        if not words:
+            return []
+
+        if whole_words and len(words) == 1:
+            return sorted(self.postings.get(words[0], ()))
+
+        if len(words) == 1:
+            ordinals: set[int] = set()
+            for token in self._tokens_matching(words[0], "substring"):
+                ordinals.update(self.postings[token])
+            return sorted(ordinals)
+
+        # Phrase: the first word may be the tail of a token, the last word the head
+        # of one, and every word in between has to match a whole token.
+        if whole_words:
+            modes = ["exact"] * len(words)
+        else:
+            modes = ["suffix"] + ["exact"] * (len(words) - 2) + ["prefix"]
+        word_postings = []
+        for word, mode in zip(words, modes):
+            merged = self._merged_postings(self._tokens_matching(word, mode))
+            if not merged:
+                return []
+            word_postings.append(merged)
+
+        common = set(word_postings[0])
+        for merged in word_postings[1:]:
+            common &= merged.keys()
+
+        matched = []
+        for ordinal in common:
+            for start in word_postings[0][ordinal]:
+                if all(
+                    start + offset in merged[ordinal]
+                    for offset, merged in enumerate(word_postings[1:], start=1)
+                ):
+                    matched.append(ordinal)
+                    break
+
+        return sorted(matched)
+
+    @classmethod
+    def build(cls, g: Graph, language: str, text_type: str, version: str = "") -> "SearchIndex":
+        "Build the index from the AYA_TEXT/Text data of the given language and text type"
+
+        started = time.perf_counter()
+        results = g.cypher(
+            "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+            "WHERE e.language = $lang AND e.text_type = $tt "
+            "RETURN a.id, t.text",
+            columns=["aya_id", "text"],
+            lang=language,
+            tt=text_type,
+        )
+        index = cls(
+            language, text_type, [(r["aya_id"], r["text"]) for r in results], version=version
+        )
+        log.info(
+            f"Built search index for {language}:{text_type} with {len(index)} ayas and "
+            f"{len(index.postings)} tokens in {time.perf_counter() - started:.2f}s"
+        )
+        return index
+
+
+_indexes: dict[tuple[str, str], SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(g: Graph, language: str, text_type: str) -> SearchIndex:
+    "Return the index for the language/text_type, (re)building it when missing or stale"
+
+    key = (language, text_type)
+    version = current_corpus_version()
+    index = _indexes.get(key)
+    if index is None or index.version != version:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None or index.version != version:
+                index = SearchIndex.build(g, language, text_type, version=version)
+                _indexes[key] = index
+    return index
+
+
+def preload_search_indexes(g: Graph, languages_spec: str) -> None:
+    "Build indexes for a languages spec like 'arabic:simple-clean_english:maududi'"
+
+    for lang in languages_spec.split("_"):
+        if lang:
+            language, text_type = lang.split(":", 1)
+            get_search_index(g, language, text_type)
+
+
+def clear_search_indexes() -> None:
+    with _indexes_lock:
+        _indexes.clear()
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal
 
 from dotenv import dotenv_values
 from pydantic import Field, ValidationInfo, computed_field, field_validator
@@ -25,6 +25,19 @@ class Settings(BaseSettings):
     db_host: str = Field("localhost", env="DB_HOST")
     db_port: int = Field(5432, env="DB_PORT")
 
+    # psycopg pool used for the graph; size it to cover threadpool_size per worker
+    db_pool_min_size: int = Field(2, env="DB_POOL_MIN_SIZE")
+    db_pool_max_size: int = Field(20, env="DB_POOL_MAX_SIZE")
+    # seconds before idle connections above min size are closed
+    db_pool_max_idle: float = Field(600.0, env="DB_POOL_MAX_IDLE")
+    # seconds a request waits for a free connection before failing
+    db_pool_timeout: float = Field(30.0, env="DB_POOL_TIMEOUT")
+    # server side statement timeout in milliseconds (0 disables it)
+    db_statement_timeout: int = Field(0, env="DB_STATEMENT_TIMEOUT")
+    # SQLAlchemy pool for the relational tables (users, bookmarks)
+    sa_pool_size: int = Field(5, env="SA_POOL_SIZE")
+    sa_pool_max_overflow: int = Field(5, env="SA_POOL_MAX_OVERFLOW")
+
     debug: bool = False
 
     google_client_id: str = Field("", env="GOOGLE_CLIENT_ID")
@@ -35,6 +48,33 @@ class Settings(BaseSettings):
     frontend_url: str = Field("http://localhost:41149", env="FRONTEND_URL")
     backend_url: str = Field("http://localhost:41148", env="BACKEND_URL")
 
+    # languages spec (e.g. "arabic:simple-clean_english:maududi") whose search
+    # indexes are built at startup instead of on the first search request
+    search_index_preload: str = Field("", env="SEARCH_INDEX_PRELOAD")
+    # "index" answers searches from the in-process index, "postgres" from the aya_texts table
+    search_backend: Literal["index", "postgres"] = Field("index", env="SEARCH_BACKEND")
+    # "graph" reads aya texts (/text, /ayas-by-word, search translations) from the graph,
+    # "postgres" from the aya_texts table
+    text_backend: Literal["graph", "postgres"] = Field("graph", env="TEXT_BACKEND")
+
+    # worker threads running the (synchronous) database bound routes, per uvicorn worker
+    threadpool_size: int = Field(40, env="THREADPOOL_SIZE")
+
+    # max-age (seconds) of the corpus endpoints' responses; revalidated by ETag afterwards
+    http_cache_max_age: int = Field(86400, env="HTTP_CACHE_MAX_AGE")
+
+    # memory budget (bytes of cached JSON) of the per worker response cache, 0 disables it
+    response_cache_max_bytes: int = Field(64 * 1024 * 1024, env="RESPONSE_CACHE_MAX_BYTES")
+    # seconds a cached response stays valid (entries are also dropped on corpus changes)
+    response_cache_ttl: float = Field(3600.0, env="RESPONSE_CACHE_TTL")
+    # share cached responses between workers through the response_cache table
+    response_cache_shared: bool = Field(False, env="RESPONSE_CACHE_SHARED")
+
+    # serve /text from an in-memory corpus snapshot loaded at worker start
+    corpus_snapshot: bool = Field(False, env="CORPUS_SNAPSHOT")
+    # how often (seconds) a worker re-reads the corpus version from meta_info
+    corpus_version_check_interval: float = Field(30.0, env="CORPUS_VERSION_CHECK_INTERVAL")
+
     @computed_field
     @property
     def db_dsn(self) -> str:
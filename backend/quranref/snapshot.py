@@ -0,0 +1,140 @@
+"""
+Read-only in-memory snapshot of the Quran corpus.
+
+When snapshot serving is enabled (``CORPUS_SNAPSHOT=true``) every worker loads all aya texts
+at startup into arrays indexed by the global aya ordinal (mushaf order), one array per
+language/text_type. Text requests for a surah or aya range then become slices of those
+arrays. The snapshot is reloaded when the corpus version in meta_info changes.
+"""
+
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+from age_orm import Graph
+
+from .meta import current_corpus_version, get_meta_info
+from .schemas import AyaResultSchema
+from .utils import aya_sort_key
+
+log = logging.getLogger(__name__)
+
+
+class CorpusSnapshot:
+    "Immutable corpus texts addressed by aya ordinal"
+
+    def __init__(
+        self,
+        aya_keys: list[str],
+        texts: dict[tuple[str, str], dict[str, str]],
+        version: str = "",
+    ):
+        self.version = version
+        self.aya_keys: tuple[str, ...] = tuple(sorted(aya_keys, key=aya_sort_key))
+        self.ordinals: dict[str, int] = {k: o for o, k in enumerate(self.aya_keys)}
+        self.aya_numbers = array("H", (aya_sort_key(k)[1] for k in self.aya_keys))
+
+        # surah key -> (first ordinal, last ordinal + 1)
+        self.surah_bounds: dict[str, tuple[int, int]] = {}
+        for ordinal, aya_key in enumerate(self.aya_keys):
+            surah_key = aya_key.split(":", 1)[0]
+            start, _end = self.surah_bounds.get(surah_key, (ordinal, ordinal))
+            self.surah_bounds[surah_key] = (start, ordinal + 1)
+
+        # (language, text_type) -> texts indexed by ordinal, None where missing
+        self.texts: dict[tuple[str, str], tuple[str | None, ...]] = {}
+        for lang_key, aya_texts in texts.items():
+            self.texts[lang_key] = tuple(aya_texts.get(k) for k in self.aya_keys)
+
+    def ordinal_range(
+        self, surah_key: str, start_aya: int | None = None, end_aya: int | None = None
+    ) -> range:
+        "Ordinals of the ayas of a surah, optionally limited to an aya number range"
+
+        bounds = self.surah_bounds.get(surah_key)
+        if bounds is None:
+            return range(0)
+
+        start, end = bounds
+        if start_aya is not None:
+            start = bisect_left(self.aya_numbers, start_aya, start, end)
+        if end_aya is not None:
+            end = bisect_right(self.aya_numbers, end_aya, start, end)
+        return range(start, end)
+
+    def get_texts(
+        self, ordinals: Sequence[int], language_specs: list[tuple[str, str]]
+    ) -> list[AyaResultSchema]:
+        "Texts of the ayas at the ordinals (a range or any other sequence), in their order"
+
+        columns = [
+            (language, text_type, self.texts[(language, text_type)])
+            for language, text_type in language_specs
+            if (language, text_type) in self.texts
+        ]
+
+        results = []
+        for ordinal in ordinals:
+            aya_texts: dict[str, dict[str, str]] = {}
+            for language, text_type, texts in columns:
+                if texts[ordinal] is not None:
+                    aya_texts.setdefault(language, {})[text_type] = texts[ordinal]
+            if aya_texts:
+                results.append(AyaResultSchema(aya_key=self.aya_keys[ordinal], texts=aya_texts))
+
+        return results
+
+    @classmethod
+    def load(cls, g: Graph, version: str = "") -> "CorpusSnapshot":
+        "Load every language/text_type listed in meta_info text-types from the graph"
+
+        started = time.perf_counter()
+        aya_rows = g.cypher("MATCH (a:Aya) RETURN a.id", columns=["aya_id"])
+
+        # Text vertices are shared between ayas; keep a single string per distinct text
+        interned: dict[str, str] = {}
+        texts: dict[tuple[str, str], dict[str, str]] = {}
+        for language, text_types in get_meta_info("text-types", {}).items():
+            for text_type in text_types:
+                results = g.cypher(
+                    "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+                    "WHERE e.language = $lang AND e.text_type = $tt "
+                    "RETURN a.id, t.text",
+                    columns=["aya_id", "text"],
+                    lang=language,
+                    tt=text_type,
+                )
+                texts[(language, text_type)] = {
+                    r["aya_id"]: interned.setdefault(r["text"], r["text"]) for r in results
+                }
+
+        snapshot = cls([r["aya_id"] for r in aya_rows], texts, version=version)
+        log.info(
+            f"Loaded corpus snapshot {version or '(unversioned)'} with "
+            f"{len(snapshot.aya_keys)} ayas, {len(texts)} text types and {len(interned)} "
+            f"distinct texts in {time.perf_counter() - started:.2f}s"
+        )
+        return snapshot
+
+
+_snapshot: CorpusSnapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+def get_corpus_snapshot(g: Graph) -> CorpusSnapshot:
+    "Return the loaded snapshot, (re)loading it when the corpus version changed"
+
+    global _snapshot
+
+    version = current_corpus_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _snapshot_lock:
+            snapshot = _snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = CorpusSnapshot.load(g, version)
+                _snapshot = snapshot
+    return snapshot
@@ -1,9 +1,10 @@
-"""SQLAlchemy models for relational tables (users, meta_info, bookmarks)."""
+"""SQLAlchemy models for relational tables (users, meta_info, bookmarks, aya_texts,
+word_frequencies, word_positions, response_cache)."""
 
 from datetime import datetime
 
-from sqlalchemy import CheckConstraint, ForeignKey, Index, String, Text, text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import CheckConstraint, Computed, ForeignKey, Index, String, Text, text
+from sqlalchemy.dialects.postgresql import BYTEA, JSONB, TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -57,3 +58,92 @@ class Bookmark(Base):
         ),
         Index("idx_bookmarks_user_id", "user_id"),
     )
+
+
+class AyaTextRecord(Base):
+    """Relational mirror of the graph's AYA_TEXT edges used for indexed text search and as
+    the read model of the text endpoints (TEXT_BACKEND=postgres).
+
+    text_folded holds the normalised text (see quranref.arabic.fold_text).
+    """
+
+    __tablename__ = "aya_texts"
+
+    language: Mapped[str] = mapped_column(String, primary_key=True)
+    text_type: Mapped[str] = mapped_column(String, primary_key=True)
+    aya_id: Mapped[str] = mapped_column(String, primary_key=True)
+    surah: Mapped[int]
+    aya_number: Mapped[int]
+    text: Mapped[str] = mapped_column(Text)
+    text_folded: Mapped[str] = mapped_column(Text)
+    text_tsv: Mapped[str] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('simple', text_folded)", persisted=True)
+    )
+
+    __table_args__ = (
+        Index(
+            "idx_aya_texts_text_folded_trgm",
+            "text_folded",
+            postgresql_using="gin",
+            postgresql_ops={"text_folded": "gin_trgm_ops"},
+        ),
+        Index("idx_aya_texts_text_tsv", "text_tsv", postgresql_using="gin"),
+        Index(
+            "idx_aya_texts_range",
+            "language",
+            "text_type",
+            "surah",
+            "aya_number",
+            postgresql_include=["aya_id", "text"],
+        ),
+    )
+
+
+class WordFrequency(Base):
+    """Materialised word list with per ayas counts, served by the word browsing endpoints.
+
+    word uses the "C" collation so its ordering is codepoint order, as in Python.
+    """
+
+    __tablename__ = "word_frequencies"
+
+    word: Mapped[str] = mapped_column(String(collation="C"), primary_key=True)
+    initial: Mapped[str] = mapped_column(String)
+    count: Mapped[int]
+
+    __table_args__ = (
+        Index("idx_word_frequencies_initial", "initial", "word", postgresql_include=["count"]),
+        # serves both "count = x ORDER BY word" and "ORDER BY count DESC, word LIMIT n"
+        Index("idx_word_frequencies_count", text("count DESC"), "word"),
+    )
+
+
+class WordPosition(Base):
+    """Positional word index of the simple-clean text (see quranref.concordance).
+
+    ordinals and positions are packed arrays of little endian uint16: the ordinals of the
+    ayas the word occurs in and its token positions there, one entry per occurrence.
+    """
+
+    __tablename__ = "word_positions"
+
+    word: Mapped[str] = mapped_column(String(collation="C"), primary_key=True)
+    ordinals: Mapped[bytes] = mapped_column(BYTEA)
+    positions: Mapped[bytes] = mapped_column(BYTEA)
+
+
+class ResponseCacheEntry(Base):
+    """Cached API responses shared between workers (see quranref.cache).
+
+    Unlogged: entries are rebuilt on demand, so they are not worth WAL traffic.
+    """
+
+    __tablename__ = "response_cache"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[str] = mapped_column(String)
+    expires_at: Mapped[datetime]
+    body: Mapped[bytes] = mapped_column(BYTEA)
+    headers: Mapped[dict] = mapped_column(JSONB)
+
+    __table_args__ = ({"prefixes": ["UNLOGGED"]},)
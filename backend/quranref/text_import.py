@@ -0,0 +1,334 @@
+"""
+Set based import of aya texts (Arabic texts and translations).
+
+A text file has one ``surah|aya|text`` line per aya. The whole file is parsed first, then
+the existing Aya and Text vertices it refers to are resolved with one indexed lookup per
+batch, missing vertices are inserted in batches and the AYA_TEXT edges are inserted in
+batches, instead of a handful of round trips per line.
+"""
+
+import bz2
+from collections.abc import Callable, Iterable
+from itertools import batched
+from pathlib import Path
+
+from age_orm import Graph
+
+from .db import raw_connection
+from .graph_bulk import add_edges, add_vertices, find_vertex_ids, set_edge_ends
+from .meta import get_meta_info, set_meta_info
+from .models import Aya, AyaText, Text
+from .utils import text_to_digest
+
+DEFAULT_BATCH_SIZE = 5_000
+
+# meta_info key recording the content hash of every imported text file
+IMPORTED_FILES_KEY = "imported-files"
+
+# language codes of the translation files (e.g. "ur.maududi.txt.bz2") -> stored language names
+LANGUAGE_NAMES = {
+    "am": "amharic",
+    "ar": "arabic",
+    "az": "azerbaijani",
+    "ber": "berber",
+    "bg": "bulgarian",
+    "bn": "bengali",
+    "bs": "bosnian",
+    "cs": "czech",
+    "de": "german",
+    "dv": "divehi",
+    "en": "english",
+    "es": "spanish",
+    "fa": "persian",
+    "fr": "french",
+    "ha": "hausa",
+    "hi": "hindi",
+    "id": "indonesian",
+    "it": "italian",
+    "ja": "japanese",
+    "ko": "korean",
+    "ku": "kurdish",
+    "ml": "malayalam",
+    "ms": "malay",
+    "nl": "dutch",
+    "no": "norwegian",
+    "pl": "polish",
+    "ps": "pashto",
+    "pt": "portuguese",
+    "ro": "romanian",
+    "ru": "russian",
+    "sd": "sindhi",
+    "so": "somali",
+    "sq": "albanian",
+    "sv": "swedish",
+    "sw": "swahili",
+    "ta": "tamil",
+    "tg": "tajik",
+    "th": "thai",
+    "tr": "turkish",
+    "tt": "tatar",
+    "ug": "uyghur",
+    "ur": "urdu",
+    "uz": "uzbek",
+    "zh": "chinese",
+}
+
+# tafsir (commentary) editions shipped with the translations, kept apart from the Quran texts
+# and translations of their language
+TAFSIR_EDITIONS = {"ar.jalalayn", "ar.muyassar", "id.jalalayn", "ru.kuliev-alsaadi"}
+
+
+def infer_text_spec(file_name: Path) -> tuple[str, str]:
+    """Return (language, text_type) for a file named like "ur.maududi.txt.bz2".
+
+    Unknown language codes are used as they are. Tafsir editions get the language
+    "<language>-tafsir" (e.g. "arabic-tafsir").
+    """
+    name = file_name.name.removesuffix(".bz2").removesuffix(".txt")
+    code, sep, text_type = name.partition(".")
+    if not sep or not text_type:
+        raise ValueError(f"Cannot infer language/text type from file name {file_name.name}")
+    language = LANGUAGE_NAMES.get(code, code)
+    if name in TAFSIR_EDITIONS:
+        language = f"{language}-tafsir"
+    return language, text_type
+
+
+def parse_text_file(file_name: Path) -> list[tuple[int, int, str]]:
+    """Read (surah number, aya number, text) entries from a plain or bzip2 compressed file.
+
+    The first line's text is taken as the bismillah. Where the first aya of a surah starts
+    with it (and has more text), the bismillah is split off into an aya numbered 0.
+    Reading stops at the first blank line.
+    """
+    if file_name.suffix == ".bz2":
+        fp = bz2.open(file_name, "rt")
+    else:
+        fp = open(file_name, "r")
+
+    entries = []
+    bismillah_text = ""
+    current_surah = ""
+
+    with fp:
+        for line in fp:
+            if not line.strip():
+                break
+
+            surah, aya, content = line.split("|", 2)
+            content = content.strip()
+
+            if not bismillah_text:
+                bismillah_text = content
+
+            if current_surah != surah:
+                current_surah = surah
+                if content.startswith(bismillah_text) and content[len(bismillah_text):].strip():
+                    entries.append((int(surah), 0, bismillah_text))
+                    content = content[len(bismillah_text):].strip()
+
+            if content:
+                entries.append((int(surah), int(aya), content))
+
+    return entries
+
+
+class TextImportPlan:
+    "Graph ids to link for one text import, with the counts of what was created/skipped"
+
+    def __init__(self, language: str, text_type: str):
+        self.language = language
+        self.text_type = text_type
+        self.links: list[tuple[int, int]] = []  # (aya graph id, text graph id)
+        self.new_ayas = 0
+        self.new_texts = 0
+        self.skipped = 0
+
+
+def prepare_text_import(
+    g: Graph,
+    entries: list[tuple[int, int, str]],
+    language: str,
+    text_type: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> TextImportPlan:
+    """Resolve (creating when missing) the Aya and Text vertices of the entries.
+
+    Entries whose aya is already linked to the same text for this language/text_type are
+    skipped, so re-running an import adds nothing. Creates vertices, so concurrent imports
+    have to run this one at a time; linking the returned plan can run concurrently.
+    """
+    g.ensure_label(Aya)
+    g.ensure_label(Text)
+    g.ensure_label(AyaText, kind="e")
+
+    existing_edges = {
+        (r["aya_id"], r["text_id"])
+        for r in g.cypher(
+            "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+            "WHERE e.language = $lang AND e.text_type = $tt "
+            "RETURN a.id, t.id",
+            columns=["aya_id", "text_id"],
+            lang=language,
+            tt=text_type,
+        )
+    }
+
+    plan = TextImportPlan(language, text_type)
+    links = []  # (aya key, text digest)
+    ayas: dict[str, dict] = {}
+    texts: dict[str, str] = {}
+    for surah_number, aya_number, text in entries:
+        aya_key = f"{surah_number}:{aya_number}"
+        digest = text_to_digest(text)
+        if (aya_key, digest) in existing_edges:
+            plan.skipped += 1
+            continue
+
+        links.append((aya_key, digest))
+        ayas[aya_key] = {
+            "id": aya_key, "surah_key": str(surah_number), "aya_number": aya_number
+        }
+        texts[digest] = text
+
+    aya_ids = find_vertex_ids(g, Aya.__label__, ayas, batch_size)
+    new_ayas = [props for key, props in ayas.items() if key not in aya_ids]
+    aya_ids.update(add_vertices(g, Aya.__label__, new_ayas, batch_size))
+
+    text_ids = find_vertex_ids(g, Text.__label__, texts, batch_size)
+    new_texts = [
+        {"id": digest, "text": text} for digest, text in texts.items() if digest not in text_ids
+    ]
+    text_ids.update(add_vertices(g, Text.__label__, new_texts, batch_size))
+
+    plan.links = [(aya_ids[aya_key], text_ids[digest]) for aya_key, digest in links]
+    plan.new_ayas = len(new_ayas)
+    plan.new_texts = len(new_texts)
+    return plan
+
+
+def link_texts(
+    g: Graph,
+    plan: TextImportPlan,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Insert the AYA_TEXT edges of a prepared import, returning their count.
+
+    on_progress, if given, is called with the number of edges of every inserted batch.
+    """
+    edge_props = {"language": plan.language, "text_type": plan.text_type}
+    added = 0
+    for batch in batched(plan.links, batch_size):
+        added += add_edges(
+            g,
+            AyaText.__label__,
+            [(aya_gid, text_gid, edge_props) for aya_gid, text_gid in batch],
+            batch_size,
+        )
+        if on_progress is not None:
+            on_progress(len(batch))
+    return added
+
+
+def import_text_entries(
+    g: Graph,
+    entries: list[tuple[int, int, str]],
+    language: str,
+    text_type: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Callable[[int], None] | None = None,
+) -> dict[str, int]:
+    """Link each entry's aya to its text under language/text_type.
+
+    Ayas and Texts are created when missing; see prepare_text_import and link_texts.
+    Returns counts of created ayas, texts and edges and of skipped entries.
+    """
+    plan = prepare_text_import(g, entries, language, text_type, batch_size)
+    edges = link_texts(g, plan, batch_size, on_progress)
+    return {
+        "ayas": plan.new_ayas,
+        "texts": plan.new_texts,
+        "edges": edges,
+        "skipped": plan.skipped,
+    }
+
+
+def plan_bismillah_removal(first_ayas: Iterable[dict]) -> list[tuple[int, str]]:
+    """Texts of the surahs' first ayas with the bismillah taken off.
+
+    first_ayas holds surah_key, text_type, edge_gid and text of the first aya of every surah.
+    Each text type's bismillah is its text of aya 1:1. Returns (AYA_TEXT edge graph id, new
+    text) for first ayas (other than 1:1) starting with the bismillah and having more text.
+    """
+    first_ayas = list(first_ayas)
+    bismillahs = {r["text_type"]: r["text"] for r in first_ayas if r["surah_key"] == "1"}
+
+    fixes = []
+    for r in first_ayas:
+        bismillah = bismillahs.get(r["text_type"])
+        if r["surah_key"] == "1" or not bismillah or not r["text"].startswith(bismillah):
+            continue
+        new_text = r["text"][len(bismillah):].strip()
+        if new_text:
+            fixes.append((r["edge_gid"], new_text))
+    return fixes
+
+
+def remove_bismillah(
+    g: Graph, language: str = "arabic", batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """Take the bismillah off the first aya of every surah, for all text types of a language.
+
+    Texts are shared by digest, so the aya's AYA_TEXT edge is pointed at the Text of the new
+    text (created when missing) and the old Text is deleted once nothing links to it.
+    Returns the number of changed ayas.
+    """
+    first_ayas = g.cypher(
+        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) WHERE e.language = $lang AND a.aya_number = 1 "
+        "RETURN a.surah_key, e.text_type, id(e), id(t), t.text",
+        columns=["surah_key", "text_type", "edge_gid", "text_gid", "text"],
+        lang=language,
+    )
+    fixes = plan_bismillah_removal(first_ayas)
+    if not fixes:
+        return 0
+
+    texts = {text_to_digest(text): text for _edge_gid, text in fixes}
+    text_ids = find_vertex_ids(g, Text.__label__, texts, batch_size)
+    new_texts = [
+        {"id": digest, "text": text} for digest, text in texts.items() if digest not in text_ids
+    ]
+    text_ids.update(add_vertices(g, Text.__label__, new_texts, batch_size))
+
+    changed = set_edge_ends(
+        g,
+        AyaText.__label__,
+        [(edge_gid, text_ids[text_to_digest(text)]) for edge_gid, text in fixes],
+        batch_size,
+    )
+
+    fixed_edges = {edge_gid for edge_gid, _text in fixes}
+    old_text_gids = [r["text_gid"] for r in first_ayas if r["edge_gid"] in fixed_edges]
+    with raw_connection() as conn:
+        conn.execute(
+            f'DELETE FROM {g.name}."{Text.__label__}" AS t '
+            "WHERE t.id IN (SELECT unnest(%s::bigint[])::text::graphid) "
+            f'AND NOT EXISTS (SELECT 1 FROM {g.name}."{AyaText.__label__}" AS e '
+            "WHERE e.end_id = t.id)",
+            (old_text_gids,),
+        )
+        conn.commit()
+    return changed
+
+
+def imported_files() -> dict[str, dict]:
+    "File name -> {sha256, language, text_type} of the text files imported so far"
+
+    return get_meta_info(IMPORTED_FILES_KEY, {})
+
+
+def record_imported_file(file_name: Path, digest: str, language: str, text_type: str) -> None:
+    files = imported_files()
+    files[file_name.name] = {"sha256": digest, "language": language, "text_type": text_type}
+    set_meta_info(IMPORTED_FILES_KEY, files)
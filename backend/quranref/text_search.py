@@ -0,0 +1,226 @@
+"""
+Postgres backed text search and text reads over the aya_texts table.
+
+aya_texts mirrors the (aya, language, text_type, text) rows of the graph's AYA_TEXT edges
+together with the folded text, so searches can use the trigram (substring) and tsvector
+(whole word) GIN indexes instead of scanning agtype properties. With TEXT_BACKEND=postgres
+the text endpoints read it too: a surah's ayas are one range scan of the covering
+(language, text_type, surah, aya_number) index and given ayas are primary key lookups.
+"""
+
+import logging
+
+from age_orm import Graph
+
+from .arabic import fold_text
+from .db import raw_connection
+
+log = logging.getLogger(__name__)
+
+# upper bound for aya numbers when reading a whole surah (the longest surah has 286 ayas)
+MAX_AYA_NUMBER = 1000
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def refresh_aya_texts(g: Graph, language: str | None = None, text_type: str | None = None) -> int:
+    """Rebuild aya_texts rows from the graph.
+
+    Limited to the given language and/or text type when provided. Returns the row count.
+    """
+    where = []
+    params = {}
+    if language is not None:
+        where.append("e.language = $lang")
+        params["lang"] = language
+    if text_type is not None:
+        where.append("e.text_type = $tt")
+        params["tt"] = text_type
+    where_clause = f"WHERE {' AND '.join(where)} " if where else ""
+
+    pairs = g.cypher(
+        f"MATCH ()-[e:AYA_TEXT]->() {where_clause}RETURN DISTINCT e.language, e.text_type",
+        columns=["language", "text_type"],
+        **params,
+    )
+
+    total = 0
+    for pair in pairs:
+        rows = g.cypher(
+            "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+            "WHERE e.language = $lang AND e.text_type = $tt "
+            "RETURN a.id, a.surah_key, a.aya_number, t.text",
+            columns=["aya_id", "surah_key", "aya_number", "text"],
+            lang=pair["language"],
+            tt=pair["text_type"],
+        )
+
+        with raw_connection() as conn:
+            conn.execute(
+                "DELETE FROM aya_texts WHERE language = %s AND text_type = %s",
+                (pair["language"], pair["text_type"]),
+            )
+            with conn.cursor().copy(
+                "COPY aya_texts (language, text_type, aya_id, surah, aya_number, text, "
+                "text_folded) FROM STDIN"
+            ) as copy:
+                for r in rows:
+                    copy.write_row((
+                        pair["language"],
+                        pair["text_type"],
+                        r["aya_id"],
+                        int(r["surah_key"]),
+                        r["aya_number"],
+                        r["text"],
+                        fold_text(r["text"]),
+                    ))
+            conn.commit()
+
+        log.info(f"Refreshed {len(rows)} aya_texts rows for {pair['language']}:{pair['text_type']}")
+        total += len(rows)
+
+    return total
+
+
+def search_query(
+    language: str, text_type: str, term: str, whole_words: bool = False
+) -> tuple[str, tuple] | None:
+    "SQL and parameters of search_aya_texts, None for a blank term"
+
+    folded_term = fold_text(term.strip())
+    if not folded_term:
+        return None
+
+    if whole_words:
+        condition = "text_tsv @@ phraseto_tsquery('simple', %s)"
+        term_param = folded_term
+    else:
+        condition = "text_folded LIKE %s"
+        term_param = f"%{_escape_like(folded_term)}%"
+
+    return (
+        (
+            "SELECT aya_id, text FROM aya_texts "
+            f"WHERE language = %s AND text_type = %s AND {condition} "
+            "ORDER BY surah, aya_number"
+        ),
+        (language, text_type, term_param),
+    )
+
+
+def search_aya_texts(
+    language: str, text_type: str, term: str, whole_words: bool = False
+) -> list[dict]:
+    """Find ayas whose folded text contains the folded term, in mushaf order.
+
+    With whole_words the term has to match complete words (as a phrase), which is answered
+    from the tsvector index; otherwise it is a substring match answered from the trigram index.
+
+    Each result row has: aya_id, text
+    """
+    query = search_query(language, text_type, term, whole_words)
+    if query is None:
+        return []
+
+    with raw_connection() as conn:
+        rows = conn.execute(*query).fetchall()
+
+    return [{"aya_id": aya_id, "text": text} for aya_id, text in rows]
+
+
+_TEXTS_OF_LANGUAGES = (
+    "SELECT t.aya_id, t.language, t.text_type, t.text "
+    "FROM unnest(%s::text[], %s::text[]) AS s(language, text_type) "
+    "JOIN aya_texts AS t ON t.language = s.language AND t.text_type = s.text_type "
+)
+
+# parameters: languages, text types, surah, first and last aya number
+SURAH_TEXTS_SQL = (
+    f"{_TEXTS_OF_LANGUAGES}WHERE t.surah = %s AND t.aya_number BETWEEN %s AND %s "
+    "ORDER BY t.aya_number"
+)
+
+# parameters: languages, text types, aya ids
+AYA_TEXTS_SQL = f"{_TEXTS_OF_LANGUAGES}WHERE t.aya_id = ANY(%s)"
+
+# parameters: surahs, first and last aya numbers of the ranges, languages, text types
+RANGES_TEXTS_SQL = (
+    "SELECT r.idx - 1, t.aya_id, t.language, t.text_type, t.text "
+    "FROM unnest(%s::int[], %s::int[], %s::int[]) "
+    "WITH ORDINALITY AS r(surah, first_aya, last_aya, idx) "
+    "CROSS JOIN unnest(%s::text[], %s::text[]) AS s(language, text_type) "
+    "JOIN aya_texts AS t ON t.language = s.language AND t.text_type = s.text_type "
+    "AND t.surah = r.surah AND t.aya_number BETWEEN r.first_aya AND r.last_aya "
+    "ORDER BY r.idx, t.aya_number"
+)
+
+
+def _language_specs_params(language_specs: list[tuple[str, str]]) -> tuple[list, list]:
+    return [language for language, _ in language_specs], [tt for _, tt in language_specs]
+
+
+def _text_rows(sql: str, params: tuple) -> list[dict]:
+    with raw_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    return [
+        {"aya_id": aya_id, "language": language, "text_type": text_type, "text": text}
+        for aya_id, language, text_type, text in rows
+    ]
+
+
+def fetch_surah_texts(
+    surah: int,
+    start_aya: int | None,
+    end_aya: int | None,
+    language_specs: list[tuple[str, str]],
+) -> list[dict]:
+    """Texts of a surah's ayas (or of the start_aya..end_aya range) in aya order.
+
+    Each result row has: aya_id, language, text_type, text
+    """
+    if start_aya is None:
+        start_aya, end_aya = 0, MAX_AYA_NUMBER
+    return _text_rows(
+        SURAH_TEXTS_SQL, (*_language_specs_params(language_specs), surah, start_aya, end_aya)
+    )
+
+
+def fetch_aya_texts(aya_keys: list[str], language_specs: list[tuple[str, str]]) -> list[dict]:
+    """Texts of the given ayas for the language/text_type pairs.
+
+    Each result row has: aya_id, language, text_type, text
+    """
+    return _text_rows(AYA_TEXTS_SQL, (*_language_specs_params(language_specs), aya_keys))
+
+
+def fetch_ranges_texts(
+    ranges: list[tuple[int, int | None, int | None]], language_specs: list[tuple[str, str]]
+) -> list[list[dict]]:
+    """Texts of several (surah, first aya, last aya) ranges with one query, per range.
+
+    Aya bounds of None select the whole surah. Each result row has: aya_id, language,
+    text_type, text
+    """
+    grouped: list[list[dict]] = [[] for _ in ranges]
+    if not ranges:
+        return grouped
+
+    with raw_connection() as conn:
+        rows = conn.execute(
+            RANGES_TEXTS_SQL,
+            (
+                [surah for surah, _, _ in ranges],
+                [0 if start is None else start for _, start, _ in ranges],
+                [MAX_AYA_NUMBER if end is None else end for _, _, end in ranges],
+                *_language_specs_params(language_specs),
+            ),
+        ).fetchall()
+
+    for idx, aya_id, language, text_type, text in rows:
+        grouped[idx].append(
+            {"aya_id": aya_id, "language": language, "text_type": text_type, "text": text}
+        )
+    return grouped
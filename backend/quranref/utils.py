@@ -1,6 +1,24 @@
 import hashlib
 import base64
+from pathlib import Path
 
 
 def text_to_digest(text: str) -> str:
     return base64.urlsafe_b64encode(hashlib.shake_256(text.encode()).digest(6)).decode()
+
+
+def aya_sort_key(aya_key: str) -> tuple[int, int]:
+    "Sort key placing aya keys like '2:255' in mushaf order"
+
+    surah, aya = aya_key.split(":", 1)
+    return int(surah), int(aya)
+
+
+def file_digest(file_name: Path) -> str:
+    "SHA-256 of a file's content"
+
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,367 @@
+"""
+Building the Word vertices and HAS_WORD edges from the ``simple-clean`` Arabic text.
+
+HAS_WORD edges carry the word generation they were built for and readers only follow edges
+of the current generation, whose number is kept in meta_info under "word-generation".
+
+``update_words`` updates the current generation in place: all simple-clean texts and all
+HAS_WORD edges are read with one query each and the words of every aya are diffed against its
+edges, so only the edges of ayas whose words changed are inserted/deleted. The digest of the
+text each aya's words were built from is kept in meta_info under "word-sources"; only ayas
+whose text digest differs are split again, and when no digest differs the word positions and
+sources are left as they are.
+
+``rebuild_words`` builds a complete new generation next to the live one, then switches the
+generation pointer and the word_frequencies table in one transaction and garbage collects
+the old generation afterwards, so readers never see a partly built word layer.
+
+Both also store the token positions of every aya's words (see concordance), which unlike the
+HAS_WORD edges keep repeated words and word order.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+
+from age_orm import Graph
+
+from .concordance import store_word_positions
+from .db import raw_connection
+from .graph_bulk import DEFAULT_BATCH_SIZE, add_edges, add_vertices, delete_by_ids, set_properties
+from .meta import get_meta_info, set_meta_info
+from .models import HasWord, Word
+from .utils import text_to_digest
+from .word_stats import store_word_frequencies
+
+WORD_TEXT_TYPE = "simple-clean"
+
+# meta_info key holding the generation of the HAS_WORD edges readers follow
+WORD_GENERATION_KEY = "word-generation"
+
+# meta_info key holding aya key -> digest of the text its HAS_WORD edges were built from
+WORD_SOURCES_KEY = "word-sources"
+
+
+def current_word_generation() -> int:
+    return get_meta_info(WORD_GENERATION_KEY, 0)
+
+
+def split_words(text: str) -> list[str]:
+    "Words of an aya text, in order"
+
+    return [word for word in text.split(" ") if word]
+
+
+class WordChanges:
+    "HAS_WORD edges to add/remove and the resulting word counts of a make-words run"
+
+    def __init__(self):
+        self.add_edges: list[tuple[str, str]] = []  # (aya key, word id)
+        self.remove_edges: list[int] = []  # HAS_WORD edge graph ids
+        self.words: dict[str, str] = {}  # word id -> word, of the words gaining edges
+        self.counts: Counter[str] = Counter()  # word id -> number of ayas containing it
+        self.ayas = 0  # ayas whose words changed
+        self.texts = 0  # ayas whose text digest differs from the recorded one
+
+
+def plan_word_changes(
+    sources: dict[str, tuple[str, str]],
+    recorded: dict[str, str],
+    edges: Iterable[tuple[str, str, int]],
+) -> WordChanges:
+    """Diff the words of the aya texts against the existing HAS_WORD edges.
+
+    sources maps aya keys to (text digest, text), recorded maps aya keys to the text digest
+    their edges were built from (empty for a full rebuild) and edges holds the existing
+    (aya key, word id, edge graph id) triples. Ayas whose digest matches the recorded one
+    keep their edges without their text being split again.
+    """
+    changes = WordChanges()
+    changes.texts = sum(
+        1
+        for aya_key in sources.keys() | recorded.keys()
+        if recorded.get(aya_key) != sources.get(aya_key, (None,))[0]
+    )
+
+    existing: dict[str, dict[str, int]] = {}
+    for aya_key, word_id, edge_gid in edges:
+        aya_edges = existing.setdefault(aya_key, {})
+        if word_id in aya_edges:
+            changes.remove_edges.append(edge_gid)  # duplicate edge
+        else:
+            aya_edges[word_id] = edge_gid
+
+    for aya_key in existing.keys() | sources.keys():
+        aya_edges = existing.get(aya_key, {})
+        source = sources.get(aya_key)
+        if source is not None and recorded.get(aya_key) == source[0]:
+            changes.counts.update(aya_edges.keys())
+            continue
+
+        words = {}
+        if source is not None:
+            words = {text_to_digest(word): word for word in split_words(source[1])}
+
+        added = words.keys() - aya_edges.keys()
+        removed = aya_edges.keys() - words.keys()
+        if added or removed:
+            changes.ayas += 1
+        changes.add_edges.extend((aya_key, word_id) for word_id in added)
+        changes.remove_edges.extend(aya_edges[word_id] for word_id in removed)
+        changes.words.update((word_id, words[word_id]) for word_id in added)
+        changes.counts.update(words.keys())
+
+    return changes
+
+
+def _aya_sources(g: Graph) -> tuple[dict[str, int], dict[str, tuple[str, str]]]:
+    "Aya key -> graph id and aya key -> (text digest, text) of every simple-clean text"
+
+    texts = g.cypher(
+        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+        "WHERE e.text_type = $text_type AND a.aya_number <> 0 "
+        "RETURN id(a), a.id, t.id, t.text",
+        columns=["aya_gid", "aya_key", "digest", "text"],
+        text_type=WORD_TEXT_TYPE,
+    )
+    aya_gids = {r["aya_key"]: r["aya_gid"] for r in texts}
+    sources = {r["aya_key"]: (r["digest"], r["text"]) for r in texts}
+    return aya_gids, sources
+
+
+def _word_rows(g: Graph) -> list[dict]:
+    return g.cypher(
+        'MATCH (w:Word) RETURN id(w), w.id, w.word, w["count"]',
+        columns=["gid", "word_id", "word", "count"],
+    )
+
+
+def _add_missing_words(
+    g: Graph,
+    word_rows: list[dict],
+    words: dict[str, str],
+    counts: Counter[str],
+    batch_size: int,
+) -> tuple[dict[str, int], int]:
+    "Create the Word vertices not in word_rows, returning word id -> graph id and their count"
+
+    word_ids = {r["word_id"]: r["gid"] for r in word_rows}
+    new_words = [
+        Word.new(word, counts[word_id]).model_dump(mode="json")
+        for word_id, word in words.items()
+        if word_id not in word_ids
+    ]
+    word_ids.update(add_vertices(g, Word.__label__, new_words, batch_size))
+    return word_ids, len(new_words)
+
+
+def _apply_word_counts(
+    g: Graph, word_rows: list[dict], counts: Counter[str], batch_size: int
+) -> tuple[int, int]:
+    "Store changed counts and delete words without edges, returning both numbers"
+
+    count_updates = [
+        (r["gid"], {"count": counts[r["word_id"]]})
+        for r in word_rows
+        if counts[r["word_id"]] and r["count"] != counts[r["word_id"]]
+    ]
+    updated = set_properties(g, Word.__label__, count_updates, batch_size)
+    removed = delete_by_ids(
+        g, Word.__label__, [r["gid"] for r in word_rows if not counts[r["word_id"]]], batch_size
+    )
+    return updated, removed
+
+
+def update_words(g: Graph, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, int]:
+    """Bring the current word generation in line with the simple-clean texts, in place.
+
+    Only the ayas whose text changed since the last run are split again. Returns counts of
+    what was changed, "texts" being the number of ayas whose text changed.
+    """
+    generation = current_word_generation()
+    aya_gids, sources = _aya_sources(g)
+
+    edges = g.cypher(
+        "MATCH (a:Aya)-[e:HAS_WORD]->(w:Word) WHERE coalesce(e.generation, 0) = $generation "
+        "RETURN a.id, w.id, id(e)",
+        columns=["aya_key", "word_id", "edge_gid"],
+        generation=generation,
+    )
+    changes = plan_word_changes(
+        sources,
+        get_meta_info(WORD_SOURCES_KEY, {}),
+        ((r["aya_key"], r["word_id"], r["edge_gid"]) for r in edges),
+    )
+
+    word_rows = _word_rows(g)
+    word_ids, words_added = _add_missing_words(
+        g, word_rows, changes.words, changes.counts, batch_size
+    )
+
+    edge_props = {"generation": generation}
+    edges_added = add_edges(
+        g,
+        HasWord.__label__,
+        [
+            (aya_gids[aya_key], word_ids[word_id], edge_props)
+            for aya_key, word_id in changes.add_edges
+        ],
+        batch_size,
+    )
+    edges_removed = delete_by_ids(g, HasWord.__label__, changes.remove_edges, batch_size)
+    counts_updated, words_removed = _apply_word_counts(g, word_rows, changes.counts, batch_size)
+
+    # word order/repeats can change without the aya's words changing, so go by the digests
+    if changes.texts:
+        with raw_connection() as conn:
+            store_word_positions(
+                conn, {aya_key: split_words(text) for aya_key, (_, text) in sources.items()}
+            )
+            set_meta_info(
+                WORD_SOURCES_KEY,
+                {aya_key: digest for aya_key, (digest, _) in sources.items()},
+                conn,
+            )
+            conn.commit()
+
+    return {
+        "texts": changes.texts,
+        "ayas": changes.ayas,
+        "words_added": words_added,
+        "words_removed": words_removed,
+        "counts_updated": counts_updated,
+        "edges_added": edges_added,
+        "edges_removed": edges_removed,
+    }
+
+
+def refresh_word_positions(g: Graph) -> int:
+    "Rebuild the word_positions table from the simple-clean texts, returning the word count"
+
+    _aya_gids, sources = _aya_sources(g)
+    with raw_connection() as conn:
+        words = store_word_positions(
+            conn, {aya_key: split_words(text) for aya_key, (_, text) in sources.items()}
+        )
+        conn.commit()
+    return words
+
+
+def collect_old_generations(g: Graph, generation: int) -> int:
+    "Delete the HAS_WORD edges of every generation but the given one, returning their number"
+
+    with raw_connection() as conn:
+        cursor = conn.execute(
+            f'DELETE FROM {g.name}."{HasWord.__label__}" '
+            "WHERE coalesce((properties::text::json->>'generation')::int, 0) <> %s",
+            (generation,),
+        )
+        conn.commit()
+    return cursor.rowcount
+
+
+def rebuild_words(g: Graph, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, int]:
+    """Build a new word generation from the simple-clean texts and switch readers over to it.
+
+    Leftovers of an interrupted rebuild are removed first. Returns counts of what was built
+    and collected.
+    """
+    live = current_word_generation()
+    collect_old_generations(g, live)
+    generation = live + 1
+
+    aya_gids, sources = _aya_sources(g)
+    aya_tokens: dict[str, list[str]] = {}
+    aya_words: dict[str, list[str]] = {}
+    words: dict[str, str] = {}
+    counts: Counter[str] = Counter()
+    for aya_key, (_digest, text) in sources.items():
+        aya_tokens[aya_key] = split_words(text)
+        aya_word_map = {text_to_digest(word): word for word in aya_tokens[aya_key]}
+        aya_words[aya_key] = list(aya_word_map)
+        words.update(aya_word_map)
+        counts.update(aya_word_map.keys())
+
+    word_rows = _word_rows(g)
+    word_ids, words_added = _add_missing_words(g, word_rows, words, counts, batch_size)
+
+    edge_props = {"generation": generation}
+    edges_added = add_edges(
+        g,
+        HasWord.__label__,
+        (
+            (aya_gids[aya_key], word_ids[word_id], edge_props)
+            for aya_key, word_ids_of_aya in aya_words.items()
+            for word_id in word_ids_of_aya
+        ),
+        batch_size,
+    )
+
+    # Switch readers to the new generation: the generation pointer, the words' frequencies
+    # and positions and the text digests they were built from change in one transaction
+    with raw_connection() as conn:
+        store_word_frequencies(conn, [(words[word_id], count) for word_id, count in counts.items()])
+        store_word_positions(conn, aya_tokens)
+        set_meta_info(
+            WORD_SOURCES_KEY,
+            {aya_key: digest for aya_key, (digest, _) in sources.items()},
+            conn,
+        )
+        set_meta_info(WORD_GENERATION_KEY, generation, conn)
+        conn.commit()
+
+    edges_removed = collect_old_generations(g, generation)
+    counts_updated, words_removed = _apply_word_counts(g, word_rows, counts, batch_size)
+
+    return {
+        "generation": generation,
+        "ayas": len(aya_words),
+        "words_added": words_added,
+        "words_removed": words_removed,
+        "counts_updated": counts_updated,
+        "edges_added": edges_added,
+        "edges_removed": edges_removed,
+    }
+
+
+def _word_count_diff_sql(g: Graph) -> str:
+    "Query of (graph id, word, stored count, number of ayas) of words with a wrong count"
+
+    return (
+        "WITH actual AS ("
+        f'SELECT end_id, count(DISTINCT start_id) AS ayas FROM {g.name}."{HasWord.__label__}" '
+        "WHERE coalesce((properties::text::json->>'generation')::int, 0) = %(generation)s "
+        "GROUP BY end_id"
+        "), diff AS ("
+        "SELECT w.id, w.properties::text::json->>'word' AS word, "
+        "(w.properties::text::json->>'count')::int AS stored, coalesce(a.ayas, 0) AS ayas "
+        f'FROM {g.name}."{Word.__label__}" AS w LEFT JOIN actual AS a ON a.end_id = w.id'
+        ") SELECT id, word, stored, ayas FROM diff WHERE stored IS DISTINCT FROM ayas"
+    )
+
+
+def word_count_diff(g: Graph) -> list[tuple[str, int, int]]:
+    "(word, stored count, number of ayas) of the words whose count is wrong, by word"
+
+    with raw_connection() as conn:
+        rows = conn.execute(
+            f"{_word_count_diff_sql(g)} ORDER BY word",
+            {"generation": current_word_generation()},
+        ).fetchall()
+    return [(word, stored, ayas) for _gid, word, stored, ayas in rows]
+
+
+def fix_word_counts(g: Graph) -> int:
+    """Set every word's count to the number of ayas linked to it, in one statement.
+
+    Returns the number of words whose count changed.
+    """
+    with raw_connection() as conn:
+        cursor = conn.execute(
+            f'UPDATE {g.name}."{Word.__label__}" AS w '
+            "SET properties = (w.properties::text::jsonb || jsonb_build_object('count', d.ayas))"
+            "::text::agtype "
+            f"FROM ({_word_count_diff_sql(g)}) AS d WHERE w.id = d.id",
+            {"generation": current_word_generation()},
+        )
+        conn.commit()
+    return cursor.rowcount
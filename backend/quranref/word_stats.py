@@ -0,0 +1,89 @@
+"""
+Materialised word frequency views for the word browsing endpoints.
+
+The word_frequencies table mirrors the Word vertices (word, folded initial letter, count) with
+indexes matching the endpoints' orderings: per letter alphabetical, per count alphabetical and
+frequency ranked. The count histogram is small and stored whole in meta_info. Both are rebuilt
+by ``refresh_word_frequencies`` after the words change (make-words, fix-word-counts), or
+swapped in together with a new word generation (see word_index).
+"""
+
+import logging
+from collections import Counter
+
+from age_orm import Graph
+
+from .arabic import fold_text
+from .db import raw_connection
+from .meta import get_meta_info, set_meta_info
+
+log = logging.getLogger(__name__)
+
+WORD_COUNTS_KEY = "word-counts"
+
+
+def refresh_word_frequencies(g: Graph) -> int:
+    "Rebuild the word_frequencies table and count histogram from the Word vertices"
+
+    words = g.cypher('MATCH (w:Word) RETURN w.word, w["count"]', columns=["word", "count"])
+
+    with raw_connection() as conn:
+        store_word_frequencies(conn, [(r["word"], r["count"]) for r in words])
+        conn.commit()
+
+    log.info(f"Refreshed {len(words)} word_frequencies rows")
+    return len(words)
+
+
+def store_word_frequencies(conn, words: list[tuple[str, int]]) -> None:
+    """Replace the word_frequencies rows and count histogram with (word, count) pairs.
+
+    Runs in the connection's transaction, readers see the old or the new words until commit.
+    """
+    conn.execute("DELETE FROM word_frequencies")
+    with conn.cursor().copy("COPY word_frequencies (word, initial, count) FROM STDIN") as copy:
+        for word, count in words:
+            copy.write_row((word, fold_text(word)[:1], count))
+
+    histogram = Counter(count for _word, count in words)
+    set_meta_info(
+        WORD_COUNTS_KEY,
+        [
+            {"count": count, "word_count": word_count}
+            for count, word_count in sorted(histogram.items(), reverse=True)
+        ],
+        conn,
+    )
+
+
+def _fetch_words(where: str, order_by: str, params: tuple) -> list[tuple[str, int]]:
+    with raw_connection() as conn:
+        rows = conn.execute(
+            f"SELECT word, count FROM word_frequencies WHERE {where} ORDER BY {order_by}",
+            params,
+        ).fetchall()
+    return [(word, count) for word, count in rows]
+
+
+def words_by_initial(letter: str) -> list[tuple[str, int]]:
+    "Words whose folded form starts with the (folded) letter, alphabetically"
+
+    return _fetch_words("initial = %s", "word", (letter,))
+
+
+def words_by_count(count: int) -> list[tuple[str, int]]:
+    "Words occurring in exactly count ayas, alphabetically"
+
+    return _fetch_words("count = %s", "word", (count,))
+
+
+def top_words(limit: int) -> list[tuple[str, int]]:
+    "The limit most frequent words, ties broken alphabetically"
+
+    return _fetch_words("TRUE", "count DESC, word LIMIT %s", (limit,))
+
+
+def word_count_histogram() -> list[dict]:
+    "{count, word_count} pairs by descending count"
+
+    return get_meta_info(WORD_COUNTS_KEY, [])
@@ -13,11 +13,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 import quranref.db as db_module
+from quranref.cache import clear_response_cache
+from quranref.concordance import store_word_positions
 from quranref.db import GRAPH_NAME
 from quranref.main import app
 from quranref.models import Aya, AyaText, HasAya, HasWord, Surah, Text, Word
 from quranref.sql_models import Base
 from quranref.utils import text_to_digest
+from quranref.word_index import split_words
+from quranref.word_stats import refresh_word_frequencies
 
 TEST_DB_NAME = "quranref_test"
 
@@ -163,6 +167,7 @@ def test_db():
     # Enable AGE extension
     with db._pool.connection() as conn:
         conn.execute("CREATE EXTENSION IF NOT EXISTS age")
+        conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
         conn.execute('LOAD \'age\'')
         conn.execute("SET search_path = ag_catalog, \"$user\", public")
         conn.commit()
@@ -221,9 +226,23 @@ def client(test_db, test_graph, test_engine):
     db_module._engine = test_engine
     db_module._session_factory = sessionmaker(bind=test_engine)
 
+    # Materialise the word frequency views (written through the injected database)
+    refresh_word_frequencies(test_graph)
+    with db_module.raw_connection() as conn:
+        store_word_positions(
+            conn, {aya_key: split_words(text) for aya_key, text in ARABIC_TEXTS.items()}
+        )
+        conn.commit()
+
     with TestClient(app) as c:
         yield c
 
     db_module._db = original_db
     db_module._engine = original_engine
     db_module._session_factory = original_session_factory
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    """Start every test with an empty response cache, so earlier requests are not replayed."""
+    clear_response_cache()
@@ -1,6 +1,18 @@
 """Integration tests for QuranRef API endpoints."""
 
+import json
+from typing import ClassVar
+
+import pytest
 from quranref import API_BASE
+from quranref import api as api_module
+from quranref.cache import clear_response_cache, get_response_cache
+from quranref.concordance import ConcordanceIndex
+from quranref.meta import bump_corpus_version
+from quranref.settings import get_settings
+from quranref.text_search import refresh_aya_texts
+
+from .conftest import ENGLISH_TEXTS
 
 
 def url(path: str) -> str:
@@ -86,6 +98,13 @@ class TestWordsByLetter:
         words = resp.json()
         assert len(words) == 0
 
+    def test_folds_letter_variants(self, client):
+        plain = client.get(url("words-by-letter/ا")).json()
+        for variant in ["أ", "إ", "آ"]:
+            resp = client.get(url(f"words-by-letter/{variant}"))
+            assert resp.status_code == 200
+            assert resp.json() == plain
+
     def test_sorted_alphabetically(self, client):
         resp = client.get(url("words-by-letter/ا"))
         words = resp.json()
@@ -119,6 +138,101 @@ class TestAyasByWord:
         assert "english" in first_aya["texts"]
 
 
+class TestAyasByWords:
+    def test_all_words(self, client):
+        resp = client.get(url("ayas-by-word/الرحمن,الله/arabic:simple-clean"))
+        assert resp.status_code == 200
+        assert [a["aya_key"] for a in resp.json()] == ["1:1"]
+
+    def test_any_word_in_mushaf_order(self, client):
+        resp = client.get(
+            url("ayas-by-word/لله,الرحمن/arabic:simple-clean"), params={"match": "any"}
+        )
+        assert resp.status_code == 200
+        assert [a["aya_key"] for a in resp.json()] == ["1:1", "1:2", "1:3"]
+
+    def test_no_common_aya(self, client):
+        resp = client.get(url("ayas-by-word/الله,الكتاب/arabic:simple-clean"))
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+    def test_unknown_word_returns_404(self, client):
+        resp = client.get(
+            url("ayas-by-word/الله,كلمةغيرموجودة/arabic:simple-clean"), params={"match": "any"}
+        )
+        assert resp.status_code == 404
+
+    def test_translations(self, client):
+        resp = client.get(url("ayas-by-word/الرحمن,الرحيم/arabic:simple-clean_english:maududi"))
+        ayas = resp.json()
+        assert [a["aya_key"] for a in ayas] == ["1:1", "1:3"]
+        assert ayas[1]["texts"]["english"]["maududi"] == ENGLISH_TEXTS["1:3"]
+
+    @pytest.mark.parametrize("setting", ["text_backend", "corpus_snapshot"])
+    def test_backends_match_graph(self, client, test_graph, monkeypatch, setting):
+        path = url("ayas-by-word/الرحمن,لله/arabic:simple-clean_english:maududi")
+        expected = client.get(path, params={"match": "any"}).json()
+        clear_response_cache()
+
+        if setting == "text_backend":
+            refresh_aya_texts(test_graph)
+            monkeypatch.setattr(get_settings(), "text_backend", "postgres")
+        else:
+            monkeypatch.setattr(get_settings(), "corpus_snapshot", True)
+        assert client.get(path, params={"match": "any"}).json() == expected
+
+    def test_falls_back_to_graph_without_positions(self, client, monkeypatch):
+        path = url("ayas-by-word/الرحمن,لله/arabic:simple-clean")
+        expected = client.get(path, params={"match": "any"}).json()
+        clear_response_cache()
+
+        empty = ConcordanceIndex([], {})
+        monkeypatch.setattr(api_module, "get_concordance_index", lambda: empty)
+        assert client.get(path, params={"match": "any"}).json() == expected
+        assert client.get(url("ayas-by-word/كلمةغيرموجودة/arabic:simple-clean")).status_code == 404
+
+    def test_invalid_match(self, client):
+        resp = client.get(url("ayas-by-word/الله/arabic:simple-clean"), params={"match": "xor"})
+        assert resp.status_code == 422
+
+
+class TestConcordance:
+    def test_keyword_in_context(self, client):
+        resp = client.get(url("concordance/الله"), params={"window": 1})
+        assert resp.status_code == 200
+        assert resp.json() == [
+            {
+                "aya_key": "1:1",
+                "position": 1,
+                "left": "بسم",
+                "keyword": "الله",
+                "right": "الرحمن",
+            }
+        ]
+
+    def test_phrase_in_mushaf_order(self, client):
+        resp = client.get(url("concordance/الرحمن الرحيم"))
+        assert resp.status_code == 200
+        lines = resp.json()
+        assert [(line["aya_key"], line["position"]) for line in lines] == [("1:1", 2), ("1:3", 0)]
+        assert lines[0]["left"] == "بسم الله"
+        assert lines[0]["keyword"] == "الرحمن الرحيم"
+
+    def test_near(self, client):
+        resp = client.get(url("concordance/الرحيم"), params={"near": "بسم", "distance": 3})
+        assert [line["aya_key"] for line in resp.json()] == ["1:1"]
+
+    def test_limit_and_total(self, client):
+        resp = client.get(url("concordance/الرحيم"), params={"limit": 1})
+        assert len(resp.json()) == 1
+        assert resp.headers["X-Total-Count"] == "2"
+
+    def test_unknown_word(self, client):
+        resp = client.get(url("concordance/كلمةغيرموجودة"))
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+
 class TestWordsByCount:
     def test_returns_matching_words(self, client):
         # "الرحمن" and "الرحيم" each appear 2 times in our test data
@@ -166,6 +280,16 @@ class TestTopMostFrequentWords:
         counts = [w[1] for w in words]
         assert counts == sorted(counts, reverse=True)
 
+    def test_ties_sorted_alphabetically(self, client):
+        words = client.get(url("top-most-frequent-words/2")).json()
+        # "الرحمن" and "الرحيم" are the only words in two ayas
+        assert words == [["الرحمن", 2], ["الرحيم", 2]]
+
+    @pytest.mark.parametrize("limit", ["0", "-1"])
+    def test_invalid_limit(self, client, limit):
+        resp = client.get(url(f"top-most-frequent-words/{limit}"))
+        assert resp.status_code == 422
+
 
 class TestGetText:
     def test_full_surah(self, client):
@@ -244,3 +368,292 @@ class TestSearch:
         # Should have both search language and translation
         assert "arabic" in first["texts"]
         assert "english" in first["texts"]
+
+    def test_matches_diacritised_term(self, client):
+        resp = client.get(url("search/ٱلرَّحْمَٰنِ/arabic:simple-clean/arabic:simple-clean"))
+        assert resp.status_code == 200
+        assert [r["aya_key"] for r in resp.json()] == ["1:1", "1:3"]
+
+    def test_translations_attached_to_every_match(self, client):
+        resp = client.get(url("search/الرحمن/arabic:simple-clean/english:maududi"))
+        assert resp.status_code == 200
+        results = resp.json()
+        assert len(results) == 2
+        for result in results:
+            assert result["texts"]["english"]["maududi"] == ENGLISH_TEXTS[result["aya_key"]]
+
+    def test_phrase_search(self, client):
+        resp = client.get(url("search/الله الرحمن/arabic:simple-clean/english:maududi"))
+        assert resp.status_code == 200
+        results = resp.json()
+        assert [r["aya_key"] for r in results] == ["1:1"]
+
+
+class TestGetTextSnapshot:
+    @pytest.fixture(autouse=True)
+    def snapshot_mode(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "corpus_snapshot", True)
+
+    def test_full_surah(self, client):
+        resp = client.get(url("text/1/arabic:simple-clean"))
+        assert resp.status_code == 200
+        assert [a["aya_key"] for a in resp.json()] == ["1:1", "1:2", "1:3"]
+
+    def test_aya_range(self, client):
+        resp = client.get(url("text/1:2-3/arabic:simple-clean_english:maududi"))
+        assert resp.status_code == 200
+        ayas = resp.json()
+        assert [a["aya_key"] for a in ayas] == ["1:2", "1:3"]
+        assert ayas[0]["texts"]["english"]["maududi"] == ENGLISH_TEXTS["1:2"]
+
+    def test_matches_graph_results(self, client, monkeypatch):
+        from_snapshot = client.get(url("text/2/arabic:simple-clean_english:maududi")).json()
+        monkeypatch.setattr(get_settings(), "corpus_snapshot", False)
+        clear_response_cache()
+        from_graph = client.get(url("text/2/arabic:simple-clean_english:maududi")).json()
+        assert from_snapshot == from_graph
+
+    def test_empty_surah(self, client):
+        resp = client.get(url("text/3/arabic:simple-clean"))
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+
+class TestSearchPostgres:
+    @pytest.fixture(autouse=True)
+    def postgres_backend(self, client, test_graph, monkeypatch):
+        refresh_aya_texts(test_graph)
+        monkeypatch.setattr(get_settings(), "search_backend", "postgres")
+
+    def test_arabic_search(self, client):
+        resp = client.get(url("search/الله/arabic:simple-clean/english:maududi"))
+        assert resp.status_code == 200
+        results = resp.json()
+        assert [r["aya_key"] for r in results] == ["1:1"]
+        assert results[0]["texts"]["english"]["maududi"] == ENGLISH_TEXTS["1:1"]
+
+    def test_substring_search(self, client):
+        resp = client.get(url("search/لله/arabic:simple-clean/arabic:simple-clean"))
+        assert [r["aya_key"] for r in resp.json()] == ["1:1", "1:2"]
+
+    def test_matches_diacritised_term(self, client):
+        resp = client.get(url("search/ٱلرَّحْمَٰنِ/arabic:simple-clean/arabic:simple-clean"))
+        assert [r["aya_key"] for r in resp.json()] == ["1:1", "1:3"]
+
+    def test_whole_words(self, client):
+        resp = client.get(
+            url("search/لله/arabic:simple-clean/arabic:simple-clean"),
+            params={"whole_words": True},
+        )
+        assert [r["aya_key"] for r in resp.json()] == ["1:2"]
+
+    def test_case_insensitive_translation_search(self, client):
+        resp = client.get(url("search/merciful/english:maududi/english:maududi"))
+        assert [r["aya_key"] for r in resp.json()] == ["1:1", "1:3"]
+
+    def test_no_results(self, client):
+        resp = client.get(url("search/xyznonexistent/arabic:simple-clean/arabic:simple-clean"))
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+
+class TestTextPostgres:
+    @pytest.fixture(autouse=True)
+    def postgres_backend(self, client, test_graph, monkeypatch):
+        refresh_aya_texts(test_graph)
+        monkeypatch.setattr(get_settings(), "text_backend", "postgres")
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "text/1/arabic:simple-clean_english:maududi",
+            "text/1:2-3/arabic:simple-clean",
+            "text/2:1/english:maududi",
+            "text/3/arabic:simple-clean",
+            "ayas-by-word/الرحمن/arabic:simple-clean_english:maududi",
+            "search/الرحمن/arabic:simple-clean/english:maududi",
+        ],
+    )
+    def test_matches_graph_results(self, client, monkeypatch, path):
+        from_table = client.get(url(path)).json()
+        monkeypatch.setattr(get_settings(), "text_backend", "graph")
+        clear_response_cache()
+        assert client.get(url(path)).json() == from_table
+
+    def test_aya_range(self, client):
+        ayas = client.get(url("text/1:2-3/arabic:simple-clean_english:maududi")).json()
+        assert [a["aya_key"] for a in ayas] == ["1:2", "1:3"]
+        assert ayas[0]["texts"]["english"]["maududi"] == ENGLISH_TEXTS["1:2"]
+
+    def test_invalid_surah(self, client):
+        assert client.get(url("text/abc/arabic:simple-clean")).json() == []
+
+
+class TestTextRanges:
+    SPECS: ClassVar[list[str]] = ["2:1", "1:2-3", "1", "3", "1:3"]
+
+    @pytest.fixture(params=["graph", "postgres", "snapshot"])
+    def backend(self, request, client, test_graph, monkeypatch):
+        if request.param == "postgres":
+            refresh_aya_texts(test_graph)
+            monkeypatch.setattr(get_settings(), "text_backend", "postgres")
+        elif request.param == "snapshot":
+            monkeypatch.setattr(get_settings(), "corpus_snapshot", True)
+        return request.param
+
+    def test_comma_separated_spec(self, client, backend):
+        resp = client.get(url(f"text/{','.join(self.SPECS)}/arabic:simple-clean_english:maududi"))
+        assert resp.status_code == 200
+        ayas = resp.json()
+        assert [a["aya_key"] for a in ayas] == ["2:1", "1:2", "1:3", "1:1", "1:2", "1:3", "1:3"]
+        assert ayas[1]["texts"]["english"]["maududi"] == ENGLISH_TEXTS["1:2"]
+
+    def test_grouped_ranges(self, client, backend):
+        resp = client.post(
+            url("texts"),
+            json={"ayas_specs": self.SPECS, "languages_spec": "arabic:simple-clean"},
+        )
+        assert resp.status_code == 200
+        groups = resp.json()
+        assert [g["ayas_spec"] for g in groups] == self.SPECS
+        assert [[a["aya_key"] for a in g["ayas"]] for g in groups] == [
+            ["2:1"], ["1:2", "1:3"], ["1:1", "1:2", "1:3"], [], ["1:3"]
+        ]
+
+    def test_matches_single_range_results(self, client, backend):
+        resp = client.post(
+            url("texts"),
+            json={"ayas_specs": ["1:2-3"], "languages_spec": "arabic:simple-clean"},
+        )
+        single = client.get(url("text/1:2-3/arabic:simple-clean")).json()
+        assert resp.json()[0]["ayas"] == single
+
+    @pytest.mark.parametrize("spec", ["2:1,2:x", "2:x", "2:1-", "1:2-3-4"])
+    def test_invalid_spec(self, client, spec):
+        resp = client.get(url(f"text/{spec}/arabic:simple-clean"))
+        assert resp.status_code == 400
+
+    def test_too_many_ranges(self, client):
+        resp = client.post(
+            url("texts"),
+            json={"ayas_specs": ["1:1"] * 201, "languages_spec": "arabic:simple-clean"},
+        )
+        assert resp.status_code == 400
+
+
+class TestSearchPagination:
+    def test_total_count_header(self, client):
+        resp = client.get(url("search/الرحمن/arabic:simple-clean/english:maududi"))
+        assert resp.headers["X-Total-Count"] == "2"
+        assert "X-Next-Cursor" not in resp.headers
+
+    def test_limit_and_cursor(self, client):
+        path = url("search/الرحمن/arabic:simple-clean/english:maududi")
+        first = client.get(path, params={"limit": 1})
+        assert first.status_code == 200
+        assert [r["aya_key"] for r in first.json()] == ["1:1"]
+        assert first.headers["X-Total-Count"] == "2"
+        assert first.headers["X-Next-Cursor"] == "1:1"
+
+        second = client.get(path, params={"limit": 1, "cursor": "1:1"})
+        assert [r["aya_key"] for r in second.json()] == ["1:3"]
+        assert "english" in second.json()[0]["texts"]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_invalid_cursor(self, client):
+        resp = client.get(
+            url("search/الرحمن/arabic:simple-clean/english:maududi"), params={"cursor": "x"}
+        )
+        assert resp.status_code == 400
+
+
+class TestSearchStream:
+    def test_ndjson_results(self, client):
+        resp = client.get(url("search-stream/الرحمن/arabic:simple-clean/english:maududi"))
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        assert resp.headers["X-Total-Count"] == "2"
+        results = [json.loads(line) for line in resp.text.splitlines()]
+        assert [r["aya_key"] for r in results] == ["1:1", "1:3"]
+        assert results[1]["texts"]["english"]["maududi"] == ENGLISH_TEXTS["1:3"]
+
+    def test_same_results_as_search(self, client):
+        path = "الله/arabic:simple-clean/english:maududi"
+        streamed = client.get(url(f"search-stream/{path}")).text.splitlines()
+        assert [json.loads(line) for line in streamed] == client.get(url(f"search/{path}")).json()
+
+
+class TestPoolStats:
+    def test_reports_both_pools(self, client):
+        client.get("/api/v1/surahs")
+        response = client.get("/api/v1/pool-stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["graph"]["pool_max"] >= data["graph"]["pool_min"]
+        assert data["graph"].get("requests_num", 0) > 0
+        assert "checked_out" in data["sqlalchemy"]
+
+
+class TestHttpCaching:
+    @pytest.fixture(autouse=True)
+    def corpus_version(self, client):
+        return bump_corpus_version()
+
+    def test_sets_etag_and_cache_control(self, client, corpus_version):
+        resp = client.get(url("surahs"))
+        assert resp.status_code == 200
+        assert resp.headers["etag"] == f'"{corpus_version}"'
+        assert resp.headers["cache-control"].startswith("public, max-age=")
+
+    def test_matching_etag_returns_304(self, client):
+        etag = client.get(url("text/1/arabic:simple-clean")).headers["etag"]
+        resp = client.get(url("text/1/arabic:simple-clean"), headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+        assert resp.content == b""
+
+    def test_stale_etag_returns_content(self, client):
+        etag = client.get(url("surahs")).headers["etag"]
+        bump_corpus_version()
+        resp = client.get(url("surahs"), headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    def test_errors_and_search_not_cached(self, client):
+        resp = client.get(url("ayas-by-word/كلمةغيرموجودة/arabic:simple-clean"))
+        assert resp.status_code == 404
+        assert "etag" not in resp.headers
+        resp = client.get(url("search/الله/arabic:simple-clean/english:maududi"))
+        assert "etag" not in resp.headers
+
+
+class TestResponseCache:
+    def test_repeated_request_is_a_hit(self, client):
+        first = client.get(url("text/1:1-2/arabic:simple-clean"))
+        hits = get_response_cache().stats()["hits"]
+        second = client.get(url("text/1:1-2/arabic:simple-clean"))
+        assert second.json() == first.json()
+        assert get_response_cache().stats()["hits"] == hits + 1
+
+    def test_language_order_shares_entry(self, client):
+        client.get(url("text/1/arabic:simple-clean_english:maududi"))
+        hits = get_response_cache().stats()["hits"]
+        client.get(url("text/1/english:maududi_arabic:simple-clean"))
+        assert get_response_cache().stats()["hits"] == hits + 1
+
+    def test_cached_search_keeps_headers(self, client):
+        path = url("search/الرحمن/arabic:simple-clean/english:maududi?limit=1")
+        first = client.get(path)
+        second = client.get(path)
+        assert second.headers["x-total-count"] == first.headers["x-total-count"] == "2"
+        assert second.headers["x-next-cursor"] == "1:1"
+
+    def test_errors_not_cached(self, client):
+        client.get(url("ayas-by-word/كلمةغيرموجودة/arabic:simple-clean"))
+        resp = client.get(url("ayas-by-word/كلمةغيرموجودة/arabic:simple-clean"))
+        assert resp.status_code == 404
+
+    def test_stats_endpoint(self, client):
+        resp = client.get(url("cache-stats"))
+        assert resp.status_code == 200
+        assert {"hits", "misses", "entries", "bytes"} <= resp.json().keys()
@@ -0,0 +1,25 @@
+"""Unit tests for Arabic text normalisation."""
+
+from quranref.arabic import fold_text
+
+
+class TestFoldText:
+    def test_strips_diacritics(self):
+        assert fold_text("بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ") == "بسم الله الرحمن الرحيم"
+
+    def test_unifies_alef_forms(self):
+        assert {fold_text(c) for c in ["آ", "أ", "إ", "ا", "ٱ"]} == {"ا"}
+
+    def test_unifies_hamza_carriers(self):
+        assert fold_text("يُؤْمِنُونَ") == "يومنون"
+        assert fold_text("ئ") == "ي"
+
+    def test_unifies_ya_and_ta_marbuta(self):
+        assert fold_text("هُدًى") == "هدي"
+        assert fold_text("رَحْمَةً") == "رحمه"
+
+    def test_strips_tatweel(self):
+        assert fold_text("الـلـه") == "الله"
+
+    def test_case_folds_translations(self):
+        assert fold_text("The Entirely Merciful") == "the entirely merciful"
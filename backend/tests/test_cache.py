@@ -0,0 +1,56 @@
+"""Unit tests for the in-process response cache."""
+
+from quranref.cache import CachedResponse, ResponseCache
+
+
+def entry(size: int) -> CachedResponse:
+    return CachedResponse(b"x" * size)
+
+
+def test_hit_and_miss_counters():
+    cache = ResponseCache(max_bytes=1000, ttl=60)
+    assert cache.get("a", "v1") is None
+    cache.set("a", "v1", entry(10))
+    assert cache.get("a", "v1").body == b"x" * 10
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 1, 1, 10)
+
+
+def test_evicts_least_recently_used_within_budget():
+    cache = ResponseCache(max_bytes=100, ttl=60)
+    cache.set("a", "v1", entry(40))
+    cache.set("b", "v1", entry(40))
+    cache.get("a", "v1")
+    cache.set("c", "v1", entry(40))
+
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") is not None
+    assert cache.get("c", "v1") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 80
+
+
+def test_skips_entries_larger_than_budget():
+    cache = ResponseCache(max_bytes=10, ttl=60)
+    cache.set("a", "v1", entry(11))
+    assert cache.get("a", "v1") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(max_bytes=100, ttl=0)
+    cache.set("a", "v1", entry(10))
+    assert cache.get("a", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_version_change_drops_entries():
+    cache = ResponseCache(max_bytes=100, ttl=60)
+    cache.set("a", "v1", entry(10))
+    assert cache.get("a", "v2") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_headers_count_towards_size():
+    value = CachedResponse(b"[]", {"X-Total-Count": "5"})
+    assert value.size == 2 + len("X-Total-Count") + 1
@@ -0,0 +1,100 @@
+"""Unit tests for the positional word index."""
+
+from quranref.concordance import (
+    ConcordanceIndex,
+    intersect_postings,
+    merge_postings,
+    pack,
+    unpack,
+    word_positions,
+)
+
+AYA_WORDS = {
+    "1:3": ["الرحمن", "الرحيم"],
+    "1:1": ["بسم", "الله", "الرحمن", "الرحيم"],
+    "2:2": ["ذلك", "الكتاب", "لا", "ريب", "فيه", "لا"],
+}
+
+
+def make_index() -> ConcordanceIndex:
+    aya_keys, positions = word_positions(AYA_WORDS)
+    return ConcordanceIndex(aya_keys, positions, version="v1")
+
+
+class TestPacking:
+    def test_round_trip(self):
+        values = [0, 1, 255, 256, 6235, 65535]
+        assert list(unpack(pack(values))) == values
+
+    def test_two_bytes_per_value(self):
+        assert pack([1, 2]) == b"\x01\x00\x02\x00"
+
+
+class TestWordPositions:
+    def test_ordinals_in_mushaf_order(self):
+        aya_keys, positions = word_positions(AYA_WORDS)
+        assert aya_keys == ["1:1", "1:3", "2:2"]
+        assert list(positions["الرحمن"][0]) == [0, 1]
+        assert list(positions["الرحمن"][1]) == [2, 0]
+
+    def test_repeated_words_keep_every_position(self):
+        _aya_keys, positions = word_positions(AYA_WORDS)
+        assert list(zip(*positions["لا"])) == [(2, 2), (2, 5)]
+
+    def test_tokens_rebuilt_from_positions(self):
+        index = make_index()
+        assert index.tokens[0] == ("بسم", "الله", "الرحمن", "الرحيم")
+        assert index.tokens[2] == ("ذلك", "الكتاب", "لا", "ريب", "فيه", "لا")
+
+
+class TestConcordanceIndex:
+    def test_occurrences(self):
+        assert make_index().occurrences("الرحيم") == [(0, 3), (1, 1)]
+
+    def test_unknown_word(self):
+        index = make_index()
+        assert index.occurrences("كلمة") == []
+        assert index.phrase(["كلمة", "الرحيم"]) == []
+
+    def test_phrase(self):
+        index = make_index()
+        assert index.phrase(["الرحمن", "الرحيم"]) == [(0, 2), (1, 0)]
+        assert index.phrase(["الله", "الرحيم"]) == []
+
+    def test_near(self):
+        index = make_index()
+        assert index.near(["الرحيم"], "بسم", 3) == [(0, 3)]
+        assert index.near(["الرحيم"], "بسم", 2) == []
+        assert index.near(["ريب"], "لا", 1) == [(2, 3)]
+
+    def test_kwic(self):
+        index = make_index()
+        assert index.kwic(2, 3, 1, 2) == {
+            "aya_key": "2:2",
+            "position": 3,
+            "left": "الكتاب لا",
+            "keyword": "ريب",
+            "right": "فيه لا",
+        }
+
+    def test_kwic_at_aya_edges(self):
+        line = make_index().kwic(1, 0, 2, 5)
+        assert (line["left"], line["keyword"], line["right"]) == ("", "الرحمن الرحيم", "")
+
+
+class TestPostings:
+    def test_distinct_sorted_ordinals(self):
+        index = make_index()
+        assert list(index.postings["الرحمن"]) == [0, 1]
+        assert list(index.postings["لا"]) == [2]
+
+    def test_intersect(self):
+        assert intersect_postings([[1, 3, 5, 7], [0, 3, 7, 9], [3, 4, 7]]) == [3, 7]
+        assert intersect_postings([[1, 2], [3, 4]]) == []
+        assert intersect_postings([[2, 4]]) == [2, 4]
+        assert intersect_postings([]) == []
+        assert intersect_postings([[(1, 2), (2, 5)], [(1, 1), (2, 5)]]) == [(2, 5)]
+
+    def test_merge(self):
+        assert merge_postings([[1, 3, 5], [0, 3, 9], [5]]) == [0, 1, 3, 5, 9]
+        assert merge_postings([]) == []
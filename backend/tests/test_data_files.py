@@ -0,0 +1,112 @@
+"""Unit tests for reading and writing the JSON export files."""
+
+import json
+
+import pytest
+from quranref import data_files
+from quranref.data_files import (
+    data_file_name,
+    find_data_file,
+    iter_records,
+    read_manifest,
+    verify_manifest,
+    write_manifest,
+    write_records,
+)
+from quranref.utils import file_digest
+
+RECORDS = [
+    {"_key": "1:1", "text": "بسم الله الرحمن الرحيم"},
+    {"_key": "1:2", "text": 'with "quotes", [brackets] and {braces}'},
+    {"_key": "1:3", "nested": {"list": [1, 2, {"a": None}]}},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_json_array_across_chunks(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(data_files, "_READ_CHUNK_SIZE", chunk_size)
+    path = tmp_path / "texts.json"
+    path.write_text(
+        "\n " + json.dumps(RECORDS, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_empty_json_array(tmp_path):
+    path = tmp_path / "texts.json"
+    path.write_text(" [ ] ")
+    assert list(iter_records(path)) == []
+
+
+def test_truncated_json_array(tmp_path):
+    path = tmp_path / "texts.json"
+    path.write_text(json.dumps(RECORDS)[:-20])
+    with pytest.raises(ValueError):
+        list(iter_records(path))
+
+
+def test_ndjson(tmp_path):
+    path = tmp_path / "texts.ndjson"
+    path.write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in RECORDS) + "\n",
+        encoding="utf-8",
+    )
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_find_data_file(tmp_path):
+    assert find_data_file(tmp_path, "texts") is None
+    (tmp_path / "texts.ndjson").write_text("")
+    assert find_data_file(tmp_path, "texts") == tmp_path / "texts.ndjson"
+
+
+def test_find_compressed_data_file(tmp_path):
+    (tmp_path / "texts.ndjson.zst").write_bytes(b"")
+    assert find_data_file(tmp_path, "texts") == tmp_path / "texts.ndjson.zst"
+
+
+@pytest.mark.parametrize(
+    "fmt,compression",
+    [("json", "none"), ("ndjson", "none"), ("ndjson", "bz2"), ("ndjson", "zstd")],
+)
+def test_write_records_round_trip(tmp_path, fmt, compression):
+    if compression == "zstd":
+        try:
+            data_files._zstd_module()
+        except RuntimeError:
+            pytest.skip("zstd support not installed")
+
+    path = tmp_path / data_file_name("texts", fmt, compression)
+    assert write_records(path, iter(RECORDS)) == len(RECORDS)
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_write_no_records(tmp_path):
+    path = tmp_path / "texts.json"
+    assert write_records(path, []) == 0
+    assert list(iter_records(path)) == []
+
+
+def test_manifest(tmp_path):
+    path = tmp_path / "texts.ndjson.bz2"
+    rows = write_records(path, RECORDS)
+    manifest = {
+        "format": "ndjson",
+        "compression": "bz2",
+        "files": {"texts": {"file": path.name, "rows": rows, "sha256": file_digest(path)}},
+    }
+    write_manifest(tmp_path, manifest)
+    assert read_manifest(tmp_path) == manifest
+    verify_manifest(tmp_path, manifest)
+
+    write_records(path, RECORDS[:1])
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        verify_manifest(tmp_path, manifest)
+
+    path.unlink()
+    with pytest.raises(ValueError, match="missing"):
+        verify_manifest(tmp_path, manifest)
+
+
+def test_no_manifest(tmp_path):
+    assert read_manifest(tmp_path) is None
@@ -0,0 +1,41 @@
+"""Tests for the hot query plan checks."""
+
+from quranref.query_plans import explain, hot_queries, seq_scans
+
+PLAN = {
+    "Node Type": "Nested Loop",
+    "Plans": [
+        {
+            "Node Type": "Seq Scan",
+            "Relation Name": "AYA_TEXT",
+            "Actual Rows": 10,
+            "Rows Removed by Filter": 49_990,
+            "Actual Loops": 1,
+        },
+        {
+            "Node Type": "Index Scan",
+            "Relation Name": "Text",
+            "Actual Rows": 1,
+            "Actual Loops": 10,
+            "Plans": [
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "Surah",
+                    "Actual Rows": 114,
+                    "Actual Loops": 1,
+                }
+            ],
+        },
+    ],
+}
+
+
+def test_seq_scans():
+    assert seq_scans(PLAN) == [("AYA_TEXT", 50_000)]
+    assert seq_scans(PLAN, min_rows=100) == [("AYA_TEXT", 50_000), ("Surah", 114)]
+
+
+def test_hot_queries_run(client, test_graph):
+    for sql, params in hot_queries(test_graph, 1, "arabic", "simple-clean", "الله").values():
+        plan = explain(sql, params)
+        assert plan["Execution Time"] >= 0
@@ -0,0 +1,73 @@
+"""Unit tests for the in-process search index."""
+
+from quranref.search_index import SearchIndex
+from quranref.utils import aya_sort_key
+
+ROWS = [
+    ("2:1", "الم"),
+    ("1:2", "الحمد لله رب العالمين"),
+    ("1:10", "فيه هدى للمتقين"),
+    ("1:1", "بسم الله الرحمن الرحيم"),
+    ("1:3", "الرحمن الرحيم"),
+]
+
+
+def make_index() -> SearchIndex:
+    return SearchIndex("arabic", "simple-clean", ROWS)
+
+
+def keys(index: SearchIndex, ordinals: list[int]) -> list[str]:
+    return [index.aya_keys[o] for o in ordinals]
+
+
+class TestAyaSortKey:
+    def test_numeric_order(self):
+        assert sorted(["1:10", "2:1", "1:2"], key=aya_sort_key) == ["1:2", "1:10", "2:1"]
+
+
+class TestSearchIndex:
+    def test_ayas_in_mushaf_order(self):
+        index = make_index()
+        assert index.aya_keys == ["1:1", "1:2", "1:3", "1:10", "2:1"]
+
+    def test_whole_token(self):
+        index = make_index()
+        assert keys(index, index.search("الرحيم")) == ["1:1", "1:3"]
+
+    def test_substring_of_token(self):
+        # Same semantics as CONTAINS: "لله" is part of both "الله" and "لله"
+        index = make_index()
+        assert keys(index, index.search("لله")) == ["1:1", "1:2"]
+
+    def test_short_fragment(self):
+        index = make_index()
+        assert keys(index, index.search("هد")) == ["1:10"]
+
+    def test_phrase(self):
+        index = make_index()
+        assert keys(index, index.search("الله الرحمن")) == ["1:1"]
+
+    def test_phrase_with_partial_edges(self):
+        index = make_index()
+        assert keys(index, index.search("له الرحمن الر")) == ["1:1"]
+
+    def test_phrase_requires_adjacent_tokens(self):
+        index = make_index()
+        assert index.search("بسم الرحمن") == []
+
+    def test_whole_words(self):
+        index = make_index()
+        assert index.search("لله", whole_words=True) == [1]
+        assert keys(index, index.search("الرحمن الرحيم", whole_words=True)) == ["1:1", "1:3"]
+        assert index.search("له الرحمن", whole_words=True) == []
+
+    def test_folds_text_and_term(self):
+        index = SearchIndex("arabic", "uthmani", [("1:1", "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ")])
+        assert index.search("الرحمن") == [0]
+        assert index.search("ٱلرَّحِيمِ") == [0]
+        assert index.texts[0] == "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ"
+
+    def test_no_match(self):
+        index = make_index()
+        assert index.search("xyz") == []
+        assert index.search("   ") == []
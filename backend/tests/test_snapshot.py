@@ -0,0 +1,76 @@
+"""Unit tests for the in-memory corpus snapshot."""
+
+from quranref.snapshot import CorpusSnapshot
+
+AYA_KEYS = ["2:1", "1:1", "1:2", "1:3", "2:0", "2:2"]
+
+TEXTS = {
+    ("arabic", "simple-clean"): {
+        "1:1": "بسم الله الرحمن الرحيم",
+        "1:2": "الحمد لله رب العالمين",
+        "1:3": "الرحمن الرحيم",
+        "2:0": "بسم الله الرحمن الرحيم",
+        "2:1": "الم",
+        "2:2": "ذلك الكتاب لا ريب فيه",
+    },
+    ("english", "maududi"): {
+        "1:1": "In the name of Allah",
+        "2:1": "Alif Lam Meem",
+    },
+}
+
+
+def make_snapshot() -> CorpusSnapshot:
+    return CorpusSnapshot(AYA_KEYS, TEXTS, version="v1")
+
+
+def aya_keys(results) -> list[str]:
+    return [r.aya_key for r in results]
+
+
+class TestCorpusSnapshot:
+    def test_ayas_in_mushaf_order(self):
+        snapshot = make_snapshot()
+        assert snapshot.aya_keys == ("1:1", "1:2", "1:3", "2:0", "2:1", "2:2")
+
+    def test_full_surah(self):
+        snapshot = make_snapshot()
+        ordinals = snapshot.ordinal_range("2")
+        assert ordinals == range(3, 6)
+
+    def test_aya_range(self):
+        snapshot = make_snapshot()
+        ordinals = snapshot.ordinal_range("2", 1, 2)
+        results = snapshot.get_texts(ordinals, [("arabic", "simple-clean")])
+        assert aya_keys(results) == ["2:1", "2:2"]
+
+    def test_range_past_surah_end(self):
+        snapshot = make_snapshot()
+        assert snapshot.ordinal_range("1", 2, 286) == range(1, 3)
+
+    def test_unknown_surah(self):
+        snapshot = make_snapshot()
+        assert snapshot.ordinal_range("3") == range(0)
+
+    def test_multi_language(self):
+        snapshot = make_snapshot()
+        ordinals = snapshot.ordinal_range("1", 1, 1)
+        results = snapshot.get_texts(ordinals, [("arabic", "simple-clean"), ("english", "maududi")])
+        assert results[0].texts == {
+            "arabic": {"simple-clean": "بسم الله الرحمن الرحيم"},
+            "english": {"maududi": "In the name of Allah"},
+        }
+
+    def test_texts_of_listed_ordinals(self):
+        snapshot = make_snapshot()
+        results = snapshot.get_texts([5, 0], [("arabic", "simple-clean")])
+        assert aya_keys(results) == ["2:2", "1:1"]
+
+    def test_skips_ayas_without_requested_texts(self):
+        snapshot = make_snapshot()
+        results = snapshot.get_texts(snapshot.ordinal_range("1"), [("english", "maududi")])
+        assert aya_keys(results) == ["1:1"]
+
+    def test_unknown_text_type(self):
+        snapshot = make_snapshot()
+        assert snapshot.get_texts(snapshot.ordinal_range("1"), [("urdu", "maududi")]) == []
@@ -0,0 +1,122 @@
+"""Tests for the set based aya text import."""
+
+import bz2
+import hashlib
+from pathlib import Path
+
+import pytest
+from quranref import API_BASE
+from quranref.text_import import (
+    import_text_entries,
+    infer_text_spec,
+    parse_text_file,
+    plan_bismillah_removal,
+    remove_bismillah,
+)
+from quranref.utils import file_digest
+
+BISMILLAH = "بسم الله الرحمن الرحيم"
+
+LINES = [
+    f"1|1|{BISMILLAH}",
+    "1|2|الحمد لله رب العالمين",
+    f"2|1|{BISMILLAH} الم",
+    "2|2|ذلك الكتاب لا ريب فيه",
+    "",
+    "9|9|ignored after the blank line",
+]
+
+
+def test_parse_splits_bismillah(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_text("\n".join(LINES) + "\n")
+
+    assert parse_text_file(path) == [
+        (1, 1, BISMILLAH),
+        (1, 2, "الحمد لله رب العالمين"),
+        (2, 0, BISMILLAH),
+        (2, 1, "الم"),
+        (2, 2, "ذلك الكتاب لا ريب فيه"),
+    ]
+
+
+def test_parse_bz2(tmp_path):
+    path = tmp_path / "text.txt.bz2"
+    path.write_bytes(bz2.compress(("\n".join(LINES) + "\n").encode()))
+    assert len(parse_text_file(path)) == 5
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("ur.maududi.txt.bz2", ("urdu", "maududi")),
+        ("en.sahih.txt", ("english", "sahih")),
+        ("xx.some-text.txt.bz2", ("xx", "some-text")),
+        ("ar.jalalayn.txt.bz2", ("arabic-tafsir", "jalalayn")),
+        ("ar.muyassar.txt", ("arabic-tafsir", "muyassar")),
+        ("id.jalalayn.txt.bz2", ("indonesian-tafsir", "jalalayn")),
+        ("ru.kuliev-alsaadi.txt.bz2", ("russian-tafsir", "kuliev-alsaadi")),
+    ],
+)
+def test_infer_text_spec(name, expected):
+    assert infer_text_spec(Path(name)) == expected
+
+
+def test_infer_text_spec_rejects_unknown_layout():
+    with pytest.raises(ValueError):
+        infer_text_spec(Path("maududi.txt"))
+
+
+def test_plan_bismillah_removal():
+    def row(surah_key, text_type, edge_gid, text):
+        return {"surah_key": surah_key, "text_type": text_type, "edge_gid": edge_gid, "text": text}
+
+    first_ayas = [
+        row("2", "simple", 20, f"{BISMILLAH} الم"),
+        row("1", "simple", 10, BISMILLAH),
+        row("9", "simple", 90, "براءة من الله"),
+        row("27", "simple", 270, BISMILLAH),
+        row("2", "uthmani", 21, f"{BISMILLAH} الم"),
+    ]
+    assert plan_bismillah_removal(first_ayas) == [(20, "الم")]
+
+
+def test_file_digest(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_bytes(b"1|1|text\n")
+    assert file_digest(path) == hashlib.sha256(b"1|1|text\n").hexdigest()
+
+
+def test_import_links_texts_once(client, test_graph):
+    entries = [(1, 1, "First"), (1, 2, "Second"), (1, 3, "First"), (2, 9, "New aya")]
+
+    counts = import_text_entries(test_graph, entries, "english", "bulk-test", batch_size=2)
+    assert counts == {"ayas": 1, "texts": 3, "edges": 4, "skipped": 0}
+
+    resp = client.get(f"{API_BASE}/text/1/english:bulk-test")
+    assert [a["texts"]["english"]["bulk-test"] for a in resp.json()] == [
+        "First", "Second", "First"
+    ]
+
+    counts = import_text_entries(test_graph, entries, "english", "bulk-test")
+    assert counts == {"ayas": 0, "texts": 0, "edges": 0, "skipped": 4}
+
+
+def test_remove_bismillah_repoints_edges(client, test_graph):
+    entries = [(1, 1, BISMILLAH), (2, 1, f"{BISMILLAH} الم")]
+    import_text_entries(test_graph, entries, "arabic", "bismillah-test")
+
+    assert remove_bismillah(test_graph) == 1
+    assert remove_bismillah(test_graph) == 0
+
+    rows = test_graph.cypher(
+        "MATCH (a:Aya)-[e:AYA_TEXT]->(t:Text) "
+        "WHERE e.text_type = 'bismillah-test' AND a.id = '2:1' RETURN t.text",
+        columns=["text"],
+    )
+    assert [r["text"] for r in rows] == ["الم"]
+    orphans = test_graph.cypher(
+        "MATCH (t:Text) WHERE t.text = $text RETURN t.id", columns=["id"],
+        text=f"{BISMILLAH} الم",
+    )
+    assert orphans == []
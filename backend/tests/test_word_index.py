@@ -0,0 +1,136 @@
+"""Tests for building words from the aya texts."""
+
+from quranref import API_BASE
+from quranref.cache import clear_response_cache
+from quranref.concordance import ConcordanceIndex
+from quranref.db import raw_connection
+from quranref.graph_bulk import set_properties
+from quranref.models import Word
+from quranref.utils import text_to_digest
+from quranref.word_index import (
+    current_word_generation,
+    fix_word_counts,
+    plan_word_changes,
+    rebuild_words,
+    refresh_word_positions,
+    split_words,
+    update_words,
+    word_count_diff,
+)
+
+
+def d(word: str) -> str:
+    return text_to_digest(word)
+
+
+def test_split_words():
+    assert split_words("قل  هو الله ") == ["قل", "هو", "الله"]
+
+
+def test_plan_new_ayas():
+    sources = {"1:1": ("t1", "a b a"), "1:2": ("t2", "b c")}
+    changes = plan_word_changes(sources, {}, [])
+
+    assert changes.ayas == changes.texts == 2
+    assert sorted(changes.add_edges) == sorted(
+        [("1:1", d("a")), ("1:1", d("b")), ("1:2", d("b")), ("1:2", d("c"))]
+    )
+    assert changes.remove_edges == []
+    assert changes.counts == {d("a"): 1, d("b"): 2, d("c"): 1}
+    assert set(changes.words.values()) == {"a", "b", "c"}
+
+
+def test_plan_changed_and_removed_ayas():
+    sources = {"1:1": ("t1", "a b"), "1:2": ("t2-new", "b c")}
+    recorded = {"1:1": "t1", "1:2": "t2", "1:3": "t3"}
+    edges = [
+        ("1:1", d("a"), 10), ("1:1", d("b"), 11),
+        ("1:2", d("b"), 12), ("1:2", d("x"), 13),
+        ("1:3", d("a"), 14),
+    ]
+    changes = plan_word_changes(sources, recorded, edges)
+
+    assert changes.ayas == changes.texts == 2
+    assert changes.add_edges == [("1:2", d("c"))]
+    assert sorted(changes.remove_edges) == [13, 14]
+    assert changes.words == {d("c"): "c"}
+    assert changes.counts == {d("a"): 1, d("b"): 2, d("c"): 1}
+
+
+def test_plan_unchanged_ayas_are_not_split():
+    sources = {"1:1": ("t1", "text the edges were not built from")}
+    edges = [("1:1", d("a"), 10), ("1:1", d("a"), 11)]
+    changes = plan_word_changes(sources, {"1:1": "t1"}, edges)
+
+    assert changes.ayas == changes.texts == 0
+    assert changes.add_edges == []
+    assert changes.remove_edges == [11]  # duplicate edge
+    assert changes.counts == {d("a"): 1}
+
+
+def test_plan_reordered_words_count_as_text_change():
+    sources = {"1:1": ("t1-new", "b a")}
+    edges = [("1:1", d("a"), 10), ("1:1", d("b"), 11)]
+    changes = plan_word_changes(sources, {"1:1": "t1"}, edges)
+
+    assert changes.texts == 1
+    assert changes.ayas == 0
+    assert changes.add_edges == changes.remove_edges == []
+
+
+def test_update_words_is_idempotent(client, test_graph):
+    changes = update_words(test_graph)
+    assert changes["edges_added"] == changes["edges_removed"] == 0
+    assert changes["words_added"] == changes["words_removed"] == 0
+
+    assert update_words(test_graph) == {
+        "texts": 0,
+        "ayas": 0,
+        "words_added": 0,
+        "words_removed": 0,
+        "counts_updated": 0,
+        "edges_added": 0,
+        "edges_removed": 0,
+    }
+
+
+def test_rebuild_words_switches_generation(client, test_graph):
+    url = f"{API_BASE}/ayas-by-word/الرحمن/arabic:simple-clean"
+    before = client.get(url).json()
+    top_before = client.get(f"{API_BASE}/top-most-frequent-words/10").json()
+    generation = current_word_generation()
+
+    changes = rebuild_words(test_graph)
+    clear_response_cache()
+
+    assert changes["generation"] == current_word_generation() == generation + 1
+    assert changes["edges_removed"] == changes["edges_added"] > 0
+    assert client.get(url).json() == before
+    assert client.get(f"{API_BASE}/top-most-frequent-words/10").json() == top_before
+    assert update_words(test_graph)["edges_added"] == 0
+
+    concordance = ConcordanceIndex.load()
+    assert concordance.aya_keys == ("1:1", "1:2", "1:3", "2:1", "2:2")
+    assert concordance.phrase(["الرحمن", "الرحيم"]) == [(0, 2), (2, 0)]
+
+
+def test_refresh_word_positions(client, test_graph):
+    with raw_connection() as conn:
+        conn.execute("DELETE FROM word_positions")
+        conn.commit()
+    assert ConcordanceIndex.load().positions == {}
+
+    assert refresh_word_positions(test_graph) > 0
+    assert ConcordanceIndex.load().occurrences("الحمد") == [(1, 0)]
+
+
+def test_fix_word_counts(client, test_graph):
+    fix_word_counts(test_graph)
+    assert word_count_diff(test_graph) == []
+
+    word = test_graph.query(Word).filter_by(word="الرحمن").first()
+    set_properties(test_graph, Word.__label__, [(word.graph_id, {"count": 99})])
+    assert word_count_diff(test_graph) == [("الرحمن", 99, 2)]
+
+    assert fix_word_counts(test_graph) == 1
+    assert word_count_diff(test_graph) == []